@@ -0,0 +1,66 @@
+"""Benchmark head/tail-bounded extraction against full conversion.
+
+Converts each document with MarkItDown in full and with
+``extractor.extract_text(max_chars=...)``, which only reads the leading and
+trailing pages or slides, or the leading rows of a workbook. Without
+arguments a large generated .xlsx is used; pass your own long PDF/PPTX/XLSX
+files to measure those.
+
+Usage:
+    uv run python benchmarks/bench_bounded.py [--rows N] [--max-chars N] [FILE ...]
+"""
+
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+from markitdown import MarkItDown
+
+from doc_triager.extractor import extract_text
+
+
+def _make_workbook(path: Path, rows: int) -> Path:
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet("Data")
+    sheet.append(["id", "date", "amount", "memo"])
+    for i in range(rows):
+        sheet.append([i, f"2024-01-{i % 28 + 1:02d}", i * 1.5, f"row {i}"])
+    workbook.save(path)
+    return path
+
+
+def _elapsed_ms(func) -> float:
+    start = time.perf_counter()
+    func()
+    return (time.perf_counter() - start) * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("files", nargs="*", type=Path, help="documents to convert")
+    parser.add_argument("--rows", type=int, default=50_000, help="generated rows")
+    parser.add_argument("--max-chars", type=int, default=8000, help="text budget")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        files = args.files or [_make_workbook(Path(tmp) / "big.xlsx", args.rows)]
+        converter = MarkItDown()
+        for path in files:
+            full = _elapsed_ms(lambda p=path: converter.convert(p))
+            bounded = _elapsed_ms(
+                lambda p=path: extract_text(
+                    p, min_text_length=0, max_chars=args.max_chars
+                )
+            )
+            print(f"{path.name}")
+            print(f"  full conversion:  {full:10.1f} ms")
+            print(f"  bounded:          {bounded:10.1f} ms ({full / bounded:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""Benchmark native plain-text readers against MarkItDown.
+
+Converts a folder of tiny .txt/.md/.csv files with a reused ``MarkItDown()``
+and with ``extractor.extract_text``, which decodes these formats directly
+(see ``native_readers``).
+
+Usage:
+    uv run python benchmarks/bench_native.py [--files N]
+"""
+
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+from markitdown import MarkItDown
+
+from doc_triager.extractor import extract_text
+
+
+def _make_files(directory: Path, count: int) -> list[Path]:
+    files = []
+    for i in range(count):
+        ext = (".txt", ".md", ".csv")[i % 3]
+        path = directory / f"doc{i}{ext}"
+        if ext == ".csv":
+            path.write_text(f"id,name\n{i},row {i}\n", encoding="utf-8")
+        else:
+            path.write_text(f"# Document {i}\n\nShort body text.\n", encoding="utf-8")
+        files.append(path)
+    return files
+
+
+def _per_file_ms(func, files: list[Path]) -> float:
+    start = time.perf_counter()
+    for path in files:
+        func(path)
+    return (time.perf_counter() - start) * 1000 / len(files)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--files", type=int, default=300, help="number of files")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        files = _make_files(Path(tmp), args.files)
+        converter = MarkItDown()
+        converter.convert(files[0])  # 初回の変換器読み込みを除外する
+
+        markitdown = _per_file_ms(converter.convert, files)
+        native = _per_file_ms(lambda p: extract_text(p, min_text_length=0), files)
+
+    print(f"files:                {args.files}")
+    print(f"MarkItDown (reused):  {markitdown:8.3f} ms/file")
+    print(f"native readers:       {native:8.3f} ms/file")
+    print(
+        f"saved:                {markitdown - native:8.3f} ms/file "
+        f"({markitdown / native:.1f}x)"
+    )
+
+
+if __name__ == "__main__":
+    main()
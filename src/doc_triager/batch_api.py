@@ -0,0 +1,615 @@
+"""Provider batch API module for doc-triager.
+
+Classification requests can be sent through the OpenAI Batch API or the
+Anthropic Message Batches API instead of one call per document. Requests are
+written as JSONL in the provider's batch format, submitted as one job, and
+the results are fetched later once the provider has finished the job (within
+24 hours, at about half the per-token price). Only the standard library's
+``urllib`` is used.
+
+``BatchSubmission`` assembles the jobs of a ``run --batch-submit`` and
+``collect_batches`` applies their results (``batch-collect``).
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+import urllib.error
+import urllib.request
+import uuid
+from collections.abc import Iterator
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Protocol, Self
+
+from doc_triager.config import Config
+from doc_triager.database import TriageDatabase, open_database
+from doc_triager.llm import build_messages, is_cacheable_prefix
+from doc_triager.pipeline import move_to_triage, record_result
+from doc_triager.prompts import Prompt
+from doc_triager.triage import apply_threshold, parse_classify_response
+
+logger = logging.getLogger(__name__)
+
+_OPENAI_BASE_URL = "https://api.openai.com/v1"
+_ANTHROPIC_BASE_URL = "https://api.anthropic.com/v1"
+_ANTHROPIC_VERSION = "2023-06-01"
+_HTTP_TIMEOUT_SEC = 300
+
+
+class BatchApiError(RuntimeError):
+    """A batch API request failed."""
+
+
+@dataclass
+class BatchJobStatus:
+    """State of a submitted batch job."""
+
+    status: str
+    ended: bool
+
+
+@dataclass
+class BatchResult:
+    """Outcome of one request in a batch job."""
+
+    custom_id: str
+    text: str | None = None
+    error: str | None = None
+
+
+class BatchClient(Protocol):
+    """Submits batch jobs to a provider and fetches their results."""
+
+    def request_line(
+        self, *, custom_id: str, prompt: Prompt, model: str, max_tokens: int
+    ) -> dict[str, Any]:
+        """Return one JSONL line of the provider's batch input format."""
+        ...
+
+    def submit(self, input_path: Path) -> str:
+        """Submit a JSONL file written with ``request_line``. Returns the job id."""
+        ...
+
+    def poll(self, job_id: str) -> BatchJobStatus:
+        """Return the current status of a job."""
+        ...
+
+    def results(self, job_id: str) -> Iterator[BatchResult]:
+        """Yield the result of every request of an ended job."""
+        ...
+
+
+def create_batch_client(
+    provider: str, *, api_key: str, base_url: str | None = None
+) -> BatchClient:
+    """Build the batch client for ``[llm] provider``.
+
+    Args:
+        provider: ``"openai"`` or ``"anthropic"``.
+        api_key: API key of the provider.
+        base_url: Optional API base URL (e.g. a compatible proxy).
+
+    Raises:
+        ValueError: If the provider has no supported batch API.
+    """
+    if provider == "openai":
+        return OpenAIBatchClient(api_key=api_key, base_url=base_url)
+    if provider == "anthropic":
+        return AnthropicBatchClient(api_key=api_key, base_url=base_url)
+    msg = f"バッチAPIに対応していないプロバイダです: {provider}（openai / anthropic）"
+    raise ValueError(msg)
+
+
+def _request(
+    method: str,
+    url: str,
+    *,
+    headers: dict[str, str],
+    body: bytes | None = None,
+) -> bytes:
+    """Send an HTTP request and return the response body."""
+    req = urllib.request.Request(url, data=body, method=method, headers=headers)
+    try:
+        with urllib.request.urlopen(req, timeout=_HTTP_TIMEOUT_SEC) as resp:
+            return resp.read()
+    except urllib.error.HTTPError as e:
+        detail = e.read().decode("utf-8", "replace")
+        msg = f"バッチAPIエラー: {method} {url} -> {e.code}: {detail}"
+        raise BatchApiError(msg) from e
+    except urllib.error.URLError as e:
+        msg = f"バッチAPIに接続できません: {url}: {e.reason}"
+        raise BatchApiError(msg) from e
+
+
+def _json(data: bytes) -> Any:
+    return json.loads(data.decode("utf-8"))
+
+
+def _iter_jsonl(data: bytes) -> Iterator[dict[str, Any]]:
+    for line in data.decode("utf-8").splitlines():
+        if line.strip():
+            yield json.loads(line)
+
+
+class OpenAIBatchClient:
+    """OpenAI Batch API: upload the JSONL file, then create a batch on it."""
+
+    _ENDED = frozenset({"completed", "failed", "expired", "cancelled"})
+
+    def __init__(self, *, api_key: str, base_url: str | None = None) -> None:
+        self._base_url = (base_url or _OPENAI_BASE_URL).rstrip("/")
+        self._headers = {"Authorization": f"Bearer {api_key}"}
+
+    def request_line(
+        self, *, custom_id: str, prompt: Prompt, model: str, max_tokens: int
+    ) -> dict[str, Any]:
+        return {
+            "custom_id": custom_id,
+            "method": "POST",
+            "url": "/v1/chat/completions",
+            "body": {
+                "model": model,
+                "messages": build_messages(
+                    prompt=prompt.user,
+                    model=f"openai/{model}",
+                    system=prompt.system or None,
+                ),
+                "max_completion_tokens": max_tokens,
+            },
+        }
+
+    def submit(self, input_path: Path) -> str:
+        boundary = uuid.uuid4().hex
+        body = b"".join(
+            [
+                f"--{boundary}\r\n".encode(),
+                b'Content-Disposition: form-data; name="purpose"\r\n\r\nbatch\r\n',
+                f"--{boundary}\r\n".encode(),
+                b"Content-Disposition: form-data; "
+                + f'name="file"; filename="{input_path.name}"\r\n'.encode(),
+                b"Content-Type: application/jsonl\r\n\r\n",
+                input_path.read_bytes(),
+                f"\r\n--{boundary}--\r\n".encode(),
+            ]
+        )
+        uploaded = _json(
+            _request(
+                "POST",
+                f"{self._base_url}/files",
+                headers={
+                    **self._headers,
+                    "Content-Type": f"multipart/form-data; boundary={boundary}",
+                },
+                body=body,
+            )
+        )
+        batch = _json(
+            _request(
+                "POST",
+                f"{self._base_url}/batches",
+                headers={**self._headers, "Content-Type": "application/json"},
+                body=json.dumps(
+                    {
+                        "input_file_id": uploaded["id"],
+                        "endpoint": "/v1/chat/completions",
+                        "completion_window": "24h",
+                    }
+                ).encode(),
+            )
+        )
+        return batch["id"]
+
+    def _batch(self, job_id: str) -> dict[str, Any]:
+        return _json(
+            _request("GET", f"{self._base_url}/batches/{job_id}", headers=self._headers)
+        )
+
+    def poll(self, job_id: str) -> BatchJobStatus:
+        status = self._batch(job_id)["status"]
+        return BatchJobStatus(status=status, ended=status in self._ENDED)
+
+    def results(self, job_id: str) -> Iterator[BatchResult]:
+        batch = self._batch(job_id)
+        # 成功分は output_file_id、失敗分は error_file_id に分かれて出力される
+        for key in ("output_file_id", "error_file_id"):
+            file_id = batch.get(key)
+            if not file_id:
+                continue
+            content = _request(
+                "GET",
+                f"{self._base_url}/files/{file_id}/content",
+                headers=self._headers,
+            )
+            for line in _iter_jsonl(content):
+                yield self._parse_line(line)
+
+    @staticmethod
+    def _parse_line(line: dict[str, Any]) -> BatchResult:
+        custom_id = line["custom_id"]
+        response = line.get("response") or {}
+        if line.get("error") or response.get("status_code") != 200:
+            error = line.get("error") or response.get("body", {}).get("error")
+            return BatchResult(custom_id=custom_id, error=str(error))
+        try:
+            text = response["body"]["choices"][0]["message"]["content"]
+        except (KeyError, IndexError, TypeError):
+            return BatchResult(custom_id=custom_id, error="応答本文がありません")
+        return BatchResult(custom_id=custom_id, text=text)
+
+
+class AnthropicBatchClient:
+    """Anthropic Message Batches API: requests are posted in the create call."""
+
+    def __init__(self, *, api_key: str, base_url: str | None = None) -> None:
+        self._base_url = (base_url or _ANTHROPIC_BASE_URL).rstrip("/")
+        self._headers = {
+            "x-api-key": api_key,
+            "anthropic-version": _ANTHROPIC_VERSION,
+        }
+
+    def request_line(
+        self, *, custom_id: str, prompt: Prompt, model: str, max_tokens: int
+    ) -> dict[str, Any]:
+        params: dict[str, Any] = {
+            "model": model,
+            "max_tokens": max_tokens,
+            "messages": [{"role": "user", "content": prompt.user}],
+        }
+        if prompt.system:
+            block: dict[str, Any] = {"type": "text", "text": prompt.system}
+            if is_cacheable_prefix(prompt.system):
+                block["cache_control"] = {"type": "ephemeral"}
+            params["system"] = [block]
+        return {"custom_id": custom_id, "params": params}
+
+    def submit(self, input_path: Path) -> str:
+        with open(input_path, encoding="utf-8") as f:
+            requests = [json.loads(line) for line in f if line.strip()]
+        batch = _json(
+            _request(
+                "POST",
+                f"{self._base_url}/messages/batches",
+                headers={**self._headers, "Content-Type": "application/json"},
+                body=json.dumps({"requests": requests}).encode(),
+            )
+        )
+        return batch["id"]
+
+    def _batch(self, job_id: str) -> dict[str, Any]:
+        return _json(
+            _request(
+                "GET",
+                f"{self._base_url}/messages/batches/{job_id}",
+                headers=self._headers,
+            )
+        )
+
+    def poll(self, job_id: str) -> BatchJobStatus:
+        status = self._batch(job_id)["processing_status"]
+        return BatchJobStatus(status=status, ended=status == "ended")
+
+    def results(self, job_id: str) -> Iterator[BatchResult]:
+        results_url = self._batch(job_id).get("results_url")
+        if not results_url:
+            return
+        for line in _iter_jsonl(_request("GET", results_url, headers=self._headers)):
+            yield self._parse_line(line)
+
+    @staticmethod
+    def _parse_line(line: dict[str, Any]) -> BatchResult:
+        custom_id = line["custom_id"]
+        result = line.get("result") or {}
+        if result.get("type") != "succeeded":
+            error = result.get("error") or result.get("type", "結果なし")
+            return BatchResult(custom_id=custom_id, error=str(error))
+        text = "".join(
+            block.get("text", "")
+            for block in result.get("message", {}).get("content", [])
+            if block.get("type") == "text"
+        )
+        return BatchResult(custom_id=custom_id, text=text)
+
+
+class BatchSubmission:
+    """Collects the classification requests of a run into provider batch jobs.
+
+    ``process_file`` hands each extracted document to ``add`` instead of
+    calling the LLM. Requests are appended to JSONL files under ``directory``,
+    starting a new file once it holds ``max_requests`` requests or the next
+    request would take it past ``max_bytes`` (the providers cap the input of a
+    job at 200-256 MB); ``submit`` sends each
+    file as one job and records it, with the state of every file, in the
+    database for ``collect_batches`` to finish later. Used as a context
+    manager, a run that fails before ``submit`` leaves no partial files.
+    """
+
+    def __init__(
+        self,
+        *,
+        client: BatchClient,
+        directory: Path,
+        provider: str,
+        model: str,
+        max_requests: int,
+        max_bytes: int,
+        max_output_tokens: int,
+    ) -> None:
+        self._client = client
+        self._directory = directory
+        self._provider = provider
+        self._model = model
+        self._max_requests = max(1, max_requests)
+        self._max_bytes = max_bytes
+        self._max_output_tokens = max_output_tokens
+        self._stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        self._lock = threading.Lock()
+        self._chunks: list[tuple[Path, list[dict[str, Any]]]] = []
+        self._chunk_bytes = 0
+        self._pending: set[str] = set()
+
+    @classmethod
+    def from_config(cls, cfg: Config, *, client: BatchClient) -> BatchSubmission:
+        """Build a submission for ``[llm]`` and ``[batch]``.
+
+        JSONL files go to ``[batch] directory``, or ``batches/`` next to the
+        database when it is empty.
+        """
+        directory = (
+            Path(cfg.batch.directory)
+            if cfg.batch.directory
+            else Path(cfg.database.path).parent / "batches"
+        )
+        return cls(
+            client=client,
+            directory=directory,
+            provider=cfg.llm.provider,
+            model=cfg.llm.model,
+            max_requests=cfg.batch.max_requests_per_job,
+            max_bytes=cfg.batch.max_bytes_per_job,
+            max_output_tokens=cfg.batch.max_output_tokens,
+        )
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, exc_type: type[BaseException] | None, *exc: object) -> None:
+        """On error, delete the JSONL files that were not submitted."""
+        with self._lock:
+            if exc_type is None:
+                return
+            # 中断した実行の書きかけのファイルは残さない（対象ファイルは次回投入し直す）
+            for path, _ in self._chunks:
+                path.unlink(missing_ok=True)
+            self._chunks.clear()
+
+    def load_pending(self, db: Path | TriageDatabase) -> None:
+        """Load the files of earlier jobs that have not been collected yet."""
+        with open_database(db) as conn:
+            self._pending = conn.pending_batch_paths()
+
+    def is_pending(self, file_path: Path) -> bool:
+        """Return True if the file is already waiting in a submitted job."""
+        return str(file_path) in self._pending
+
+    def add(
+        self,
+        *,
+        file_path: Path,
+        checksum: str,
+        file_stat: os.stat_result,
+        prompt: Prompt,
+        extracted_text_length: int,
+        truncated: bool,
+    ) -> None:
+        """Append the classification request of one file."""
+        with self._lock:
+            if not self._chunks or len(self._chunks[-1][1]) >= self._max_requests:
+                self._open_chunk()
+            custom_id = f"doc-{len(self._chunks[-1][1]) + 1}"
+            data = self._encode(prompt, custom_id=custom_id)
+            # 容量上限を超えるなら次のファイルへ（空のファイルには必ず1件入れる）
+            if custom_id != "doc-1" and (
+                self._chunk_bytes + len(data) > self._max_bytes
+            ):
+                self._open_chunk()
+                custom_id = "doc-1"
+                data = self._encode(prompt, custom_id=custom_id)
+            path, items = self._chunks[-1]
+            with open(path, "ab") as f:
+                f.write(data)
+            self._chunk_bytes += len(data)
+            items.append(
+                {
+                    "custom_id": custom_id,
+                    "source_path": str(file_path),
+                    "checksum": checksum,
+                    "file_size": file_stat.st_size,
+                    "file_mtime_ns": file_stat.st_mtime_ns,
+                    "file_inode": file_stat.st_ino,
+                    "extracted_text_length": extracted_text_length,
+                    "truncated": truncated,
+                }
+            )
+        logger.info("  バッチに追加: %s", custom_id)
+
+    def _encode(self, prompt: Prompt, *, custom_id: str) -> bytes:
+        line = self._client.request_line(
+            custom_id=custom_id,
+            prompt=prompt,
+            model=self._model,
+            max_tokens=self._max_output_tokens,
+        )
+        return (json.dumps(line, ensure_ascii=False) + "\n").encode("utf-8")
+
+    def _open_chunk(self) -> None:
+        self._directory.mkdir(parents=True, exist_ok=True)
+        path = self._directory / f"{self._stamp}-{len(self._chunks) + 1:03d}.jsonl"
+        self._chunks.append((path, []))
+        self._chunk_bytes = 0
+
+    def submit(self, db: Path | TriageDatabase) -> list[str]:
+        """Submit every JSONL file as a batch job and record it.
+
+        Returns:
+            The ids of the submitted jobs.
+
+        Raises:
+            BatchApiError: If the provider rejects a job. Jobs submitted before
+                it stay recorded; the files of the rest are submitted again by
+                the next run.
+        """
+        job_ids: list[str] = []
+        while self._chunks:
+            path, items = self._chunks[0]
+            job_id = self._client.submit(path)
+            with open_database(db) as conn:
+                conn.add_batch_job(
+                    {
+                        "job_id": job_id,
+                        "llm_provider": self._provider,
+                        "llm_model": self._model,
+                        "input_path": str(path),
+                        "submitted_at": datetime.now(),
+                    },
+                    items,
+                )
+            logger.info("バッチジョブ投入: %s（%d 件, %s）", job_id, len(items), path)
+            job_ids.append(job_id)
+            self._chunks.pop(0)
+        return job_ids
+
+
+def collect_batches(
+    *,
+    cfg: Config,
+    client: BatchClient,
+    db: Path | TriageDatabase,
+) -> dict[str, int]:
+    """Fetch the results of ended batch jobs, then move and record their files.
+
+    Jobs still running are left for a later call. A request without a usable
+    result, or whose file was changed or removed after submission, is not
+    recorded, so the next ``run --batch-submit`` submits the file again.
+
+    Returns:
+        dict with counts: jobs (collected), running, evergreen, temporal,
+        unknown, error, and unresolved (requests left for resubmission).
+    """
+    summary: dict[str, int] = {
+        "jobs": 0,
+        "running": 0,
+        "evergreen": 0,
+        "temporal": 0,
+        "unknown": 0,
+        "error": 0,
+        "unresolved": 0,
+    }
+    with open_database(db) as conn:
+        for job in conn.list_pending_batch_jobs():
+            job_id = job["job_id"]
+            state = client.poll(job_id)
+            if not state.ended:
+                logger.info("バッチジョブ処理中: %s (%s)", job_id, state.status)
+                summary["running"] += 1
+                continue
+
+            logger.info("バッチジョブ回収: %s (%s)", job_id, state.status)
+            results = {result.custom_id: result for result in client.results(job_id)}
+            for item in conn.get_batch_items(job_id):
+                outcome = _collect_item(
+                    item,
+                    results.get(item["custom_id"]),
+                    cfg=cfg,
+                    db=conn,
+                    llm_provider=job["llm_provider"],
+                    llm_model=job["llm_model"],
+                )
+                if outcome is None:
+                    summary["unresolved"] += 1
+                elif outcome["error"]:
+                    summary["error"] += 1
+                else:
+                    summary[outcome["triage"]] += 1
+            # 結果の書き込みを確定させてから回収済みにする（途中で落ちても再回収できる）
+            conn.flush()
+            conn.mark_batch_job_collected(job_id, status=state.status)
+            summary["jobs"] += 1
+
+    logger.info("--- バッチ回収サマリー ---")
+    logger.info("回収ジョブ: %d（処理中: %d）", summary["jobs"], summary["running"])
+    logger.info("  evergreen: %d", summary["evergreen"])
+    logger.info("  temporal:  %d", summary["temporal"])
+    logger.info("  unknown:   %d", summary["unknown"])
+    logger.info("  エラー:    %d", summary["error"])
+    logger.info("  再投入待ち: %d", summary["unresolved"])
+    return summary
+
+
+def _collect_item(
+    item: dict[str, Any],
+    result: BatchResult | None,
+    *,
+    cfg: Config,
+    db: TriageDatabase,
+    llm_provider: str,
+    llm_model: str | None,
+) -> dict[str, Any] | None:
+    """Apply one batch result. Returns None if the file is left unrecorded."""
+    file_path = Path(item["source_path"])
+    logger.info("%s", file_path)
+    if result is None or result.text is None:
+        logger.warning(
+            "  バッチ結果なし（次回の投入で再実行）: %s",
+            result.error if result is not None else "応答なし",
+        )
+        return None
+    try:
+        file_stat = file_path.stat()
+    except FileNotFoundError:
+        logger.warning("  ファイルが見つからないためスキップ")
+        return None
+    if (file_stat.st_size, file_stat.st_mtime_ns) != (
+        item["file_size"],
+        item["file_mtime_ns"],
+    ):
+        logger.warning("  投入後に変更されたためスキップ（次回の投入で再実行）")
+        return None
+
+    cls_result = apply_threshold(
+        parse_classify_response(result.text),
+        threshold=cfg.triage.confidence_threshold,
+    )
+    logger.info(
+        "  分類: %s (%.2f) - %s",
+        cls_result.triage,
+        cls_result.confidence,
+        cls_result.reason,
+    )
+    destination_path = move_to_triage(file_path, cfg=cfg, triage=cls_result.triage)
+    record_result(
+        db=db,
+        cfg=cfg,
+        file_path=file_path,
+        checksum=item["checksum"],
+        file_stat=file_stat,
+        triage=cls_result.triage,
+        confidence=cls_result.confidence,
+        reason=cls_result.reason,
+        topics=cls_result.topics,
+        extracted_text_length=item["extracted_text_length"] or 0,
+        truncated=bool(item["truncated"]),
+        error_message=cls_result.error,
+        destination_path=destination_path,
+        llm_provider=llm_provider,
+        llm_model=llm_model,
+    )
+    return {
+        "triage": cls_result.triage,
+        "error": cls_result.error,
+        "destination_path": destination_path,
+    }
@@ -0,0 +1,202 @@
+"""Bounded text extraction module for doc-triager.
+
+``truncate_text`` keeps only the head and tail of a document's text, so for
+long PDFs and presentations these readers convert just the leading and
+trailing pages or slides needed to fill that budget instead of the whole
+file. Workbooks can only be read front to back, so only their leading rows
+are read. The format libraries are the ones MarkItDown itself uses.
+"""
+
+from __future__ import annotations
+
+import io
+import logging
+from collections.abc import Callable, Iterable, Iterator
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+OMITTED_MARKER = "\n\n[...omitted...]\n\n"
+
+
+@dataclass
+class BoundedText:
+    """Text extracted from the head and tail of a document.
+
+    ``exact`` is set when a complete text is identical to MarkItDown's output
+    for the file, so it may stand in for the full conversion.
+    """
+
+    text: str
+    complete: bool
+    exact: bool = False
+
+
+def extract_bounded(file_path: Path, *, max_chars: int) -> BoundedText | None:
+    """Extract only as much of ``file_path`` as a ``max_chars`` budget needs.
+
+    Args:
+        file_path: Path to the file.
+        max_chars: Text budget later applied by ``truncate_text``.
+
+    Returns:
+        BoundedText, complete when the whole document fit the budget, or None
+        when the format is not supported.
+    """
+    reader = _READERS.get(file_path.suffix.lower())
+    if reader is None or max_chars <= 0:
+        return None
+    head_chars = max_chars * 2 // 3
+    return reader(file_path, head_chars, max_chars - head_chars)
+
+
+def _head_tail(
+    count: int, render: Callable[[int], str], head_chars: int, tail_chars: int
+) -> tuple[str, bool]:
+    """Render units from both ends of a sequence until each budget is filled.
+
+    Returns the text and whether every unit was rendered.
+    """
+    head: list[str] = []
+    size = 0
+    start = 0
+    while start < count and size < head_chars:
+        head.append(render(start))
+        size += len(head[-1])
+        start += 1
+
+    tail: list[str] = []
+    size = 0
+    end = count
+    while end > start and size < tail_chars:
+        end -= 1
+        tail.append(render(end))
+        size += len(tail[-1])
+    tail.reverse()
+
+    if end == start:
+        return "".join(head + tail), True
+    return "".join(head) + OMITTED_MARKER + "".join(tail), False
+
+
+def _stream_head(chunks: Iterable[str], max_chars: int) -> tuple[str, bool]:
+    """Take chunks from the front of a stream until ``max_chars`` is filled.
+
+    Stops reading as soon as the budget is reached. Returns the text and
+    whether the stream was exhausted.
+    """
+    head: list[str] = []
+    size = 0
+    for chunk in chunks:
+        if size >= max_chars:
+            return "".join(head) + OMITTED_MARKER, False
+        head.append(chunk)
+        size += len(chunk)
+    return "".join(head), True
+
+
+def _read_pdf(file_path: Path, head_chars: int, tail_chars: int) -> BoundedText:
+    """Extract leading and trailing pages with pdfminer.
+
+    Page text is produced exactly as ``pdfminer.high_level.extract_text`` (and
+    so MarkItDown) would, so a document that fits the budget is returned whole.
+    """
+    from pdfminer.converter import TextConverter
+    from pdfminer.layout import LAParams
+    from pdfminer.pdfinterp import PDFPageInterpreter, PDFResourceManager
+    from pdfminer.pdfpage import PDFPage
+
+    with open(file_path, "rb") as fp:
+        # ページツリーの列挙は中身を解釈しないため安い
+        pages = list(PDFPage.get_pages(fp))
+        resources = PDFResourceManager(caching=True)
+        laparams = LAParams()
+
+        def render(index: int) -> str:
+            out = io.StringIO()
+            device = TextConverter(resources, out, laparams=laparams)
+            try:
+                PDFPageInterpreter(resources, device).process_page(pages[index])
+            finally:
+                device.close()
+            return out.getvalue()
+
+        text, complete = _head_tail(len(pages), render, head_chars, tail_chars)
+    return BoundedText(text=text, complete=complete, exact=complete)
+
+
+def _read_pptx(file_path: Path, head_chars: int, tail_chars: int) -> BoundedText:
+    """Extract leading and trailing slides with python-pptx."""
+    from pptx import Presentation
+
+    slides = list(Presentation(str(file_path)).slides)
+
+    def render(index: int) -> str:
+        lines = [f"<!-- Slide number: {index + 1} -->"]
+        for shape in slides[index].shapes:
+            lines.extend(_pptx_shape_lines(shape))
+        return "\n".join(lines) + "\n\n"
+
+    text, complete = _head_tail(len(slides), render, head_chars, tail_chars)
+    return BoundedText(text=text, complete=complete)
+
+
+def _pptx_shape_lines(shape: Any) -> Iterator[str]:
+    if getattr(shape, "has_table", False) and shape.has_table:
+        for row in shape.table.rows:
+            yield markdown_table_row(cell.text for cell in row.cells)
+    elif getattr(shape, "has_text_frame", False) and shape.has_text_frame:
+        text = shape.text_frame.text.strip()
+        if text:
+            yield f"# {text}" if shape.is_placeholder and _is_title(shape) else text
+
+
+def _is_title(shape: Any) -> bool:
+    from pptx.enum.shapes import PP_PLACEHOLDER
+
+    return shape.placeholder_format.type in (
+        PP_PLACEHOLDER.TITLE,
+        PP_PLACEHOLDER.CENTER_TITLE,
+    )
+
+
+def _read_xlsx(file_path: Path, head_chars: int, tail_chars: int) -> BoundedText:
+    """Stream leading rows with openpyxl in read-only mode.
+
+    Reaching the trailing rows would mean parsing every row before them, so
+    the whole budget goes to the leading rows and reading stops once it is
+    filled.
+    """
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        text, complete = _stream_head(_xlsx_chunks(workbook), head_chars + tail_chars)
+    finally:
+        workbook.close()
+    return BoundedText(text=text, complete=complete)
+
+
+def _xlsx_chunks(workbook: Any) -> Iterator[str]:
+    for sheet in workbook.worksheets:
+        yield f"## {sheet.title}\n"
+        for i, row in enumerate(sheet.iter_rows(values_only=True)):
+            yield markdown_table_row(row) + "\n"
+            if i == 0:
+                yield markdown_table_row("---" for _ in row) + "\n"
+        yield "\n"
+
+
+def markdown_table_row(cells: Iterable[Any]) -> str:
+    """Render one row of a Markdown table."""
+    values = ("" if v is None else str(v).replace("\n", " ") for v in cells)
+    return "| " + " | ".join(values) + " |"
+
+
+_READERS: dict[str, Callable[[Path, int, int], BoundedText]] = {
+    ".pdf": _read_pdf,
+    ".pptx": _read_pptx,
+    ".xlsx": _read_xlsx,
+}
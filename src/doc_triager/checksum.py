@@ -4,20 +4,26 @@ from __future__ import annotations
 
 import hashlib
 import logging
+import os
+from collections.abc import Mapping
 from pathlib import Path
+from typing import Any
 
-from doc_triager.database import get_by_source_path
+from doc_triager.database import TriageDatabase, get_processed_state
 
 logger = logging.getLogger(__name__)
 
-_BUF_SIZE = 65536  # 64KB
+_BUF_SIZE = 1024 * 1024  # 1MB
 
 
-def compute_checksum(file_path: Path) -> str:
+def compute_checksum(file_path: Path, *, buf_size: int = _BUF_SIZE) -> str:
     """Compute SHA-256 checksum of a file.
 
+    hashlib releases the GIL while hashing, so this scales across threads.
+
     Args:
         file_path: Path to the file.
+        buf_size: Read buffer size in bytes.
 
     Returns:
         Hex-encoded SHA-256 digest.
@@ -30,28 +36,76 @@ def compute_checksum(file_path: Path) -> str:
         raise FileNotFoundError(msg)
 
     sha256 = hashlib.sha256()
-    with file_path.open("rb") as f:
-        while True:
-            data = f.read(_BUF_SIZE)
-            if not data:
-                break
-            sha256.update(data)
+    buf = bytearray(buf_size)
+    view = memoryview(buf)
+    with file_path.open("rb", buffering=0) as f:
+        while n := f.readinto(buf):
+            sha256.update(view[:n])
     return sha256.hexdigest()
 
 
-def is_processed(db_path: Path, file_path: Path) -> bool:
+def stat_matches(record: Mapping[str, Any], st: os.stat_result) -> bool:
+    """Check if a DB record's size, mtime and inode exactly match a stat result."""
+    return (
+        record.get("file_size") == st.st_size
+        and record.get("file_mtime_ns") == st.st_mtime_ns
+        and record.get("file_inode") == st.st_ino
+    )
+
+
+def is_unchanged(
+    db: Path | TriageDatabase,
+    file_path: Path,
+    *,
+    st: os.stat_result | None = None,
+) -> bool:
+    """Check if a processed file is unchanged using stat metadata only.
+
+    No file content is read.
+
+    Args:
+        db: Path to the SQLite database, or an open TriageDatabase.
+        file_path: Path to the file to check.
+        st: Precomputed stat result of the file.
+
+    Returns:
+        True if the file exists in DB with identical size, mtime and inode.
+    """
+    record = get_processed_state(db, str(file_path))
+    if record is None:
+        return False
+    return stat_matches(record, st if st is not None else file_path.stat())
+
+
+def is_processed(
+    db: Path | TriageDatabase,
+    file_path: Path,
+    *,
+    checksum: str | None = None,
+    paranoid: bool = False,
+) -> bool:
     """Check if a file has already been processed with the same checksum.
 
+    Unless ``paranoid`` is set, an exact size/mtime/inode match with the DB
+    record is treated as unchanged without hashing the file.
+
     Args:
-        db_path: Path to the SQLite database.
+        db: Path to the SQLite database, or an open TriageDatabase.
         file_path: Path to the file to check.
+        checksum: Precomputed checksum of the file. When omitted, the file is
+            hashed only if a DB record exists.
+        paranoid: Always compare checksums, ignoring the stat fast path.
 
     Returns:
         True if the file exists in DB with the same checksum, False otherwise.
     """
-    record = get_by_source_path(db_path, str(file_path))
+    record = get_processed_state(db, str(file_path))
     if record is None:
         return False
 
-    current_checksum = compute_checksum(file_path)
-    return record["checksum"] == current_checksum
+    if not paranoid and stat_matches(record, file_path.stat()):
+        return True
+
+    if checksum is None:
+        checksum = compute_checksum(file_path)
+    return record["checksum"] == checksum
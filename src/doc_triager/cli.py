@@ -5,15 +5,35 @@ from pathlib import Path
 
 import typer
 
-from doc_triager.config import load_config, resolve_config
-from doc_triager.database import init_database
+from doc_triager.batch_api import (
+    BatchApiError,
+    BatchClient,
+    BatchSubmission,
+    collect_batches,
+    create_batch_client,
+)
+from doc_triager.checksum import is_unchanged
+from doc_triager.config import Config, load_config, resolve_api_key, resolve_config
+from doc_triager.database import TriageDatabase
 from doc_triager.logging_config import setup_logging
 from doc_triager.pipeline import process_files
-from doc_triager.scanner import scan_files
+from doc_triager.scanner import iter_files
 
 app = typer.Typer()
 
 
+def _batch_client(cfg: Config) -> BatchClient:
+    """Build the provider batch API client for ``[llm]``."""
+    if cfg.llm.mode != "api":
+        msg = f'バッチAPIは mode = "api" でのみ使用できます: {cfg.llm.mode}'
+        raise ValueError(msg)
+    return create_batch_client(
+        cfg.llm.provider,
+        api_key=resolve_api_key(cfg, env_file=Path(".env")),
+        base_url=cfg.llm.base_url,
+    )
+
+
 @app.command()
 def run(
     source: str | None = typer.Option(
@@ -33,12 +53,34 @@ def run(
     extensions: str | None = typer.Option(
         None, "--extensions", help="Target extensions (comma-separated)"
     ),
+    workers: int | None = typer.Option(
+        None, "--workers", "-w", help="Number of files classified concurrently"
+    ),
+    paranoid: bool = typer.Option(
+        False,
+        "--paranoid",
+        help="Re-hash every file instead of trusting unchanged size/mtime/inode",
+    ),
+    batch_submit: bool = typer.Option(
+        False,
+        "--batch-submit",
+        help="Submit requests as a provider batch job (finish with batch-collect)",
+    ),
 ) -> None:
     """Triage documents in the source directory."""
     config_path = Path(config) if config else Path("config.toml")
     try:
         cfg = load_config(config_path)
-        cfg = resolve_config(cfg, source=source, output=output)
+        cfg = resolve_config(cfg, source=source, output=output, workers=workers)
+        if batch_submit and cfg.text_extraction.llm_summary_enabled:
+            # バッチジョブは分類リクエストだけを送るため、要約は作られない
+            msg = "--batch-submit は llm_summary_enabled = true と併用できません"
+            raise ValueError(msg)
+        batch_submission = (
+            BatchSubmission.from_config(cfg, client=_batch_client(cfg))
+            if batch_submit and not dry_run
+            else None
+        )
     except (FileNotFoundError, ValueError) as e:
         typer.echo(f"Error: {e}", err=True)
         raise typer.Exit(code=1) from e
@@ -51,35 +93,78 @@ def run(
     logger.info("Output: %s", cfg.output.directory)
     logger.info("Dry run: %s", dry_run)
     logger.info("LLM: %s/%s", cfg.llm.provider, cfg.llm.model)
+    logger.info("Workers: %d", cfg.processing.workers)
 
     target_ext = (
         [f".{e.strip('.')}" for e in extensions.split(",")] if extensions else None
     )
-    files = scan_files(
-        Path(cfg.input.directory),
-        exclude_patterns=cfg.input.exclude_patterns,
-        target_extensions=target_ext,
-    )
-
     effective_limit = limit if limit is not None else cfg.input.max_files or None
     if effective_limit is not None:
-        files = files[:effective_limit]
-
-    logger.info("対象ファイル数: %d", len(files))
-
-    # DB初期化
-    init_database(Path(cfg.database.path))
+        logger.info("処理上限: %d 件", effective_limit)
 
     debug_dir = (
         Path(cfg.text_extraction.debug_dir) if cfg.text_extraction.debug_dir else None
     )
 
-    process_files(
-        files=files,
-        cfg=cfg,
-        dry_run=dry_run,
-        debug_dir=debug_dir,
-    )
+    # DB初期化（接続は実行全体で共有する）
+    with TriageDatabase.from_config(cfg.database) as db:
+        db.init_schema()
+        db.preload_processed()
+
+        # スキャンしながら順次処理する（出力先がソース配下にあっても辿らない）。
+        # 上限指定時は処理済みファイルを数えず、必要件数に達した時点で走査を打ち切る
+        files = iter_files(
+            Path(cfg.input.directory),
+            exclude_patterns=cfg.input.exclude_patterns,
+            target_extensions=target_ext,
+            prune_dirs=[Path(cfg.output.directory)],
+            skip=(
+                (lambda p: is_unchanged(db, p))
+                if effective_limit is not None and not paranoid
+                else None
+            ),
+            limit=effective_limit,
+        )
+
+        try:
+            process_files(
+                files=files,
+                cfg=cfg,
+                dry_run=dry_run,
+                debug_dir=debug_dir,
+                paranoid=paranoid,
+                db=db,
+                batch_submission=batch_submission,
+            )
+        except BatchApiError as e:
+            typer.echo(f"Error: {e}", err=True)
+            raise typer.Exit(code=1) from e
+
+
+@app.command("batch-collect")
+def batch_collect(
+    config: str | None = typer.Option(None, "--config", "-c", help="Config file path"),
+    verbose: bool = typer.Option(False, "--verbose", "-v", help="Verbose logging"),
+) -> None:
+    """Collect finished batch jobs, then move and record their files."""
+    config_path = Path(config) if config else Path("config.toml")
+    try:
+        cfg = resolve_config(load_config(config_path))
+        client = _batch_client(cfg)
+    except (FileNotFoundError, ValueError) as e:
+        typer.echo(f"Error: {e}", err=True)
+        raise typer.Exit(code=1) from e
+
+    log_level = "DEBUG" if verbose else cfg.logging.level
+    setup_logging(level=log_level, log_file=cfg.logging.file)
+
+    with TriageDatabase.from_config(cfg.database) as db:
+        db.init_schema()
+        try:
+            collect_batches(cfg=cfg, client=client, db=db)
+        except BatchApiError as e:
+            typer.echo(f"Error: {e}", err=True)
+            raise typer.Exit(code=1) from e
 
 
 @app.command()
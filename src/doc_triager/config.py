@@ -32,11 +32,17 @@ class OutputConfig:
 class TriageConfig:
     confidence_threshold: float = 0.7
     max_input_tokens: int = 8000
+    tokenizer: str = "estimate"
+    prompt_dir: str = ""
+    batch_size: int = 1
+    batch_wait_ms: int = 2000
 
 
 @dataclass
 class RateLimitConfig:
     requests_per_minute: int = 30
+    tokens_per_minute: int = 0
+    burst: int = 1
     max_retries: int = 3
     retry_delay_sec: int = 5
     request_timeout_sec: int = 120
@@ -55,6 +61,9 @@ class LlmConfig:
 @dataclass
 class DatabaseConfig:
     path: str = "./triage.db"
+    flush_rows: int = 100
+    flush_interval_ms: int = 1000
+    keep_history: bool = False
 
 
 @dataclass
@@ -62,6 +71,28 @@ class TextExtractionConfig:
     min_text_length: int = 100
     llm_summary_enabled: bool = False
     debug_dir: str = ""
+    cache_dir: str = ""
+    cache_max_mb: int = 1024
+    bounded_extraction: bool = True
+
+
+@dataclass
+class ProcessingConfig:
+    workers: int = 1
+    hash_workers: int = 4
+    hash_buffer_size: int = 1024 * 1024
+    extract_workers: int = 0
+    extract_max_tasks_per_child: int = 50
+    extract_timeout_sec: int = 600
+    extract_memory_mb: int = 0
+
+
+@dataclass
+class BatchConfig:
+    directory: str = ""
+    max_requests_per_job: int = 1000
+    max_bytes_per_job: int = 100 * 1024 * 1024
+    max_output_tokens: int = 1024
 
 
 @dataclass
@@ -78,6 +109,8 @@ class Config:
     llm: LlmConfig = field(default_factory=LlmConfig)
     database: DatabaseConfig = field(default_factory=DatabaseConfig)
     text_extraction: TextExtractionConfig = field(default_factory=TextExtractionConfig)
+    processing: ProcessingConfig = field(default_factory=ProcessingConfig)
+    batch: BatchConfig = field(default_factory=BatchConfig)
     logging: LoggingConfig = field(default_factory=LoggingConfig)
 
 
@@ -114,6 +147,8 @@ def load_config(path: Path) -> Config:
     text_extraction = _build_dataclass(
         TextExtractionConfig, raw.get("text_extraction", {})
     )
+    processing = _build_dataclass(ProcessingConfig, raw.get("processing", {}))
+    batch = _build_dataclass(BatchConfig, raw.get("batch", {}))
     logging_config = _build_dataclass(LoggingConfig, raw.get("logging", {}))
 
     return Config(
@@ -123,6 +158,8 @@ def load_config(path: Path) -> Config:
         llm=llm,
         database=database,
         text_extraction=text_extraction,
+        processing=processing,
+        batch=batch,
         logging=logging_config,
     )
 
@@ -132,12 +169,15 @@ def resolve_config(
     *,
     source: str | None = None,
     output: str | None = None,
+    workers: int | None = None,
 ) -> Config:
     """Apply CLI overrides and validate required fields."""
     if source is not None:
         config.input.directory = source
     if output is not None:
         config.output.directory = output
+    if workers is not None:
+        config.processing.workers = workers
 
     if not config.input.directory:
         msg = "input ディレクトリが指定されていません（CLIオプション --source または設定ファイル [input] directory）"
@@ -145,6 +185,9 @@ def resolve_config(
     if not config.output.directory:
         msg = "output ディレクトリが指定されていません（CLIオプション --output または設定ファイル [output] directory）"
         raise ValueError(msg)
+    if config.processing.workers < 1:
+        msg = f"workers は 1 以上を指定してください: {config.processing.workers}"
+        raise ValueError(msg)
 
     return config
 
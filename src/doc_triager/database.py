@@ -3,9 +3,18 @@
 from __future__ import annotations
 
 import json
+import logging
 import sqlite3
+import threading
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager, suppress
+from datetime import datetime
 from pathlib import Path
-from typing import Any
+from typing import Any, Self
+
+from doc_triager.config import DatabaseConfig
+
+logger = logging.getLogger(__name__)
 
 _CREATE_TABLE = """\
 CREATE TABLE IF NOT EXISTS triage_results (
@@ -14,6 +23,8 @@ CREATE TABLE IF NOT EXISTS triage_results (
     destination_path TEXT,
     checksum TEXT NOT NULL,
     file_size INTEGER,
+    file_mtime_ns INTEGER,
+    file_inode INTEGER,
     file_extension TEXT,
     triage TEXT NOT NULL,
     confidence REAL,
@@ -24,6 +35,7 @@ CREATE TABLE IF NOT EXISTS triage_results (
     extracted_text_length INTEGER,
     truncated BOOLEAN,
     error_message TEXT,
+    dedup_of INTEGER,
     processed_at DATETIME NOT NULL,
     created_at DATETIME DEFAULT CURRENT_TIMESTAMP
 )
@@ -32,107 +44,432 @@ CREATE TABLE IF NOT EXISTS triage_results (
 _CREATE_INDEXES = [
     "CREATE INDEX IF NOT EXISTS idx_checksum ON triage_results (checksum)",
     "CREATE INDEX IF NOT EXISTS idx_triage ON triage_results (triage)",
-    "CREATE INDEX IF NOT EXISTS idx_source_path ON triage_results (source_path)",
 ]
 
+# 結果の追記履歴（現状テーブルで上書きされた過去の分類結果を残す）
+_CREATE_HISTORY_TABLE = """\
+CREATE TABLE IF NOT EXISTS triage_history (
+    id INTEGER PRIMARY KEY,
+    result_id INTEGER,
+    source_path TEXT NOT NULL,
+    destination_path TEXT,
+    checksum TEXT NOT NULL,
+    file_size INTEGER,
+    file_mtime_ns INTEGER,
+    file_inode INTEGER,
+    file_extension TEXT,
+    triage TEXT NOT NULL,
+    confidence REAL,
+    reason TEXT,
+    topics TEXT,
+    llm_provider TEXT,
+    llm_model TEXT,
+    extracted_text_length INTEGER,
+    truncated BOOLEAN,
+    error_message TEXT,
+    dedup_of INTEGER,
+    processed_at DATETIME NOT NULL,
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+)
+"""
 
-def _connect(db_path: Path) -> sqlite3.Connection:
-    conn = sqlite3.connect(db_path)
-    conn.row_factory = sqlite3.Row
-    return conn
+_CREATE_HISTORY_INDEX = (
+    "CREATE INDEX IF NOT EXISTS idx_history_source_path ON triage_history (source_path)"
+)
 
+# プロバイダのバッチAPIに投入して結果待ちのジョブ
+_CREATE_BATCH_JOBS_TABLE = """\
+CREATE TABLE IF NOT EXISTS batch_jobs (
+    id INTEGER PRIMARY KEY,
+    job_id TEXT NOT NULL UNIQUE,
+    llm_provider TEXT NOT NULL,
+    llm_model TEXT,
+    input_path TEXT,
+    request_count INTEGER,
+    status TEXT NOT NULL,
+    submitted_at DATETIME NOT NULL,
+    collected_at DATETIME
+)
+"""
 
-def init_database(db_path: Path) -> None:
-    """Create the triage_results table and indexes."""
-    conn = _connect(db_path)
-    try:
-        conn.execute(_CREATE_TABLE)
-        for idx_sql in _CREATE_INDEXES:
-            conn.execute(idx_sql)
-        conn.commit()
-    finally:
-        conn.close()
+# バッチジョブの各リクエストと対象ファイル（投入時点の状態）の対応
+_CREATE_BATCH_ITEMS_TABLE = """\
+CREATE TABLE IF NOT EXISTS batch_items (
+    job_id TEXT NOT NULL,
+    custom_id TEXT NOT NULL,
+    source_path TEXT NOT NULL,
+    checksum TEXT NOT NULL,
+    file_size INTEGER,
+    file_mtime_ns INTEGER,
+    file_inode INTEGER,
+    extracted_text_length INTEGER,
+    truncated BOOLEAN,
+    PRIMARY KEY (job_id, custom_id)
+)
+"""
 
+_BATCH_ITEM_COLUMNS = (
+    "job_id",
+    "custom_id",
+    "source_path",
+    "checksum",
+    "file_size",
+    "file_mtime_ns",
+    "file_inode",
+    "extracted_text_length",
+    "truncated",
+)
 
-def insert_result(db_path: Path, record: dict[str, Any]) -> None:
-    """Insert a triage result."""
-    topics = record.get("topics")
-    topics_json = json.dumps(topics) if topics is not None else None
 
-    processed_at = record["processed_at"]
-    if hasattr(processed_at, "isoformat"):
-        processed_at = processed_at.isoformat()
+# 既存DBに後から追加したカラム（init_database で ALTER TABLE する）
+_ADDED_COLUMNS = {
+    "file_mtime_ns": "INTEGER",
+    "file_inode": "INTEGER",
+    "dedup_of": "INTEGER",
+}
 
-    conn = _connect(db_path)
-    try:
-        conn.execute(
-            """\
-            INSERT INTO triage_results (
-                source_path, destination_path, checksum, file_size, file_extension,
-                triage, confidence, reason, topics,
-                llm_provider, llm_model, extracted_text_length, truncated,
-                error_message, processed_at
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """,
-            (
-                record["source_path"],
-                record.get("destination_path"),
-                record["checksum"],
-                record.get("file_size"),
-                record.get("file_extension"),
-                record["triage"],
-                record.get("confidence"),
-                record.get("reason"),
-                topics_json,
-                record.get("llm_provider"),
-                record.get("llm_model"),
-                record.get("extracted_text_length"),
-                record.get("truncated"),
-                record.get("error_message"),
-                processed_at,
-            ),
+# スキーマバージョン（PRAGMA user_version）
+#   0: source_path ごとに行が追記される旧形式
+#   2: triage_results は source_path を一意キーとする現状テーブル
+SCHEMA_VERSION = 2
+
+# 分類結果として書き込むカラム（_to_row の並び順）
+_RESULT_COLUMNS = (
+    "source_path",
+    "destination_path",
+    "checksum",
+    "file_size",
+    "file_mtime_ns",
+    "file_inode",
+    "file_extension",
+    "triage",
+    "confidence",
+    "reason",
+    "topics",
+    "llm_provider",
+    "llm_model",
+    "extracted_text_length",
+    "truncated",
+    "error_message",
+    "dedup_of",
+    "processed_at",
+)
+
+_UPSERT_RESULT = (
+    f"INSERT INTO triage_results ({', '.join(_RESULT_COLUMNS)}) "
+    f"VALUES ({', '.join('?' * len(_RESULT_COLUMNS))}) "
+    "ON CONFLICT (source_path) DO UPDATE SET "
+    + ", ".join(f"{col} = excluded.{col}" for col in _RESULT_COLUMNS[1:])
+)
+
+_APPEND_HISTORY = (
+    f"INSERT INTO triage_history (result_id, {', '.join(_RESULT_COLUMNS)}) "
+    f"SELECT id, {', '.join(_RESULT_COLUMNS)} FROM triage_results "
+    "WHERE source_path = ?"
+)
+
+
+_Row = tuple[Any, ...]
+
+# 処理済み判定に使うカラム（preload_processed でメモリに載せる）
+_PROCESSED_COLUMNS = ("checksum", "file_size", "file_mtime_ns", "file_inode")
+
+
+class ResultWriter:
+    """Background writer that inserts result rows in batches.
+
+    Rows are buffered and written in one transaction once ``flush_rows`` rows
+    are waiting or ``flush_interval_ms`` has passed, so at most that window of
+    results is lost on a crash. ``close`` writes out everything still buffered.
+    """
+
+    def __init__(
+        self,
+        write: Callable[[list[_Row]], None],
+        *,
+        flush_rows: int,
+        flush_interval_ms: int,
+    ) -> None:
+        self._write = write
+        self._flush_rows = max(1, flush_rows)
+        self._interval = flush_interval_ms / 1000 if flush_interval_ms > 0 else None
+        self._rows: list[_Row] = []
+        self._in_flight: list[_Row] = []
+        self._cond = threading.Condition()
+        self._write_lock = threading.Lock()
+        self._closed = False
+        self._error: Exception | None = None
+        self._thread = threading.Thread(target=self._run, name="db-writer", daemon=True)
+        self._thread.start()
+
+    def put(self, row: _Row) -> None:
+        """Queue a row for writing."""
+        with self._cond:
+            self._raise_error()
+            if self._closed:
+                msg = "ResultWriter は既にクローズされています"
+                raise RuntimeError(msg)
+            self._rows.append(row)
+            if len(self._rows) >= self._flush_rows:
+                self._cond.notify()
+
+    def has_pending(
+        self, *, source_path: str | None = None, checksum: str | None = None
+    ) -> bool:
+        """Return True if a not-yet-committed row has the given key."""
+        with self._cond:
+            return any(
+                row[0] == source_path or row[2] == checksum
+                for row in (*self._in_flight, *self._rows)
+            )
+
+    def flush(self) -> None:
+        """Write all buffered rows now and wait until they are committed."""
+        with self._write_lock:
+            with self._cond:
+                self._in_flight, self._rows = self._rows, []
+                rows = self._in_flight
+            try:
+                if rows:
+                    self._write(rows)
+            except Exception as e:
+                logger.error("DB書き込み失敗（%d 件）: %s", len(rows), e)
+                with self._cond:
+                    self._error = e
+                    self._rows[:0] = rows
+                raise
+            finally:
+                with self._cond:
+                    self._in_flight = []
+
+    def close(self) -> None:
+        """Flush remaining rows and stop the writer thread."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        self._thread.join()
+        with self._cond:
+            self._error = None
+        self.flush()
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                self._cond.wait_for(
+                    lambda: self._closed or len(self._rows) >= self._flush_rows,
+                    timeout=self._interval,
+                )
+                closed = self._closed
+            # 失敗は flush 内で記録され、次の put/close で呼び出し側に伝わる
+            with suppress(Exception):
+                self.flush()
+            if closed:
+                return
+
+    def _raise_error(self) -> None:
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise error
+
+
+class TriageDatabase:
+    """Run-scoped connection to the triage results database.
+
+    One connection is kept open for the whole run in WAL mode with
+    ``synchronous=NORMAL``, so per-file reads and commits avoid connection
+    setup and journal fsyncs. Statements are issued with fixed SQL text and
+    reuse the connection's prepared statement cache. The connection may be
+    shared across worker threads; every statement runs under a lock.
+
+    With ``flush_rows`` > 1, inserts are handed to a ResultWriter and committed
+    in batches. Lookups that could hit a buffered row flush it first, and
+    ``close`` (also reached on Ctrl-C via ``with``) flushes the rest.
+    """
+
+    def __init__(
+        self,
+        db_path: Path,
+        *,
+        flush_rows: int = 1,
+        flush_interval_ms: int = 0,
+        keep_history: bool = False,
+    ) -> None:
+        self.path = db_path
+        self._keep_history = keep_history
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._lock = threading.RLock()
+        self._writer = (
+            ResultWriter(
+                self._insert_rows,
+                flush_rows=flush_rows,
+                flush_interval_ms=flush_interval_ms,
+            )
+            if flush_rows > 1
+            else None
+        )
+        self._processed: dict[str, _Row] | None = None
+
+    @classmethod
+    def from_config(cls, config: DatabaseConfig) -> TriageDatabase:
+        """Open the database configured in ``[database]``."""
+        return cls(
+            Path(config.path),
+            flush_rows=config.flush_rows,
+            flush_interval_ms=config.flush_interval_ms,
+            keep_history=config.keep_history,
         )
-        conn.commit()
-    finally:
-        conn.close()
 
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Write out buffered results and close the connection."""
+        try:
+            if self._writer is not None:
+                self._writer.close()
+        finally:
+            with self._lock:
+                self._conn.close()
+
+    def flush(self) -> None:
+        """Commit buffered results now."""
+        if self._writer is not None:
+            self._writer.flush()
+
+    def _flush_if_pending(
+        self, *, source_path: str | None = None, checksum: str | None = None
+    ) -> None:
+        if self._writer is not None and self._writer.has_pending(
+            source_path=source_path, checksum=checksum
+        ):
+            self._writer.flush()
+
+    def init_schema(self) -> None:
+        """Create the tables and indexes, migrating older databases."""
+        with self._lock:
+            self._conn.execute(_CREATE_TABLE)
+            self._conn.execute(_CREATE_HISTORY_TABLE)
+            self._conn.execute(_CREATE_BATCH_JOBS_TABLE)
+            self._conn.execute(_CREATE_BATCH_ITEMS_TABLE)
+            _add_missing_columns(self._conn)
+            for idx_sql in [*_CREATE_INDEXES, _CREATE_HISTORY_INDEX]:
+                self._conn.execute(idx_sql)
+            self._conn.commit()
+            _migrate(self._conn)
+
+    def insert_result(self, record: dict[str, Any]) -> None:
+        """Insert a triage result (buffered when a writer is active)."""
+        row = _to_row(record)
+        if self._processed is not None:
+            self._processed[row[0]] = row[2:6]
+        if self._writer is not None:
+            self._writer.put(row)
+        else:
+            self._insert_rows([row])
 
-def get_by_source_path(db_path: Path, source_path: str) -> dict[str, Any] | None:
-    """Look up a result by source path."""
-    conn = _connect(db_path)
-    try:
-        cursor = conn.execute(
-            "SELECT * FROM triage_results WHERE source_path = ?",
+    def _insert_rows(self, rows: list[_Row]) -> None:
+        with self._lock, self._conn:
+            if not self._keep_history:
+                self._conn.executemany(_UPSERT_RESULT, rows)
+                return
+            # 上書きされる直前の行を履歴に移す（同じバッチ内の重複パスも1行ずつ）
+            for row in rows:
+                self._conn.execute(_APPEND_HISTORY, (row[0],))
+                self._conn.execute(_UPSERT_RESULT, row)
+
+    def _fetch_one(self, sql: str, params: tuple[Any, ...]) -> dict[str, Any] | None:
+        with self._lock:
+            row = self._conn.execute(sql, params).fetchone()
+        return dict(row) if row else None
+
+    def _fetch_all(
+        self, sql: str, params: tuple[Any, ...] = ()
+    ) -> list[dict[str, Any]]:
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [dict(row) for row in rows]
+
+    def get_by_source_path(self, source_path: str) -> dict[str, Any] | None:
+        """Look up the latest result for a source path."""
+        self._flush_if_pending(source_path=source_path)
+        return self._fetch_one(
+            "SELECT * FROM triage_results WHERE source_path = ? "
+            "ORDER BY id DESC LIMIT 1",
             (source_path,),
         )
-        row = cursor.fetchone()
-        return dict(row) if row else None
-    finally:
-        conn.close()
 
+    def preload_processed(self) -> int:
+        """Load the processed state of every source path into memory.
 
-def get_by_checksum(db_path: Path, checksum: str) -> dict[str, Any] | None:
-    """Look up a result by checksum."""
-    conn = _connect(db_path)
-    try:
-        cursor = conn.execute(
-            "SELECT * FROM triage_results WHERE checksum = ?",
-            (checksum,),
+        Reads checksum, size, mtime and inode of all rows in one sequential
+        scan; with several rows per source path the latest one wins. From then
+        on ``get_processed_state`` answers from memory, and inserts made
+        through this object keep the index current. Does nothing if the index
+        is already loaded.
+
+        Returns:
+            Number of distinct source paths in the index.
+        """
+        if self._processed is not None:
+            return len(self._processed)
+        self.flush()
+        index: dict[str, _Row] = {}
+        with self._lock:
+            cursor = self._conn.execute(
+                "SELECT source_path, checksum, file_size, file_mtime_ns, file_inode "
+                "FROM triage_results ORDER BY id"
+            )
+            for row in cursor:
+                index[row[0]] = (row[1], row[2], row[3], row[4])
+        self._processed = index
+        logger.debug("処理済みインデックス読込: %d 件", len(index))
+        return len(index)
+
+    def get_processed_state(self, source_path: str) -> dict[str, Any] | None:
+        """Look up checksum, size, mtime and inode of the latest result for a path.
+
+        Served from the in-memory index once ``preload_processed`` has run,
+        otherwise from the database.
+        """
+        if self._processed is None:
+            return self.get_by_source_path(source_path)
+        state = self._processed.get(source_path)
+        return dict(zip(_PROCESSED_COLUMNS, state, strict=True)) if state else None
+
+    def get_by_checksum(self, checksum: str) -> dict[str, Any] | None:
+        """Look up a result by checksum."""
+        self._flush_if_pending(checksum=checksum)
+        return self._fetch_one(
+            "SELECT * FROM triage_results WHERE checksum = ?", (checksum,)
         )
-        row = cursor.fetchone()
-        return dict(row) if row else None
-    finally:
-        conn.close()
 
+    def find_reusable_by_checksum(self, checksum: str) -> dict[str, Any] | None:
+        """Find the latest reusable result with the given checksum.
 
-def get_summary(db_path: Path) -> dict[str, int]:
-    """Get counts by triage category."""
-    conn = _connect(db_path)
-    try:
-        cursor = conn.execute(
+        Only error-free results whose file was moved qualify; rows left in
+        place (insufficient text, failed move) are not copied to duplicates.
+        """
+        self._flush_if_pending(checksum=checksum)
+        return self._fetch_one(
+            "SELECT * FROM triage_results WHERE checksum = ? "
+            "AND error_message IS NULL AND destination_path IS NOT NULL "
+            "ORDER BY id DESC LIMIT 1",
+            (checksum,),
+        )
+
+    def get_summary(self) -> dict[str, int]:
+        """Get counts by triage category."""
+        self.flush()
+        rows = self._fetch_all(
             "SELECT triage, COUNT(*) as cnt FROM triage_results GROUP BY triage"
         )
-        counts = {row["triage"]: row["cnt"] for row in cursor.fetchall()}
+        counts = {row["triage"]: row["cnt"] for row in rows}
         total = sum(counts.values())
         return {
             "evergreen": counts.get("evergreen", 0),
@@ -140,28 +477,236 @@ def get_summary(db_path: Path) -> dict[str, int]:
             "unknown": counts.get("unknown", 0),
             "total": total,
         }
-    finally:
-        conn.close()
-
 
-def list_by_triage(db_path: Path, triage: str) -> list[dict[str, Any]]:
-    """List all results with a given triage category."""
-    conn = _connect(db_path)
-    try:
-        cursor = conn.execute(
+    def list_by_triage(self, triage: str) -> list[dict[str, Any]]:
+        """List all results with a given triage category."""
+        self.flush()
+        return self._fetch_all(
             "SELECT * FROM triage_results WHERE triage = ? ORDER BY processed_at",
             (triage,),
         )
-        return [dict(row) for row in cursor.fetchall()]
-    finally:
-        conn.close()
+
+    def export_all(self) -> list[dict[str, Any]]:
+        """Export all triage results."""
+        self.flush()
+        return self._fetch_all("SELECT * FROM triage_results ORDER BY id")
+
+    def add_batch_job(self, job: dict[str, Any], items: list[dict[str, Any]]) -> None:
+        """Record a submitted batch job and the files of its requests."""
+        submitted_at = job["submitted_at"]
+        if hasattr(submitted_at, "isoformat"):
+            submitted_at = submitted_at.isoformat()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO batch_jobs (job_id, llm_provider, llm_model, input_path, "
+                "request_count, status, submitted_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    job["job_id"],
+                    job["llm_provider"],
+                    job.get("llm_model"),
+                    job.get("input_path"),
+                    len(items),
+                    job.get("status", "submitted"),
+                    submitted_at,
+                ),
+            )
+            self._conn.executemany(
+                f"INSERT INTO batch_items ({', '.join(_BATCH_ITEM_COLUMNS)}) "
+                f"VALUES ({', '.join('?' * len(_BATCH_ITEM_COLUMNS))})",
+                [
+                    (job["job_id"], *(item.get(c) for c in _BATCH_ITEM_COLUMNS[1:]))
+                    for item in items
+                ],
+            )
+
+    def list_pending_batch_jobs(self) -> list[dict[str, Any]]:
+        """List batch jobs whose results have not been collected yet."""
+        return self._fetch_all(
+            "SELECT * FROM batch_jobs WHERE collected_at IS NULL ORDER BY id"
+        )
+
+    def get_batch_items(self, job_id: str) -> list[dict[str, Any]]:
+        """List the requests of a batch job in submission order."""
+        return self._fetch_all(
+            "SELECT * FROM batch_items WHERE job_id = ? ORDER BY rowid", (job_id,)
+        )
+
+    def pending_batch_paths(self) -> set[str]:
+        """Source paths submitted in a batch job that is not collected yet."""
+        rows = self._fetch_all(
+            "SELECT DISTINCT i.source_path FROM batch_items i "
+            "JOIN batch_jobs j ON j.job_id = i.job_id WHERE j.collected_at IS NULL"
+        )
+        return {row["source_path"] for row in rows}
+
+    def mark_batch_job_collected(self, job_id: str, *, status: str) -> None:
+        """Mark a batch job as collected with its final provider status."""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE batch_jobs SET status = ?, collected_at = ? WHERE job_id = ?",
+                (status, datetime.now().isoformat(), job_id),
+            )
+
+
+def _to_row(record: dict[str, Any]) -> _Row:
+    """Convert a result record to parameters in _RESULT_COLUMNS order."""
+    topics = record.get("topics")
+    topics_json = json.dumps(topics) if topics is not None else None
+
+    processed_at = record["processed_at"]
+    if hasattr(processed_at, "isoformat"):
+        processed_at = processed_at.isoformat()
+
+    return (
+        record["source_path"],
+        record.get("destination_path"),
+        record["checksum"],
+        record.get("file_size"),
+        record.get("file_mtime_ns"),
+        record.get("file_inode"),
+        record.get("file_extension"),
+        record["triage"],
+        record.get("confidence"),
+        record.get("reason"),
+        topics_json,
+        record.get("llm_provider"),
+        record.get("llm_model"),
+        record.get("extracted_text_length"),
+        record.get("truncated"),
+        record.get("error_message"),
+        record.get("dedup_of"),
+        processed_at,
+    )
+
+
+def _add_missing_columns(conn: sqlite3.Connection) -> None:
+    """Add columns introduced after the table was first created."""
+    existing = {
+        row["name"] for row in conn.execute("PRAGMA table_info(triage_results)")
+    }
+    for name, col_type in _ADDED_COLUMNS.items():
+        if name not in existing:
+            conn.execute(f"ALTER TABLE triage_results ADD COLUMN {name} {col_type}")
+
+
+def _migrate(conn: sqlite3.Connection) -> None:
+    """Bring an existing database up to SCHEMA_VERSION.
+
+    Version 0 databases may hold several rows per source_path. The latest row
+    (highest id) is kept as the current state, older rows are moved to
+    triage_history, ``dedup_of`` references are repointed to the kept rows, and
+    source_path becomes a unique key. Runs in one transaction.
+    """
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    if version >= SCHEMA_VERSION:
+        return
+
+    existing = {row[1] for row in conn.execute("PRAGMA table_info(triage_results)")}
+    columns = [col for col in _RESULT_COLUMNS if col in existing]
+    cols = ", ".join(columns)
+    t_cols = ", ".join(f"t.{col}" for col in columns)
+    latest = (
+        "SELECT source_path, MAX(id) AS id FROM triage_results GROUP BY source_path"
+    )
+    with conn:
+        moved = conn.execute(
+            f"INSERT INTO triage_history (result_id, {cols}) "
+            f"SELECT latest.id, {t_cols} FROM triage_results t "
+            f"JOIN ({latest}) latest ON latest.source_path = t.source_path "
+            "WHERE t.id <> latest.id"
+        ).rowcount
+        conn.execute(
+            "UPDATE triage_results SET dedup_of = ("
+            "SELECT MAX(l.id) FROM triage_results o "
+            "JOIN triage_results l ON l.source_path = o.source_path "
+            "WHERE o.id = triage_results.dedup_of"
+            ") WHERE dedup_of IS NOT NULL"
+        )
+        conn.execute(
+            "DELETE FROM triage_results WHERE id NOT IN "
+            "(SELECT MAX(id) FROM triage_results GROUP BY source_path)"
+        )
+        conn.execute("DROP INDEX IF EXISTS idx_source_path")
+        conn.execute(
+            "CREATE UNIQUE INDEX idx_source_path ON triage_results (source_path)"
+        )
+        conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+    if moved:
+        logger.info(
+            "DBスキーマを v%d に移行: 旧レコード %d 件を triage_history に移動",
+            SCHEMA_VERSION,
+            moved,
+        )
+
+
+@contextmanager
+def open_database(db: Path | TriageDatabase) -> Iterator[TriageDatabase]:
+    """Use an open TriageDatabase as-is, or open one for a path until exit."""
+    if isinstance(db, TriageDatabase):
+        yield db
+        return
+    with TriageDatabase(db) as opened:
+        yield opened
+
+
+# 以下はパス（または実行中の TriageDatabase）を受け取る単発呼び出し用のラッパー
+
+
+def init_database(db: Path | TriageDatabase) -> None:
+    """Create the triage_results table and indexes."""
+    with open_database(db) as conn:
+        conn.init_schema()
+
+
+def insert_result(db: Path | TriageDatabase, record: dict[str, Any]) -> None:
+    """Insert a triage result."""
+    with open_database(db) as conn:
+        conn.insert_result(record)
+
+
+def get_by_source_path(
+    db: Path | TriageDatabase, source_path: str
+) -> dict[str, Any] | None:
+    """Look up the latest result for a source path."""
+    with open_database(db) as conn:
+        return conn.get_by_source_path(source_path)
+
+
+def get_processed_state(
+    db: Path | TriageDatabase, source_path: str
+) -> dict[str, Any] | None:
+    """Look up the processed state (checksum, size, mtime, inode) of a path."""
+    with open_database(db) as conn:
+        return conn.get_processed_state(source_path)
+
+
+def get_by_checksum(db: Path | TriageDatabase, checksum: str) -> dict[str, Any] | None:
+    """Look up a result by checksum."""
+    with open_database(db) as conn:
+        return conn.get_by_checksum(checksum)
+
+
+def find_reusable_by_checksum(
+    db: Path | TriageDatabase, checksum: str
+) -> dict[str, Any] | None:
+    """Find the latest reusable (error-free, moved) result with the given checksum."""
+    with open_database(db) as conn:
+        return conn.find_reusable_by_checksum(checksum)
+
+
+def get_summary(db: Path | TriageDatabase) -> dict[str, int]:
+    """Get counts by triage category."""
+    with open_database(db) as conn:
+        return conn.get_summary()
+
+
+def list_by_triage(db: Path | TriageDatabase, triage: str) -> list[dict[str, Any]]:
+    """List all results with a given triage category."""
+    with open_database(db) as conn:
+        return conn.list_by_triage(triage)
 
 
-def export_all(db_path: Path) -> list[dict[str, Any]]:
+def export_all(db: Path | TriageDatabase) -> list[dict[str, Any]]:
     """Export all triage results."""
-    conn = _connect(db_path)
-    try:
-        cursor = conn.execute("SELECT * FROM triage_results ORDER BY id")
-        return [dict(row) for row in cursor.fetchall()]
-    finally:
-        conn.close()
+    with open_database(db) as conn:
+        return conn.export_all()
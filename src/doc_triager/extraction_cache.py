@@ -0,0 +1,161 @@
+"""Extraction cache module for doc-triager.
+
+Stores the Markdown produced by MarkItDown on disk, gzip-compressed and keyed
+by the file's SHA-256 checksum plus the converter version, so re-runs after a
+prompt, threshold or model change skip conversion entirely, even for files that
+were renamed or moved.
+"""
+
+from __future__ import annotations
+
+import functools
+import gzip
+import logging
+import os
+import tempfile
+import threading
+from importlib import metadata
+from pathlib import Path
+from typing import Any
+
+from doc_triager.config import TextExtractionConfig
+
+logger = logging.getLogger(__name__)
+
+# キャッシュ内容の形式や抽出結果が変わる変更をしたら上げる
+# （古いエントリは参照されなくなり、いずれ追い出される）
+# 2: PDF・PPTX・XLSX の先頭・末尾抽出
+# 3: テキスト形式の直接読み込み（native_readers）
+# 4: PPTX・XLSX の独自変換結果を全文として保存しない、XLSX は先頭のみ
+_CACHE_FORMAT = 4
+
+# 容量超過時は上限のこの割合まで削る（1件追加ごとの追い出しを避ける）
+_EVICT_TARGET_RATIO = 0.9
+
+_SUFFIX = ".md.gz"
+
+
+def converter_version() -> str:
+    """Return the version tag that cached text is keyed by."""
+    try:
+        version = metadata.version("markitdown")
+    except metadata.PackageNotFoundError:
+        version = "unknown"
+    return f"markitdown-{version}.f{_CACHE_FORMAT}"
+
+
+class ExtractionCache:
+    """Content-addressed, size-bounded cache of extracted text.
+
+    Entries live at ``<directory>/<checksum[:2]>/<checksum>.<version>.md.gz``.
+    A hit refreshes the entry's mtime, and when the total size exceeds
+    ``max_bytes`` the least recently used entries are deleted. Writes go
+    through a temporary file and ``os.replace``, so several processes can share
+    one cache directory.
+
+    Instances pickle to a per-process shared instance for the same directory,
+    so the cache can be passed to extraction worker processes.
+    """
+
+    def __init__(self, directory: Path, *, max_bytes: int) -> None:
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self._version = converter_version()
+        self._lock = threading.Lock()
+        self._size: int | None = None
+
+    @classmethod
+    def from_config(cls, config: TextExtractionConfig) -> ExtractionCache | None:
+        """Open the configured cache. Returns None when no cache_dir is set."""
+        if not config.cache_dir:
+            return None
+        return _open_cache(Path(config.cache_dir), config.cache_max_mb * 1024 * 1024)
+
+    def __reduce__(self) -> tuple[Any, ...]:
+        return _open_cache, (self.directory, self.max_bytes)
+
+    def get(self, checksum: str, *, variant: str = "") -> str | None:
+        """Return cached text for ``checksum``, or None on a miss.
+
+        ``variant`` distinguishes partial extractions of the same content.
+        """
+        path = self._path(checksum, variant)
+        try:
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                text = f.read()
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        except (OSError, EOFError, UnicodeDecodeError) as e:
+            logger.warning("抽出キャッシュ読み込み失敗: %s - %s", path.name, e)
+            return None
+        return text
+
+    def put(self, checksum: str, text: str, *, variant: str = "") -> None:
+        """Store ``text`` for ``checksum``. Failures are logged and ignored."""
+        path = self._path(checksum, variant)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_name = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+            try:
+                with (
+                    os.fdopen(fd, "wb") as raw,
+                    gzip.GzipFile(fileobj=raw, mode="wb", mtime=0) as f,
+                ):
+                    f.write(text.encode("utf-8"))
+                os.replace(tmp_name, path)
+            except BaseException:
+                Path(tmp_name).unlink(missing_ok=True)
+                raise
+            size = path.stat().st_size
+        except OSError as e:
+            logger.warning("抽出キャッシュ書き込み失敗: %s - %s", path.name, e)
+            return
+
+        with self._lock:
+            if self._size is None:
+                self._size = self._total_size()
+            else:
+                self._size += size
+            if self.max_bytes > 0 and self._size > self.max_bytes:
+                self._evict()
+
+    def _path(self, checksum: str, variant: str) -> Path:
+        key = f"{checksum}.{self._version}" + (f".{variant}" if variant else "")
+        return self.directory / checksum[:2] / f"{key}{_SUFFIX}"
+
+    def _entries(self) -> list[tuple[float, int, Path]]:
+        entries = []
+        for path in self.directory.glob(f"*/*{_SUFFIX}"):
+            try:
+                st = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+        return entries
+
+    def _total_size(self) -> int:
+        return sum(size for _, size, _ in self._entries())
+
+    def _evict(self) -> None:
+        """Delete least recently used entries (caller holds the lock)."""
+        # 他プロセスの書き込みも反映するため、追い出し時は実サイズを数え直す
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        target = int(self.max_bytes * _EVICT_TARGET_RATIO)
+        removed = 0
+        for _, size, path in entries:
+            if total <= target:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+            removed += 1
+        self._size = total
+        if removed:
+            logger.debug("抽出キャッシュから %d 件を削除", removed)
+
+
+@functools.cache
+def _open_cache(directory: Path, max_bytes: int) -> ExtractionCache:
+    """Return this process's shared cache instance for ``directory``."""
+    return ExtractionCache(directory, max_bytes=max_bytes)
@@ -0,0 +1,305 @@
+"""Sandboxed text extraction process pool for doc-triager.
+
+Runs ``extractor.extract_text`` in worker processes, each conversion under a
+wall-clock timeout and an address-space limit, so a single pathological file
+cannot stall or exhaust the whole run.
+"""
+
+from __future__ import annotations
+
+import logging
+import multiprocessing
+import signal
+import threading
+from collections.abc import Iterator
+from concurrent.futures import CancelledError, Future, ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Self
+
+from doc_triager.extraction_cache import ExtractionCache
+from doc_triager.extractor import (
+    ExtractionResult,
+    extract_text,
+    propagate_memory_errors,
+)
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None  # type: ignore[assignment]
+
+logger = logging.getLogger(__name__)
+
+# CPU 時間の上限はタイムアウトの何倍にするか（SIGALRM が効かない場合の保険）
+_CPU_LIMIT_FACTOR = 2
+
+# 親プロセスが結果を待つ時間はタイムアウトにこの秒数を足したもの
+# （SIGALRM も CPU 上限も効かないワーカーは、これを過ぎたら強制終了する）
+_WAIT_MARGIN_SEC = 30
+
+# 抽出がまだ開始していない（キュー待ちの）間、開始を確認する間隔（秒）
+_START_POLL_SEC = 1.0
+
+
+class _ExtractionTimeout(BaseException):
+    """Raised by SIGALRM in a worker. BaseException so converters can't swallow it."""
+
+
+def _init_worker(memory_mb: int) -> None:
+    """Worker process initializer: cap the address space."""
+    if memory_mb > 0 and resource is not None:
+        limit = memory_mb * 1024 * 1024
+        _, hard = resource.getrlimit(resource.RLIMIT_AS)
+        if hard != resource.RLIM_INFINITY:
+            limit = min(limit, hard)
+        resource.setrlimit(resource.RLIMIT_AS, (limit, hard))
+
+
+@contextmanager
+def _time_limit(timeout_sec: int) -> Iterator[None]:
+    """Interrupt the block after ``timeout_sec`` seconds of wall-clock time.
+
+    Uses SIGALRM, plus an RLIMIT_CPU backstop that terminates the worker if a
+    conversion spins in native code where the signal is never handled. Does
+    nothing when ``timeout_sec`` <= 0 or the platform lacks SIGALRM.
+    """
+    if timeout_sec <= 0 or not hasattr(signal, "SIGALRM"):
+        yield
+        return
+
+    def on_alarm(signum: int, frame: Any) -> None:
+        raise _ExtractionTimeout
+
+    previous = signal.signal(signal.SIGALRM, on_alarm)
+    cpu_limit = None
+    if resource is not None:
+        usage = resource.getrusage(resource.RUSAGE_SELF)
+        cpu_limit = resource.getrlimit(resource.RLIMIT_CPU)
+        soft = int(usage.ru_utime + usage.ru_stime) + timeout_sec * _CPU_LIMIT_FACTOR
+        if cpu_limit[1] != resource.RLIM_INFINITY:
+            soft = min(soft, cpu_limit[1])
+        resource.setrlimit(resource.RLIMIT_CPU, (soft, cpu_limit[1]))
+    signal.setitimer(signal.ITIMER_REAL, timeout_sec)
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+        if cpu_limit is not None:
+            resource.setrlimit(resource.RLIMIT_CPU, cpu_limit)
+
+
+def _extract_limited(
+    file_path: Path,
+    *,
+    timeout_sec: int,
+    memory_mb: int,
+    **kwargs: Any,
+) -> ExtractionResult:
+    """Run extract_text in a worker under the configured limits."""
+    try:
+        with _time_limit(timeout_sec), propagate_memory_errors():
+            return extract_text(file_path, **kwargs)
+    except _ExtractionTimeout:
+        logger.warning("テキスト抽出タイムアウト: %s", file_path.name)
+        return ExtractionResult(text=None, error=f"抽出タイムアウト（{timeout_sec}秒）")
+    except MemoryError:
+        logger.warning("テキスト抽出メモリ上限超過: %s", file_path.name)
+        return ExtractionResult(
+            text=None, error=f"抽出メモリ上限超過（{memory_mb} MB）"
+        )
+
+
+@dataclass
+class PendingExtraction:
+    """Extraction submitted to an ExtractionPool."""
+
+    file_path: Path
+    future: Future[ExtractionResult]
+    pool: ExtractionPool
+    executor: ProcessPoolExecutor
+    checksum: str | None = None
+
+    def result(self) -> ExtractionResult:
+        """Wait for the extraction. Never raises; failures become error results."""
+        return self.pool._collect(self)
+
+
+class ExtractionPool:
+    """Process pool running ``extract_text`` with per-file limits.
+
+    MarkItDown conversion is CPU-bound Python that holds the GIL, so separate
+    processes are needed to use more than one core. Each conversion runs under
+    ``timeout_sec`` of wall-clock time and a ``memory_mb`` address-space cap.
+    Workers are recycled after ``max_tasks_per_child`` files to contain leaks
+    in the converters.
+
+    If a worker process dies (killed by the CPU backstop or the OS), the pool
+    is rebuilt and every file that was in flight is re-run alone in a fresh
+    single-process pool, so only the file that actually breaks the worker is
+    recorded as failed. A worker that still has not answered
+    ``_WAIT_MARGIN_SEC`` after its timeout (blocked in native code or I/O,
+    where neither limit fires) is terminated and its file recorded as timed
+    out.
+    """
+
+    def __init__(
+        self,
+        *,
+        workers: int,
+        max_tasks_per_child: int | None = None,
+        timeout_sec: int = 0,
+        memory_mb: int = 0,
+        min_text_length: int,
+        source_dir: Path | None = None,
+        debug_dir: Path | None = None,
+        cache: ExtractionCache | None = None,
+        max_chars: int | None = None,
+    ) -> None:
+        self._workers = workers
+        self._max_tasks_per_child = max_tasks_per_child or None
+        self._timeout_sec = timeout_sec
+        self._memory_mb = memory_mb
+        self._task_kwargs: dict[str, Any] = {
+            "timeout_sec": timeout_sec,
+            "memory_mb": memory_mb,
+            "min_text_length": min_text_length,
+            "source_dir": source_dir,
+            "debug_dir": debug_dir,
+            "cache": cache,
+            "max_chars": max_chars,
+        }
+        self._lock = threading.Lock()
+        self._executor = self._new_executor(workers)
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Shut down the worker processes."""
+        with self._lock:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+
+    def submit(self, file_path: Path, checksum: str | None = None) -> PendingExtraction:
+        """Start extracting ``file_path`` in a worker process.
+
+        ``checksum`` keys the extraction cache, when one is configured.
+        """
+        with self._lock:
+            try:
+                future = self._submit(self._executor, file_path, checksum)
+            except BrokenProcessPool:
+                self._restart(self._executor)
+                future = self._submit(self._executor, file_path, checksum)
+            executor = self._executor
+        return PendingExtraction(
+            file_path=file_path,
+            future=future,
+            pool=self,
+            executor=executor,
+            checksum=checksum,
+        )
+
+    def _new_executor(self, workers: int) -> ProcessPoolExecutor:
+        # ハッシュ・LLM のスレッドが動いているプロセスから fork すると、
+        # 継承したロックでワーカーが固まることがあるため spawn で起動する
+        return ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            max_tasks_per_child=self._max_tasks_per_child,
+            initializer=_init_worker,
+            initargs=(self._memory_mb,),
+        )
+
+    def _submit(
+        self, executor: ProcessPoolExecutor, file_path: Path, checksum: str | None
+    ) -> Future[ExtractionResult]:
+        return executor.submit(
+            _extract_limited, file_path, checksum=checksum, **self._task_kwargs
+        )
+
+    def _restart(self, broken: ProcessPoolExecutor) -> None:
+        """Replace ``broken`` with a fresh executor (caller holds the lock)."""
+        if self._executor is broken:
+            logger.warning("抽出プロセスが異常終了したためプールを再作成します")
+            broken.shutdown(wait=False, cancel_futures=True)
+            self._executor = self._new_executor(self._workers)
+
+    def _wait(self, future: Future[ExtractionResult]) -> ExtractionResult:
+        """Wait for ``future``, giving up once it has run past the timeout.
+
+        Raises:
+            concurrent.futures.TimeoutError: If the extraction started but has
+                not finished ``timeout_sec + _WAIT_MARGIN_SEC`` seconds later.
+        """
+        if self._timeout_sec <= 0:
+            return future.result()
+        limit = self._timeout_sec + _WAIT_MARGIN_SEC
+        while True:
+            # キュー待ちの間は待ち時間に数えない
+            started = future.running()
+            try:
+                return future.result(timeout=limit if started else _START_POLL_SEC)
+            except FutureTimeout:
+                if started:
+                    raise
+
+    def _timed_out(
+        self, executor: ProcessPoolExecutor, file_path: Path
+    ) -> ExtractionResult:
+        """Kill the workers of ``executor`` and record ``file_path`` as timed out."""
+        logger.warning("テキスト抽出が応答しないためプロセスを停止: %s", file_path.name)
+        _terminate_workers(executor)
+        return ExtractionResult(
+            text=None, error=f"抽出タイムアウト（{self._timeout_sec}秒）"
+        )
+
+    def _collect(self, pending: PendingExtraction) -> ExtractionResult:
+        try:
+            return self._wait(pending.future)
+        except FutureTimeout:
+            with self._lock:
+                result = self._timed_out(pending.executor, pending.file_path)
+                self._restart(pending.executor)
+            return result
+        except (BrokenProcessPool, CancelledError):
+            pass
+
+        with self._lock:
+            self._restart(pending.executor)
+
+        # 巻き添えで失敗した可能性があるため、単独のプロセスで1回だけ再実行する
+        file_path = pending.file_path
+        logger.info("  抽出を単独プロセスで再実行: %s", file_path.name)
+        solo = self._new_executor(1)
+        try:
+            return self._wait(self._submit(solo, file_path, pending.checksum))
+        except FutureTimeout:
+            return self._timed_out(solo, file_path)
+        except BrokenProcessPool as e:
+            logger.warning("テキスト抽出失敗: %s - %s", file_path.name, e)
+            return ExtractionResult(
+                text=None,
+                error="抽出プロセス異常終了（CPU・メモリ上限超過の可能性）",
+            )
+        finally:
+            solo.shutdown(wait=True)
+
+
+def _terminate_workers(executor: ProcessPoolExecutor) -> None:
+    """Terminate the worker processes of ``executor``.
+
+    ProcessPoolExecutor cannot cancel a running call (``terminate_workers``
+    only arrives in Python 3.14), so the processes are stopped directly; the
+    executor then reports itself broken to every call still in flight.
+    """
+    processes = getattr(executor, "_processes", None) or {}
+    for process in list(processes.values()):
+        process.terminate()
@@ -1,18 +1,36 @@
-"""Text extraction module for doc-triager using MarkItDown."""
+"""Text extraction module for doc-triager.
+
+Plain-text formats are read natively; everything else goes through MarkItDown.
+"""
 
 from __future__ import annotations
 
 import logging
+import threading
+from collections.abc import Iterator
+from contextlib import contextmanager
 from dataclasses import dataclass
 from pathlib import Path
+from typing import TYPE_CHECKING
 
 from markitdown import MarkItDown
 
+from doc_triager.bounded_extraction import extract_bounded
+from doc_triager.native_readers import read_native
+
+if TYPE_CHECKING:
+    from doc_triager.extraction_cache import ExtractionCache
+    from doc_triager.tokenizer import Tokenizer
+
 logger = logging.getLogger(__name__)
 
 _DEFAULT_MIN_TEXT_LENGTH = 100
 _TRUNCATE_MARKER = "\n\n[...truncated...]\n\n"
 
+# MarkItDown はコンストラクタで全コンバータを登録するため、スレッドごとに1つを使い回す
+# （抽出プロセス内かどうかのフラグもここに持つ）
+_local = threading.local()
+
 
 @dataclass
 class ExtractionResult:
@@ -37,25 +55,47 @@ def extract_text(
     min_text_length: int = _DEFAULT_MIN_TEXT_LENGTH,
     source_dir: Path | None = None,
     debug_dir: Path | None = None,
+    checksum: str | None = None,
+    cache: ExtractionCache | None = None,
+    max_chars: int | None = None,
 ) -> ExtractionResult:
-    """Extract text from a file using MarkItDown.
+    """Extract text from a file.
+
+    .txt/.md/.csv/.json/.xml/.html files are decoded directly (see
+    ``native_readers``); binary formats are converted with MarkItDown.
 
     Args:
         file_path: Path to the file.
         min_text_length: Minimum text length to consider extraction sufficient.
         source_dir: Source root directory (used for relative path in debug output).
         debug_dir: If specified, write extracted text as .md files to this directory.
+        checksum: SHA-256 checksum of the file, the key into ``cache``.
+        cache: Extraction cache consulted before converting. Only used
+            together with ``checksum``.
+        max_chars: Text budget applied later by ``truncate_text``. When given,
+            long files are converted only as far as the head and tail of the
+            budget need (see ``bounded_extraction``).
 
     Returns:
         ExtractionResult with extracted text or error information.
     """
-    try:
-        md = MarkItDown()
-        result = md.convert(file_path)
-        text = result.markdown
-    except Exception as e:
-        logger.warning("テキスト抽出失敗: %s - %s", file_path.name, e)
-        return ExtractionResult(text=None, error=str(e))
+    text = _read_cache(cache, checksum, max_chars=max_chars)
+    if text is not None:
+        logger.debug("抽出キャッシュを使用: %s", file_path.name)
+    else:
+        try:
+            text, variant = _convert(file_path, max_chars=max_chars)
+        except MemoryError:
+            # 抽出プロセスのメモリ上限超過は呼び出し側（extraction_pool）で扱う
+            if getattr(_local, "propagate_memory_errors", False):
+                raise
+            logger.warning("テキスト抽出失敗: %s - メモリ不足", file_path.name)
+            return ExtractionResult(text=None, error="メモリ不足")
+        except Exception as e:
+            logger.warning("テキスト抽出失敗: %s - %s", file_path.name, e)
+            return ExtractionResult(text=None, error=str(e))
+        if cache is not None and checksum and text is not None:
+            cache.put(checksum, text, variant=variant)
 
     if debug_dir is not None and text:
         _write_debug_file(file_path, text, source_dir=source_dir, debug_dir=debug_dir)
@@ -72,6 +112,85 @@ def extract_text(
     return ExtractionResult(text=text)
 
 
+@contextmanager
+def propagate_memory_errors() -> Iterator[None]:
+    """Let MemoryError escape ``extract_text`` inside the block.
+
+    extraction_pool uses this in its workers to report the address-space cap
+    being hit. Elsewhere a MemoryError is recorded as an extraction error of
+    the file, like any other conversion failure.
+    """
+    previous = getattr(_local, "propagate_memory_errors", False)
+    _local.propagate_memory_errors = True
+    try:
+        yield
+    finally:
+        _local.propagate_memory_errors = previous
+
+
+def _bounded_variant(max_chars: int) -> str:
+    return f"bounded{max_chars}"
+
+
+def _read_cache(
+    cache: ExtractionCache | None, checksum: str | None, *, max_chars: int | None
+) -> str | None:
+    """Look up the full text first, then a head/tail extraction for this budget."""
+    if cache is None or not checksum:
+        return None
+    text = cache.get(checksum)
+    if text is None and max_chars:
+        text = cache.get(checksum, variant=_bounded_variant(max_chars))
+    return text
+
+
+def _convert(file_path: Path, *, max_chars: int | None) -> tuple[str | None, str]:
+    """Convert a file, head/tail-bounded when possible.
+
+    Returns the text and the cache variant it belongs to ("" for full text).
+    """
+    native = read_native(file_path, max_chars=max_chars)
+    if native is not None:
+        if native.complete or not max_chars:
+            return native.text, ""
+        return native.text, _bounded_variant(max_chars)
+
+    if max_chars:
+        try:
+            bounded = extract_bounded(file_path, max_chars=max_chars)
+        except MemoryError:
+            raise
+        except Exception as e:
+            # 部分抽出に失敗しても MarkItDown による全体変換で続行する
+            # （読み取り側の不具合を見逃さないようトレースバックも残す）
+            logger.debug(
+                "部分抽出失敗（全体を変換）: %s - %s", file_path.name, e, exc_info=True
+            )
+            bounded = None
+        if bounded is not None:
+            # MarkItDown と同じ全文でなければ、全文（""）とは別の版としてキャッシュする
+            if bounded.complete and bounded.exact:
+                return bounded.text, ""
+            if not bounded.complete:
+                logger.debug("先頭・末尾のみ抽出: %s", file_path.name)
+            return bounded.text, _bounded_variant(max_chars)
+    return _get_converter().convert(file_path).markdown, ""
+
+
+def _get_converter() -> MarkItDown:
+    """Return this thread's MarkItDown instance, creating it on first use.
+
+    Each worker thread (and each worker process, which has its own module
+    state) builds the converter once and reuses it for every file. The cache
+    is keyed by the class so that replacing ``MarkItDown`` takes effect.
+    """
+    cached = getattr(_local, "converter", None)
+    if cached is None or cached[0] is not MarkItDown:
+        cached = (MarkItDown, MarkItDown())
+        _local.converter = cached
+    return cached[1]
+
+
 def _write_debug_file(
     file_path: Path,
     text: str,
@@ -91,7 +210,9 @@ def _write_debug_file(
     logger.debug("デバッグ出力: %s", output_path)
 
 
-def truncate_text(text: str, *, max_length: int) -> TruncateResult:
+def truncate_text(
+    text: str, *, max_length: int, tokenizer: Tokenizer | None = None
+) -> TruncateResult:
     """Truncate text preserving head and tail portions.
 
     When text exceeds max_length, keeps the beginning and end of the text
@@ -99,11 +220,16 @@ def truncate_text(text: str, *, max_length: int) -> TruncateResult:
 
     Args:
         text: Original text.
-        max_length: Maximum allowed length.
+        max_length: Maximum allowed length, in tokens when ``tokenizer`` is
+            given, otherwise in characters.
+        tokenizer: Tokenizer used to count and cut the text.
 
     Returns:
         TruncateResult with possibly truncated text and truncation flag.
     """
+    if tokenizer is not None:
+        return _truncate_tokens(text, max_tokens=max_length, tokenizer=tokenizer)
+
     if len(text) <= max_length:
         return TruncateResult(text=text, truncated=False)
 
@@ -114,3 +240,23 @@ def truncate_text(text: str, *, max_length: int) -> TruncateResult:
 
     truncated = text[:head_len] + _TRUNCATE_MARKER + text[-tail_len:]
     return TruncateResult(text=truncated, truncated=True)
+
+
+def _truncate_tokens(
+    text: str, *, max_tokens: int, tokenizer: Tokenizer
+) -> TruncateResult:
+    """Token-budget variant of truncate_text: the result fits ``max_tokens``."""
+    # 先頭から予算分だけ数えれば、全文を数えずに収まるかどうか分かる
+    if len(tokenizer.head(text, max_tokens)) == len(text):
+        return TruncateResult(text=text, truncated=False)
+
+    available = max(0, max_tokens - tokenizer.count(_TRUNCATE_MARKER))
+    head_tokens = available * 2 // 3
+    tail_tokens = available - head_tokens
+
+    truncated = (
+        tokenizer.head(text, head_tokens)
+        + _TRUNCATE_MARKER
+        + tokenizer.tail(text, tail_tokens)
+    )
+    return TruncateResult(text=truncated, truncated=True)
@@ -4,17 +4,208 @@ Provides low-level LLM call implementations:
 - call_api: litellm-based API calls
 - call_claude: claude CLI subprocess calls
 - call_codex: codex CLI subprocess calls
+- call_with_retry: retry wrapper with exponential backoff for transient errors
 """
 
 from __future__ import annotations
 
 import logging
+import random
+import re
 import subprocess
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from typing import Any
 
 import litellm
 
+from doc_triager.config import RateLimitConfig
+from doc_triager.tokenizer import estimate_tokens
+
 logger = logging.getLogger(__name__)
 
+# リトライ対象とする HTTP ステータス（タイムアウト・競合・レート制限）
+_RETRYABLE_STATUS = {408, 409, 429}
+
+# CLI の stderr に含まれていれば一時的エラーとみなすパターン
+_TRANSIENT_CLI_STDERR = re.compile(
+    r"rate.?limit|too many requests|overloaded|temporarily unavailable"
+    r"|timed? ?out|connection (?:reset|refused|error)|econnreset|etimedout"
+    r"|\b(?:429|500|502|503|504|529)\b",
+    re.IGNORECASE,
+)
+
+# モデル名に claude を含む場合に cache_control を付けるプロバイダ（anthropic は常に付ける）
+_CACHE_CONTROL_PROVIDERS = {"bedrock", "vertex_ai"}
+
+# プロンプトキャッシュの対象になる接頭辞の最小トークン数（Anthropic・OpenAI とも 1024）
+MIN_CACHEABLE_TOKENS = 1024
+
+# Retry-After が極端に長い場合の上限（秒）
+_MAX_RETRY_AFTER_SEC = 300.0
+
+
+class CliError(RuntimeError):
+    """CLI exited with a non-zero return code."""
+
+    def __init__(self, returncode: int, stderr: str) -> None:
+        super().__init__(f"CLI実行失敗 (code={returncode}): {stderr}")
+        self.returncode = returncode
+        self.stderr = stderr
+
+
+@dataclass
+class RetryPolicy:
+    """Retry settings for LLM calls."""
+
+    max_retries: int = 0
+    base_delay_sec: float = 5.0
+    max_delay_sec: float = 60.0
+
+    @classmethod
+    def from_config(cls, config: RateLimitConfig) -> RetryPolicy:
+        return cls(
+            max_retries=config.max_retries,
+            base_delay_sec=config.retry_delay_sec,
+        )
+
+
+def is_retryable(exc: BaseException) -> bool:
+    """Return True if the error is transient and worth retrying.
+
+    Retryable: HTTP 408/409/429/5xx, timeouts, connection errors, and CLI
+    failures whose stderr looks transient. Everything else (authentication,
+    bad request, missing CLI, parse errors) is fatal.
+    """
+    if isinstance(exc, subprocess.TimeoutExpired | TimeoutError | ConnectionError):
+        return True
+    if isinstance(exc, CliError):
+        return bool(_TRANSIENT_CLI_STDERR.search(exc.stderr or ""))
+
+    status = getattr(exc, "status_code", None)
+    if isinstance(status, int):
+        return status in _RETRYABLE_STATUS or status >= 500
+    return isinstance(exc, litellm.Timeout | litellm.APIConnectionError)
+
+
+def _retry_after(exc: BaseException) -> float | None:
+    """Read the Retry-After header (seconds or HTTP date) from an API error."""
+    response = getattr(exc, "response", None)
+    headers = getattr(response, "headers", None) or getattr(
+        exc, "litellm_response_headers", None
+    )
+    if not headers:
+        return None
+    try:
+        value = headers.get("retry-after")
+    except AttributeError:
+        return None
+    if not value:
+        return None
+
+    try:
+        seconds = float(value)
+    except ValueError:
+        try:
+            seconds = parsedate_to_datetime(value).timestamp() - time.time()
+        except (TypeError, ValueError):
+            return None
+    return min(max(seconds, 0.0), _MAX_RETRY_AFTER_SEC)
+
+
+def _backoff_delay(policy: RetryPolicy, attempt: int) -> float:
+    """Exponential backoff with equal jitter for the given retry attempt."""
+    delay = min(policy.max_delay_sec, policy.base_delay_sec * (2**attempt))
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
+def call_with_retry[T](
+    func: Callable[[], T],
+    *,
+    policy: RetryPolicy,
+    sleep: Callable[[float], None] = time.sleep,
+) -> T:
+    """Call ``func``, retrying transient errors with exponential backoff.
+
+    Args:
+        func: Zero-argument callable performing one LLM call.
+        policy: Retry settings.
+        sleep: Sleep function (injectable for tests).
+
+    Returns:
+        The return value of ``func``.
+
+    Raises:
+        Exception: The last error, if it is fatal or retries are exhausted.
+    """
+    attempt = 0
+    while True:
+        try:
+            return func()
+        except Exception as e:
+            if attempt >= policy.max_retries or not is_retryable(e):
+                raise
+            retry_after = _retry_after(e)
+            delay = (
+                retry_after
+                if retry_after is not None
+                else _backoff_delay(policy, attempt)
+            )
+            attempt += 1
+            logger.warning(
+                "LLM呼び出し失敗、%.1f 秒後にリトライ (%d/%d): %s",
+                delay,
+                attempt,
+                policy.max_retries,
+                e,
+            )
+            sleep(delay)
+
+
+def supports_cache_control(model: str) -> bool:
+    """Return True if the model takes Anthropic ``cache_control`` markers."""
+    provider, _, name = model.partition("/")
+    return provider == "anthropic" or (
+        provider in _CACHE_CONTROL_PROVIDERS and "claude" in name.lower()
+    )
+
+
+def is_cacheable_prefix(system: str) -> bool:
+    """Return True if ``system`` is long enough for providers to cache.
+
+    Anthropic and OpenAI only cache prefixes of at least 1024 tokens (2048 for
+    Claude Haiku models); shorter ones are always billed in full.
+    """
+    return estimate_tokens(system) >= MIN_CACHEABLE_TOKENS
+
+
+def build_messages(
+    *, prompt: str, model: str, system: str | None = None
+) -> list[dict[str, Any]]:
+    """Build chat messages with the system part first, as a cacheable prefix.
+
+    OpenAI caches long identical prefixes automatically; for Claude models a
+    system part long enough to be cached (see ``is_cacheable_prefix``) is
+    marked with an explicit ephemeral ``cache_control``.
+    """
+    messages: list[dict[str, Any]] = []
+    if system:
+        if supports_cache_control(model) and is_cacheable_prefix(system):
+            content: Any = [
+                {
+                    "type": "text",
+                    "text": system,
+                    "cache_control": {"type": "ephemeral"},
+                }
+            ]
+        else:
+            content = system
+        messages.append({"role": "system", "content": content})
+    messages.append({"role": "user", "content": prompt})
+    return messages
+
 
 def call_api(
     *,
@@ -22,14 +213,16 @@ def call_api(
     model: str,
     timeout: int,
     api_base: str | None = None,
+    system: str | None = None,
 ) -> str:
     """Call LLM via litellm API.
 
     Args:
-        prompt: The prompt text.
+        prompt: The prompt text (user message).
         model: litellm model string (e.g. "openai/gpt-4o").
         timeout: Request timeout in seconds.
         api_base: Optional API base URL (for Ollama etc).
+        system: Optional system message, sent first so it can be cached.
 
     Returns:
         Raw response text from the LLM.
@@ -39,7 +232,7 @@ def call_api(
     """
     kwargs: dict = {
         "model": model,
-        "messages": [{"role": "user", "content": prompt}],
+        "messages": build_messages(prompt=prompt, model=model, system=system),
         "timeout": timeout,
     }
     if api_base:
@@ -70,7 +263,7 @@ def _run_cli(
     Raises:
         FileNotFoundError: If CLI command is not found.
         subprocess.TimeoutExpired: If CLI execution times out.
-        RuntimeError: If CLI exits with non-zero code.
+        CliError: If CLI exits with non-zero code.
     """
     if prompt is not None:
         logger.debug("CLIプロンプト: %s", prompt)
@@ -84,8 +277,7 @@ def _run_cli(
     )
 
     if result.returncode != 0:
-        msg = f"CLI実行失敗 (code={result.returncode}): {result.stderr}"
-        raise RuntimeError(msg)
+        raise CliError(result.returncode, result.stderr)
 
     logger.debug("CLIレスポンス: %s", result.stdout)
     return result.stdout
@@ -4,14 +4,23 @@ from __future__ import annotations
 
 import logging
 import shutil
+import threading
 from pathlib import Path
 
 logger = logging.getLogger(__name__)
 
+# 並列移動時に同じ移動先を二重に確保しないための予約テーブル
+_reserved: set[Path] = set()
+_reserved_lock = threading.Lock()
+
+
+def _is_taken(dest: Path) -> bool:
+    return dest.exists() or dest in _reserved
+
 
 def _resolve_destination(dest: Path) -> Path:
     """If dest already exists, add a numeric suffix to avoid overwriting."""
-    if not dest.exists():
+    if not _is_taken(dest):
         return dest
 
     stem = dest.stem
@@ -20,7 +29,7 @@ def _resolve_destination(dest: Path) -> Path:
     counter = 1
     while True:
         candidate = parent / f"{stem}_{counter}{suffix}"
-        if not candidate.exists():
+        if not _is_taken(candidate):
             return candidate
         counter += 1
 
@@ -51,11 +60,16 @@ def move_file(
         raise FileNotFoundError(msg)
 
     relative = file_path.relative_to(source_dir)
-    dest = output_dir / triage / relative
-    dest = _resolve_destination(dest)
+    with _reserved_lock:
+        dest = _resolve_destination(output_dir / triage / relative)
+        _reserved.add(dest)
 
-    dest.parent.mkdir(parents=True, exist_ok=True)
-    shutil.move(str(file_path), str(dest))
+    try:
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        shutil.move(str(file_path), str(dest))
+    finally:
+        with _reserved_lock:
+            _reserved.discard(dest)
 
     logger.info("移動: %s → %s", relative, dest.relative_to(output_dir))
     return dest
@@ -0,0 +1,245 @@
+"""Native readers for plain-text formats.
+
+.txt, .md, .csv, .json, .xml and .html need no conversion stack: they are
+decoded directly, and for files larger than the text budget only the head and
+tail bytes are read. HTML goes through a small ``html.parser`` based
+text extractor instead of BeautifulSoup.
+"""
+
+from __future__ import annotations
+
+import codecs
+import csv
+import io
+import os
+import re
+from collections.abc import Callable, Mapping
+from html.parser import HTMLParser
+from pathlib import Path
+from types import MappingProxyType
+from typing import ClassVar
+
+from doc_triager.bounded_extraction import (
+    OMITTED_MARKER,
+    BoundedText,
+    markdown_table_row,
+)
+
+# 文字コード判定に使う先頭バイト数
+_SNIFF_BYTES = 64 * 1024
+# UTF-8 の1文字の最大バイト数（これを掛ければ文字数の予算を必ず満たせる）
+_MAX_BYTES_PER_CHAR = 4
+# 末尾の読み始めで文字の途中から復帰するための余裕
+_TAIL_MARGIN_BYTES = 4096
+
+# UTF-8 として読めない BOM なしのファイルは、これらの厳密デコードを試す
+_JAPANESE_ENCODINGS = ("cp932", "euc-jp")
+# EUC-JP を cp932 として読むと2バイト文字の多くが半角カナ2文字に化ける
+_HALFWIDTH_KATAKANA = re.compile("[\uff61-\uff9f]")
+
+_BOMS = (
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+)
+
+_META_CHARSET = re.compile(
+    rb"""<meta[^>]+charset\s*=\s*["']?([\w.:-]+)""", re.IGNORECASE
+)
+
+
+def read_native(file_path: Path, *, max_chars: int | None) -> BoundedText | None:
+    """Read a plain-text format without MarkItDown.
+
+    Args:
+        file_path: Path to the file.
+        max_chars: Text budget later applied by ``truncate_text``. Larger
+            files are read only at the head and tail. None reads everything.
+
+    Returns:
+        BoundedText, or None when the format needs MarkItDown.
+    """
+    reader = _READERS.get(file_path.suffix.lower())
+    if reader is None:
+        return None
+    return reader(file_path, max_chars)
+
+
+def detect_encoding(sample: bytes) -> str:
+    """Guess the encoding of a text file from its first bytes."""
+    for bom, encoding in _BOMS:
+        if sample.startswith(bom):
+            return encoding
+    if _decode_sample(sample, "utf-8") is not None:
+        return "utf-8"
+    # 短い EUC-JP は cp932 としても読めてしまうため、両方で読めた場合は
+    # 半角カナの少ない方を採る（同数なら cp932）
+    best: tuple[int, str] | None = None
+    for encoding in _JAPANESE_ENCODINGS:
+        text = _decode_sample(sample, encoding)
+        if text is None:
+            continue
+        halfwidth = len(_HALFWIDTH_KATAKANA.findall(text))
+        if best is None or halfwidth < best[0]:
+            best = (halfwidth, encoding)
+    return best[1] if best is not None else "latin-1"
+
+
+def _decode_sample(sample: bytes, encoding: str) -> str | None:
+    """Strictly decode ``sample``, or return None if it is not ``encoding``."""
+    try:
+        # 末尾で切れた多バイト文字は判定対象外にする
+        return codecs.getincrementaldecoder(encoding)().decode(sample, final=False)
+    except UnicodeDecodeError:
+        return None
+
+
+def _read_head_tail(file_path: Path, max_chars: int | None) -> tuple[str, str | None]:
+    """Decode a whole file, or only its head and tail if it exceeds the budget.
+
+    Returns ``(head, tail)``. ``tail`` is None when the whole file was read.
+    """
+    with open(file_path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        sample = f.read(_SNIFF_BYTES)
+        encoding = detect_encoding(sample)
+        f.seek(0)
+        # UTF-16 は途中から読むと境界が合わないため常に全体を読む
+        if (
+            not max_chars
+            or size <= max_chars * _MAX_BYTES_PER_CHAR + _TAIL_MARGIN_BYTES
+            or encoding == "utf-16"
+        ):
+            return f.read().decode(encoding, errors="replace"), None
+
+        head_chars = max_chars * 2 // 3
+        tail_chars = max_chars - head_chars
+        decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+        head = decoder.decode(f.read(head_chars * _MAX_BYTES_PER_CHAR))[:head_chars]
+
+        f.seek(size - tail_chars * _MAX_BYTES_PER_CHAR - _TAIL_MARGIN_BYTES)
+        tail_encoding = "utf-8" if encoding == "utf-8-sig" else encoding
+        tail = f.read().decode(tail_encoding, errors="ignore")[-tail_chars:]
+    return head, tail
+
+
+def _read_plain(file_path: Path, max_chars: int | None) -> BoundedText:
+    head, tail = _read_head_tail(file_path, max_chars)
+    if tail is None:
+        return BoundedText(text=head, complete=True)
+    return BoundedText(text=head + OMITTED_MARKER + tail, complete=False)
+
+
+def _read_csv(file_path: Path, max_chars: int | None) -> BoundedText:
+    """Render CSV as a Markdown table, as MarkItDown does."""
+    head, tail = _read_head_tail(file_path, max_chars)
+    if tail is None:
+        return BoundedText(text=_csv_table(head), complete=True)
+    # 途中で切れた行は捨てる
+    head = head[: head.rfind("\n") + 1]
+    tail = tail[tail.find("\n") + 1 :]
+    return BoundedText(
+        text=_csv_table(head) + OMITTED_MARKER + _csv_table(tail, header=False),
+        complete=False,
+    )
+
+
+def _csv_table(text: str, *, header: bool = True) -> str:
+    lines = []
+    for i, row in enumerate(csv.reader(io.StringIO(text, newline=""))):
+        lines.append(markdown_table_row(row))
+        if header and i == 0:
+            lines.append(markdown_table_row("---" for _ in row))
+    return "\n".join(lines)
+
+
+def _read_html(file_path: Path, max_chars: int | None) -> BoundedText:
+    """Extract the visible text of an HTML document.
+
+    The whole document is read, since tags and scripts can make up most of
+    the bytes; only the parsing is lighter than MarkItDown's.
+    """
+    data = file_path.read_bytes()
+    match = _META_CHARSET.search(data[:_SNIFF_BYTES])
+    encoding = None
+    if match is not None:
+        try:
+            encoding = codecs.lookup(match.group(1).decode("ascii")).name
+        except LookupError:
+            pass
+    text = data.decode(encoding or detect_encoding(data[:_SNIFF_BYTES]), "replace")
+    parser = _HtmlText()
+    parser.feed(text)
+    parser.close()
+    return BoundedText(text=parser.text(), complete=True)
+
+
+class _HtmlText(HTMLParser):
+    """Collect visible text, with Markdown headings and list markers."""
+
+    _SKIP: ClassVar[frozenset[str]] = frozenset(
+        {"head", "script", "style", "noscript", "template", "svg"}
+    )
+    _BLOCK: ClassVar[frozenset[str]] = frozenset(
+        {
+            "p", "div", "br", "hr", "tr", "table", "ul", "ol", "section",
+            "article", "header", "footer", "nav", "aside", "main",
+            "blockquote", "pre", "dl", "dt", "dd", "figure", "form",
+        }
+    )  # fmt: skip
+    _HEADINGS: ClassVar[Mapping[str, str]] = MappingProxyType(
+        {f"h{n}": "#" * n for n in range(1, 7)}
+    )
+
+    def __init__(self) -> None:
+        super().__init__(convert_charrefs=True)
+        self._parts: list[str] = []
+        self._skip_depth = 0
+        self._pre_depth = 0
+
+    def handle_starttag(self, tag: str, attrs: list[tuple[str, str | None]]) -> None:
+        if tag in self._SKIP:
+            self._skip_depth += 1
+        elif tag == "body":
+            # </head> は省略できるため、<body> で必ず本文扱いに戻す
+            self._skip_depth = 0
+        elif tag == "pre":
+            self._pre_depth += 1
+        if tag in self._HEADINGS:
+            self._parts.append(f"\n\n{self._HEADINGS[tag]} ")
+        elif tag == "li":
+            self._parts.append("\n- ")
+        elif tag in ("td", "th"):
+            self._parts.append(" | ")
+        elif tag in self._BLOCK:
+            self._parts.append("\n")
+
+    def handle_endtag(self, tag: str) -> None:
+        if tag in self._SKIP:
+            self._skip_depth = max(0, self._skip_depth - 1)
+        elif tag == "pre":
+            self._pre_depth = max(0, self._pre_depth - 1)
+        if tag in self._HEADINGS or tag in self._BLOCK:
+            self._parts.append("\n")
+
+    def handle_data(self, data: str) -> None:
+        if self._skip_depth:
+            return
+        if not self._pre_depth:
+            data = re.sub(r"\s+", " ", data)
+        self._parts.append(data)
+
+    def text(self) -> str:
+        lines = (line.strip() for line in "".join(self._parts).splitlines())
+        return re.sub(r"\n{3,}", "\n\n", "\n".join(lines)).strip()
+
+
+_READERS: dict[str, Callable[[Path, int | None], BoundedText]] = {
+    ".txt": _read_plain,
+    ".md": _read_plain,
+    ".json": _read_plain,
+    ".xml": _read_plain,
+    ".csv": _read_csv,
+    ".html": _read_html,
+    ".htm": _read_html,
+}
@@ -2,18 +2,42 @@
 
 from __future__ import annotations
 
+import json
 import logging
+import os
+from collections import deque
+from collections.abc import Callable, Iterable, Sized
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from contextlib import ExitStack
 from datetime import datetime
 from pathlib import Path
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
-from doc_triager.checksum import compute_checksum, is_processed
+from doc_triager.checksum import compute_checksum, is_processed, is_unchanged
 from doc_triager.config import Config
-from doc_triager.database import insert_result
+from doc_triager.database import (
+    TriageDatabase,
+    find_reusable_by_checksum,
+    insert_result,
+)
+from doc_triager.extraction_cache import ExtractionCache
+from doc_triager.extraction_pool import ExtractionPool, PendingExtraction
 from doc_triager.extractor import extract_text, truncate_text
-from doc_triager.llm import build_claude_cmd, build_codex_cmd
+from doc_triager.llm import RetryPolicy, build_claude_cmd, build_codex_cmd
 from doc_triager.mover import move_file
-from doc_triager.triage import apply_threshold, classify_document, summarize_text
+from doc_triager.ratelimit import RateLimiter
+from doc_triager.tokenizer import get_tokenizer
+from doc_triager.triage import (
+    BatchClassifier,
+    BatchDocument,
+    apply_threshold,
+    build_classify_prompt,
+    classify_document,
+    summarize_text,
+)
+
+if TYPE_CHECKING:
+    from doc_triager.batch_api import BatchSubmission
 
 logger = logging.getLogger(__name__)
 
@@ -23,29 +47,117 @@ def _is_file_direct_mode(cfg: Config) -> bool:
     return cfg.llm.mode == "cli" and cfg.llm.provider == "claude"
 
 
+def _extraction_budget(cfg: Config) -> int | None:
+    """Character budget for bounded extraction, or None to always convert in full.
+
+    Generous enough that truncation to ``max_input_tokens`` is never short of text.
+    """
+    if not cfg.text_extraction.bounded_extraction:
+        return None
+    tokenizer = get_tokenizer(cfg.triage.tokenizer)
+    return cfg.triage.max_input_tokens * tokenizer.max_chars_per_token
+
+
+def _extract_workers(cfg: Config) -> int:
+    """Number of extraction processes to run.
+
+    The timeout and memory cap can only be enforced in a separate process, so
+    with either limit set at least one extraction process is used.
+    """
+    processing = cfg.processing
+    workers = max(0, processing.extract_workers)
+    if workers == 0 and (
+        processing.extract_timeout_sec > 0 or processing.extract_memory_mb > 0
+    ):
+        return 1
+    return workers
+
+
+def _llm_model(cfg: Config) -> str:
+    """Model string for the configured mode (``provider/model`` for litellm)."""
+    if cfg.llm.mode == "api":
+        return f"{cfg.llm.provider}/{cfg.llm.model}"
+    return cfg.llm.model
+
+
+def _build_batch_classifier(
+    cfg: Config, *, rate_limiter: RateLimiter | None
+) -> BatchClassifier:
+    """Build the classifier that groups small documents into shared requests."""
+    return BatchClassifier(
+        max_documents=cfg.triage.batch_size,
+        max_tokens=cfg.triage.max_input_tokens,
+        wait_sec=cfg.triage.batch_wait_ms / 1000,
+        tokenizer=get_tokenizer(cfg.triage.tokenizer),
+        prompt_dir=Path(cfg.triage.prompt_dir) if cfg.triage.prompt_dir else None,
+        model=_llm_model(cfg),
+        timeout=cfg.llm.rate_limit.request_timeout_sec,
+        api_base=cfg.llm.base_url,
+        mode=cfg.llm.mode,
+        provider=cfg.llm.provider,
+        rate_limiter=rate_limiter,
+        retry=RetryPolicy.from_config(cfg.llm.rate_limit),
+    )
+
+
 def process_file(
     *,
     file_path: Path,
     cfg: Config,
     dry_run: bool,
     debug_dir: Path | None = None,
+    paranoid: bool = False,
+    checksum: str | None = None,
+    rate_limiter: RateLimiter | None = None,
+    db: Path | TriageDatabase | None = None,
+    pending_extraction: PendingExtraction | None = None,
+    extraction_cache: ExtractionCache | None = None,
+    batch_classifier: BatchClassifier | None = None,
+    batch_submission: BatchSubmission | None = None,
 ) -> dict[str, Any]:
     """Process a single file through the full triage pipeline.
 
+    Args:
+        paranoid: Always re-hash files instead of trusting unchanged stat data.
+        checksum: Precomputed checksum. Computed here when omitted.
+        rate_limiter: Rate limiter shared by every LLM call of the run.
+        db: Database connection shared by the run. When omitted, each DB
+            access opens ``cfg.database.path`` on its own.
+        pending_extraction: Text extraction already submitted to the
+            extraction process pool. Extracted here when omitted.
+        extraction_cache: Cache of extracted text shared by the run. When
+            omitted, the cache configured in ``cfg.text_extraction`` is used.
+        batch_classifier: Shared classifier that batches small documents with
+            those of other workers. Each file is classified alone when omitted.
+        batch_submission: Provider batch job being assembled. When given, the
+            classification request is added to it instead of calling the LLM,
+            and the file is moved and recorded later by ``collect_batches``.
+
     Returns:
         dict with keys: triage, confidence, reason, topics,
         destination_path, skipped, error.
     """
     source_dir = Path(cfg.input.directory)
-    output_dir = Path(cfg.output.directory)
-    db_path = Path(cfg.database.path)
+    if db is None:
+        db = Path(cfg.database.path)
+    if extraction_cache is None:
+        extraction_cache = ExtractionCache.from_config(cfg.text_extraction)
+
+    # [3.2] DB照合（stat）- サイズ・mtime・inode が一致すればファイルを読まずにスキップ
+    file_stat = file_path.stat()
+    if not paranoid and is_unchanged(db, file_path, st=file_stat):
+        logger.info("  スキップ（処理済み）")
+        return {"triage": None, "skipped": True}
+    if batch_submission is not None and batch_submission.is_pending(file_path):
+        logger.info("  スキップ（バッチ結果待ち）")
+        return {"triage": None, "skipped": True}
 
-    # [3.1] チェックサム計算
-    checksum = compute_checksum(file_path)
-    file_size = file_path.stat().st_size
+    # [3.1] チェックサム計算（事前計算済みならそれを使う）
+    if checksum is None:
+        checksum = compute_checksum(file_path, buf_size=cfg.processing.hash_buffer_size)
 
-    # [3.2] DB照合 - 処理済みならスキップ
-    if is_processed(db_path, file_path):
+    # [3.2] DB照合（チェックサム）- 処理済みならスキップ（stat は判定済み）
+    if is_processed(db, file_path, checksum=checksum, paranoid=True):
         logger.info("  スキップ（処理済み）")
         return {"triage": None, "skipped": True}
 
@@ -54,15 +166,15 @@ def process_file(
 
     mode = cfg.llm.mode
     timeout = cfg.llm.rate_limit.request_timeout_sec
+    retry = RetryPolicy.from_config(cfg.llm.rate_limit)
     base_url = cfg.llm.base_url
-
-    if mode == "api":
-        model = f"{cfg.llm.provider}/{cfg.llm.model}"
-    else:
-        model = cfg.llm.model
+    prompt_dir = Path(cfg.triage.prompt_dir) if cfg.triage.prompt_dir else None
+    model = _llm_model(cfg)
 
     # dry-run: コマンド表示のみ、LLM 呼び出し・移動・DB 記録はしない
     if dry_run:
+        if find_reusable_by_checksum(db, checksum) is not None:
+            logger.info("  重複ファイル（既存の分類結果を再利用予定）")
         if mode == "cli":
             cmd_builders = {
                 "claude": lambda: build_claude_cmd(model=model or None),
@@ -83,6 +195,18 @@ def process_file(
             "destination_path": None,
         }
 
+    # [3.2.1] 重複判定 - 同一内容の分類結果があれば LLM を呼ばずに再利用
+    original = find_reusable_by_checksum(db, checksum)
+    if original is not None:
+        return _reuse_result(
+            original=original,
+            db=db,
+            cfg=cfg,
+            file_path=file_path,
+            checksum=checksum,
+            file_stat=file_stat,
+        )
+
     if file_direct:
         # [3.3-alt] ファイル直接モード: 抽出/トランケート/要約をスキップ
         logger.info("  ファイル直接モード（CLI claude）")
@@ -97,27 +221,36 @@ def process_file(
             mode=mode,
             provider=cfg.llm.provider,
             file_path=file_path,
+            rate_limiter=rate_limiter,
+            retry=retry,
+            prompt_dir=prompt_dir,
         )
 
         extracted_text_length = 0
         truncated = False
     else:
-        # [3.3] テキスト抽出
-        extraction = extract_text(
-            file_path,
-            min_text_length=cfg.text_extraction.min_text_length,
-            source_dir=source_dir,
-            debug_dir=debug_dir,
-        )
+        # [3.3] テキスト抽出（抽出プロセスに投入済みならその結果を待つ）
+        if pending_extraction is not None:
+            extraction = pending_extraction.result()
+        else:
+            extraction = extract_text(
+                file_path,
+                min_text_length=cfg.text_extraction.min_text_length,
+                source_dir=source_dir,
+                debug_dir=debug_dir,
+                checksum=checksum,
+                cache=extraction_cache,
+                max_chars=_extraction_budget(cfg),
+            )
 
         if extraction.error:
             logger.warning("  抽出エラー: %s", extraction.error)
-            _record_result(
-                db_path=db_path,
+            record_result(
+                db=db,
                 cfg=cfg,
                 file_path=file_path,
                 checksum=checksum,
-                file_size=file_size,
+                file_stat=file_stat,
                 triage="unknown",
                 confidence=0.0,
                 reason="テキスト抽出失敗",
@@ -138,12 +271,12 @@ def process_file(
         if extraction.insufficient:
             logger.info("  テキスト不足 → unknown")
             text_len = len(extraction.text.strip()) if extraction.text else 0
-            _record_result(
-                db_path=db_path,
+            record_result(
+                db=db,
                 cfg=cfg,
                 file_path=file_path,
                 checksum=checksum,
-                file_size=file_size,
+                file_stat=file_stat,
                 triage="unknown",
                 confidence=0.0,
                 reason="テキスト抽出不足",
@@ -163,7 +296,35 @@ def process_file(
 
         # [3.4] テキストトランケート + [要約] + LLM分類
         text = extraction.text
-        trunc_result = truncate_text(text, max_length=cfg.triage.max_input_tokens)
+        trunc_result = truncate_text(
+            text,
+            max_length=cfg.triage.max_input_tokens,
+            tokenizer=get_tokenizer(cfg.triage.tokenizer),
+        )
+
+        if batch_submission is not None:
+            # [3.4-batch] LLM を呼ばずにバッチジョブへ追加（移動・記録は回収時に行う）
+            batch_submission.add(
+                file_path=file_path,
+                checksum=checksum,
+                file_stat=file_stat,
+                prompt=build_classify_prompt(
+                    filename=file_path.name,
+                    file_extension=file_path.suffix,
+                    text=trunc_result.text,
+                    truncated=trunc_result.truncated,
+                    prompt_dir=prompt_dir,
+                ),
+                extracted_text_length=len(text),
+                truncated=trunc_result.truncated,
+            )
+            return {
+                "triage": None,
+                "skipped": False,
+                "submitted": True,
+                "error": None,
+                "destination_path": None,
+            }
 
         # [3.4.1] オプション要約
         classify_text = trunc_result.text
@@ -177,6 +338,9 @@ def process_file(
                 api_base=base_url,
                 mode=mode,
                 provider=cfg.llm.provider,
+                rate_limiter=rate_limiter,
+                retry=retry,
+                prompt_dir=prompt_dir,
             )
             if summary_result.error:
                 logger.warning(
@@ -186,17 +350,30 @@ def process_file(
                 logger.info("  要約完了")
             classify_text = summary_result.summary
 
-        cls_result = classify_document(
-            text=classify_text,
-            filename=file_path.name,
-            file_extension=file_path.suffix,
-            truncated=trunc_result.truncated,
-            model=model,
-            timeout=timeout,
-            api_base=base_url,
-            mode=mode,
-            provider=cfg.llm.provider,
-        )
+        if batch_classifier is not None:
+            cls_result = batch_classifier.classify(
+                BatchDocument(
+                    text=classify_text,
+                    filename=file_path.name,
+                    file_extension=file_path.suffix,
+                    truncated=trunc_result.truncated,
+                )
+            )
+        else:
+            cls_result = classify_document(
+                text=classify_text,
+                filename=file_path.name,
+                file_extension=file_path.suffix,
+                truncated=trunc_result.truncated,
+                model=model,
+                timeout=timeout,
+                api_base=base_url,
+                mode=mode,
+                provider=cfg.llm.provider,
+                rate_limiter=rate_limiter,
+                retry=retry,
+                prompt_dir=prompt_dir,
+            )
 
         extracted_text_length = len(text)
         truncated = trunc_result.truncated
@@ -212,25 +389,15 @@ def process_file(
     )
 
     # [3.6] ファイル移動
-    destination_path: str | None = None
-    try:
-        dest = move_file(
-            file_path,
-            source_dir=source_dir,
-            output_dir=output_dir,
-            triage=cls_result.triage,
-        )
-        destination_path = str(dest)
-    except OSError as e:
-        logger.error("  ファイル移動失敗: %s", e)
+    destination_path = move_to_triage(file_path, cfg=cfg, triage=cls_result.triage)
 
     # [3.7] DB記録
-    _record_result(
-        db_path=db_path,
+    record_result(
+        db=db,
         cfg=cfg,
         file_path=file_path,
         checksum=checksum,
-        file_size=file_size,
+        file_stat=file_stat,
         triage=cls_result.triage,
         confidence=cls_result.confidence,
         reason=cls_result.reason,
@@ -252,13 +419,82 @@ def process_file(
     }
 
 
-def _record_result(
+def move_to_triage(file_path: Path, *, cfg: Config, triage: str) -> str | None:
+    """Move a file to its triage directory. Returns None if the move failed."""
+    try:
+        dest = move_file(
+            file_path,
+            source_dir=Path(cfg.input.directory),
+            output_dir=Path(cfg.output.directory),
+            triage=triage,
+        )
+    except OSError as e:
+        logger.error("  ファイル移動失敗: %s", e)
+        return None
+    return str(dest)
+
+
+def _reuse_result(
     *,
-    db_path: Path,
+    original: dict[str, Any],
+    db: Path | TriageDatabase,
     cfg: Config,
     file_path: Path,
     checksum: str,
-    file_size: int,
+    file_stat: os.stat_result,
+) -> dict[str, Any]:
+    """Copy an existing verdict for identical content to a new source path."""
+    triage = original["triage"]
+    confidence = original["confidence"] or 0.0
+    reason = original["reason"] or ""
+    topics = json.loads(original["topics"]) if original["topics"] else []
+    logger.info(
+        "  重複ファイル（%s の分類結果を再利用）: %s (%.2f)",
+        original["source_path"],
+        triage,
+        confidence,
+    )
+
+    destination_path = move_to_triage(file_path, cfg=cfg, triage=triage)
+
+    record_result(
+        db=db,
+        cfg=cfg,
+        file_path=file_path,
+        checksum=checksum,
+        file_stat=file_stat,
+        triage=triage,
+        confidence=confidence,
+        reason=reason,
+        topics=topics,
+        extracted_text_length=original["extracted_text_length"] or 0,
+        truncated=bool(original["truncated"]),
+        error_message=None,
+        destination_path=destination_path,
+        llm_provider=original["llm_provider"],
+        llm_model=original["llm_model"],
+        dedup_of=original["dedup_of"] or original["id"],
+    )
+
+    return {
+        "triage": triage,
+        "confidence": confidence,
+        "reason": reason,
+        "topics": topics,
+        "skipped": False,
+        "deduplicated": True,
+        "error": None,
+        "destination_path": destination_path,
+    }
+
+
+def record_result(
+    *,
+    db: Path | TriageDatabase,
+    cfg: Config,
+    file_path: Path,
+    checksum: str,
+    file_stat: os.stat_result,
     triage: str,
     confidence: float,
     reason: str,
@@ -267,70 +503,282 @@ def _record_result(
     truncated: bool,
     error_message: str | None,
     destination_path: str | None,
+    llm_provider: str | None = None,
+    llm_model: str | None = None,
+    dedup_of: int | None = None,
 ) -> None:
-    """Record a triage result in the database."""
+    """Record a triage result in the database.
+
+    LLM provider/model default to the current config; dedup-derived rows pass
+    the original row's values and its id as ``dedup_of``.
+    """
     insert_result(
-        db_path,
+        db,
         {
             "source_path": str(file_path),
             "destination_path": destination_path,
             "checksum": checksum,
-            "file_size": file_size,
+            "file_size": file_stat.st_size,
+            "file_mtime_ns": file_stat.st_mtime_ns,
+            "file_inode": file_stat.st_ino,
             "file_extension": file_path.suffix,
             "triage": triage,
             "confidence": confidence,
             "reason": reason,
             "topics": topics,
-            "llm_provider": cfg.llm.provider,
-            "llm_model": cfg.llm.model,
+            "llm_provider": llm_provider
+            if llm_provider is not None
+            else cfg.llm.provider,
+            "llm_model": llm_model if llm_model is not None else cfg.llm.model,
             "extracted_text_length": extracted_text_length,
             "truncated": truncated,
             "error_message": error_message,
+            "dedup_of": dedup_of,
             "processed_at": datetime.now(),
         },
     )
 
 
+def _tally(summary: dict[str, int], result: dict[str, Any]) -> None:
+    """Add a single process_file result to the run summary."""
+    if result["skipped"]:
+        summary["skipped"] += 1
+    elif result.get("submitted"):
+        summary["submitted"] += 1
+    elif result.get("error"):
+        summary["error"] += 1
+    else:
+        cls = result["triage"]
+        if cls in summary:
+            summary[cls] += 1
+        if result.get("deduplicated"):
+            summary["deduplicated"] += 1
+
+
+def _precompute_checksum(
+    file_path: Path,
+    *,
+    db: Path | TriageDatabase,
+    paranoid: bool,
+    buf_size: int,
+) -> str | None:
+    """Hash a file ahead of processing. Returns None if stat shows no change."""
+    if not paranoid and is_unchanged(db, file_path):
+        return None
+    return compute_checksum(file_path, buf_size=buf_size)
+
+
+def _prepare(
+    file_path: Path,
+    *,
+    db: Path | TriageDatabase,
+    paranoid: bool,
+    buf_size: int,
+    extract: Callable[[Path, str], PendingExtraction] | None,
+) -> tuple[str | None, PendingExtraction | None]:
+    """Hash a file ahead of processing and start its extraction if needed.
+
+    Extraction is only submitted for files that will actually be classified,
+    i.e. not unchanged, not already processed and not a duplicate.
+    """
+    checksum = _precompute_checksum(
+        file_path, db=db, paranoid=paranoid, buf_size=buf_size
+    )
+    if (
+        checksum is None
+        or extract is None
+        or is_processed(db, file_path, checksum=checksum, paranoid=True)
+        or find_reusable_by_checksum(db, checksum) is not None
+    ):
+        return checksum, None
+    return checksum, extract(file_path, checksum)
+
+
+_PreparedFuture = Future[tuple[str | None, PendingExtraction | None]]
+
+
 def process_files(
     *,
-    files: list[Path],
+    files: Iterable[Path],
     cfg: Config,
     dry_run: bool,
     debug_dir: Path | None = None,
+    paranoid: bool = False,
+    db: TriageDatabase | None = None,
+    batch_submission: BatchSubmission | None = None,
 ) -> dict[str, int]:
     """Process multiple files and return a summary.
 
+    With ``cfg.processing.hash_workers`` > 0, checksums are computed on a
+    dedicated thread pool a few files ahead of classification, so hashing
+    overlaps with LLM latency. With ``cfg.processing.workers`` > 1, up to that
+    many files are classified concurrently, and with
+    ``cfg.triage.batch_size`` > 1 their small documents share LLM requests. With
+    ``cfg.processing.extract_workers`` > 0, or an extraction timeout or memory
+    cap set, text extraction runs in a separate process pool, started from the
+    checksum prepass so that conversion uses other cores while LLM calls are
+    pending. In-flight work is bounded, so
+    ``files`` may be a lazy iterator (e.g. ``scanner.iter_files``) and
+    processing starts before the scan has finished. All files share one
+    database connection: ``db`` if given, otherwise one opened for the run.
+    With ``batch_submission``, classification requests are collected and
+    submitted as provider batch jobs at the end of the run.
+
     Returns:
-        dict with counts: total, evergreen, temporal, unknown, error, skipped.
+        dict with counts: total, evergreen, temporal, unknown, error, skipped,
+        deduplicated (files whose verdict was reused; also counted in their
+        triage category), and submitted (requests added to batch jobs).
     """
     source_dir = Path(cfg.input.directory)
+    total = len(files) if isinstance(files, Sized) else None
+    workers = max(1, cfg.processing.workers)
+    extract_workers = _extract_workers(cfg)
+    # 抽出プロセスへの投入は先行計算スレッドから行うため、最低1スレッドは用意する
+    hash_workers = max(0, cfg.processing.hash_workers, min(extract_workers, 1))
+    lookahead_size = max(hash_workers, extract_workers) * 2
+    rate_limiter = RateLimiter.from_config(cfg.llm.rate_limit)
+    # トークナイザの設定誤りはファイル処理を始める前に検出する
+    get_tokenizer(cfg.triage.tokenizer)
+    extraction_cache = ExtractionCache.from_config(cfg.text_extraction)
+    batch_classifier = (
+        _build_batch_classifier(cfg, rate_limiter=rate_limiter)
+        if cfg.triage.batch_size > 1
+        and not dry_run
+        and not _is_file_direct_mode(cfg)
+        and batch_submission is None
+        else None
+    )
     summary: dict[str, int] = {
-        "total": len(files),
+        "total": 0,
         "evergreen": 0,
         "temporal": 0,
         "unknown": 0,
         "error": 0,
         "skipped": 0,
+        "deduplicated": 0,
+        "submitted": 0,
     }
 
-    for i, file_path in enumerate(files, 1):
-        logger.info("[%d/%d] %s", i, len(files), file_path.relative_to(source_dir))
-
-        result = process_file(
+    def run_one(
+        index: int, file_path: Path, prepared: _PreparedFuture | None
+    ) -> dict[str, Any]:
+        relative = file_path.relative_to(source_dir)
+        if total is None:
+            logger.info("[%d] %s", index, relative)
+        else:
+            logger.info("[%d/%d] %s", index, total, relative)
+        checksum, extraction = (
+            prepared.result() if prepared is not None else (None, None)
+        )
+        return process_file(
             file_path=file_path,
             cfg=cfg,
             dry_run=dry_run,
             debug_dir=debug_dir,
+            paranoid=paranoid,
+            checksum=checksum,
+            rate_limiter=rate_limiter,
+            db=db,
+            pending_extraction=extraction,
+            extraction_cache=extraction_cache,
+            batch_classifier=batch_classifier,
+            batch_submission=batch_submission,
         )
 
-        if result["skipped"]:
-            summary["skipped"] += 1
-        elif result.get("error"):
-            summary["error"] += 1
-        else:
-            cls = result["triage"]
-            if cls in summary:
-                summary[cls] += 1
+    if workers > 1:
+        logger.info("並列処理: %d ワーカー", workers)
+    if batch_classifier is not None:
+        logger.info("バッチ分類: 最大 %d 件/リクエスト", cfg.triage.batch_size)
+        if workers < cfg.triage.batch_size:
+            logger.warning(
+                "workers (%d) が batch_size (%d) より少ないため、"
+                "バッチは待機時間の経過後に送信されます",
+                workers,
+                cfg.triage.batch_size,
+            )
+
+    with ExitStack() as stack:
+        if db is None:
+            db = stack.enter_context(TriageDatabase.from_config(cfg.database))
+        # 再開時の処理済み判定は1回の読み込みでメモリ上の索引から行う
+        db.preload_processed()
+        if batch_submission is not None:
+            stack.enter_context(batch_submission)
+            batch_submission.load_pending(db)
+        hash_pool = (
+            stack.enter_context(
+                ThreadPoolExecutor(max_workers=hash_workers, thread_name_prefix="hash")
+            )
+            if hash_workers > 0
+            else None
+        )
+        executor = (
+            stack.enter_context(
+                ThreadPoolExecutor(max_workers=workers, thread_name_prefix="triage")
+            )
+            if workers > 1
+            else None
+        )
+        # 抽出が不要な実行（dry-run・ファイル直接モード）ではプロセスを起動しない
+        extract_pool = (
+            stack.enter_context(
+                ExtractionPool(
+                    workers=extract_workers,
+                    max_tasks_per_child=cfg.processing.extract_max_tasks_per_child,
+                    timeout_sec=cfg.processing.extract_timeout_sec,
+                    memory_mb=cfg.processing.extract_memory_mb,
+                    min_text_length=cfg.text_extraction.min_text_length,
+                    source_dir=source_dir,
+                    debug_dir=debug_dir,
+                    cache=extraction_cache,
+                    max_chars=_extraction_budget(cfg),
+                )
+            )
+            if extract_workers > 0 and not dry_run and not _is_file_direct_mode(cfg)
+            else None
+        )
+        extract = extract_pool.submit if extract_pool is not None else None
+        pending: set[Future[dict[str, Any]]] = set()
+
+        def dispatch(
+            index: int, file_path: Path, prepared: _PreparedFuture | None
+        ) -> None:
+            nonlocal pending
+            if executor is None:
+                _tally(summary, run_one(index, file_path, prepared))
+                return
+            if len(pending) >= workers * 2:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    _tally(summary, future.result())
+            pending.add(executor.submit(run_one, index, file_path, prepared))
+
+        # ハッシュ計算・テキスト抽出は分類より lookahead_size 件先行させる
+        # （先行分が上限に達したら分類側が追いつくまで投入を止める）
+        lookahead: deque[tuple[int, Path, _PreparedFuture | None]] = deque()
+        for i, file_path in enumerate(files, 1):
+            prepared = (
+                hash_pool.submit(
+                    _prepare,
+                    file_path,
+                    db=db,
+                    paranoid=paranoid,
+                    buf_size=cfg.processing.hash_buffer_size,
+                    extract=extract,
+                )
+                if hash_pool is not None
+                else None
+            )
+            summary["total"] = i
+            lookahead.append((i, file_path, prepared))
+            if len(lookahead) > lookahead_size:
+                dispatch(*lookahead.popleft())
+        while lookahead:
+            dispatch(*lookahead.popleft())
+        for future in wait(pending).done:
+            _tally(summary, future.result())
+        if batch_submission is not None:
+            batch_submission.submit(db)
 
     logger.info("--- 処理サマリー ---")
     logger.info("合計: %d", summary["total"])
@@ -339,5 +787,8 @@ def process_files(
     logger.info("  unknown:   %d", summary["unknown"])
     logger.info("  エラー:    %d", summary["error"])
     logger.info("  スキップ:  %d", summary["skipped"])
+    logger.info("  重複再利用: %d", summary["deduplicated"])
+    if batch_submission is not None:
+        logger.info("  バッチ投入: %d", summary["submitted"])
 
     return summary
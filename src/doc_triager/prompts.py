@@ -0,0 +1,127 @@
+"""Prompt template module for doc-triager.
+
+Templates are read and parsed once and then rendered by plain substitution.
+Templates in a user-supplied directory override the bundled ones and are
+reloaded when their mtime or size changes, so edits take effect without a
+restart.
+"""
+
+from __future__ import annotations
+
+import functools
+import logging
+import os
+import threading
+from collections.abc import Sequence
+from dataclasses import dataclass
+from pathlib import Path
+from string import Formatter
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+BUNDLED_PROMPT_DIR = Path(__file__).parent / "prompt"
+
+_CONVERSIONS = {"r": repr, "s": str, "a": ascii}
+
+
+@dataclass(frozen=True)
+class Prompt:
+    """A rendered prompt split into a shared system part and a per-call user part.
+
+    ``system`` is identical for every document, so providers can cache it as a
+    prompt prefix; everything document-specific goes in ``user``.
+    """
+
+    system: str
+    user: str
+
+    def as_text(self) -> str:
+        """Join both parts for backends that take a single prompt (CLI)."""
+        return f"{self.system}\n\n{self.user}" if self.system else self.user
+
+
+class PromptTemplate:
+    """A ``str.format`` style template, parsed once.
+
+    ``render`` produces the same text as ``source.format(**values)`` but only
+    joins the pre-split literal parts with the substituted values.
+    """
+
+    def __init__(self, source: str) -> None:
+        self.source = source
+        self._parts: list[tuple[str, str | None, str | None, str]] = [
+            (literal, field, conversion, spec or "")
+            for literal, field, spec, conversion in Formatter().parse(source)
+        ]
+        self.fields = frozenset(field for _, field, _, _ in self._parts if field)
+
+    def render(self, **values: Any) -> str:
+        """Substitute ``values`` into the template.
+
+        Raises:
+            KeyError: If a placeholder has no value.
+        """
+        out: list[str] = []
+        for literal, field, conversion, spec in self._parts:
+            out.append(literal)
+            if field is None:
+                continue
+            value = values[field]
+            if conversion:
+                value = _CONVERSIONS[conversion](value)
+            out.append(
+                value if isinstance(value, str) and not spec else format(value, spec)
+            )
+        return "".join(out)
+
+
+class PromptStore:
+    """Loads prompt templates by name, caching the parsed result.
+
+    ``directories`` are searched in order before the bundled prompts. Their
+    templates are checked against the file's mtime and size on every lookup
+    (a single ``stat``); bundled templates never change and are not checked.
+    """
+
+    def __init__(self, directories: Sequence[Path] = ()) -> None:
+        self._directories = [Path(d) for d in directories]
+        self._cache: dict[Path, tuple[int, int, PromptTemplate]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, name: str) -> PromptTemplate:
+        """Return the template ``name`` (e.g. ``"classify_user.txt"``).
+
+        Raises:
+            FileNotFoundError: If no directory has the template.
+        """
+        for directory in self._directories:
+            path = directory / name
+            try:
+                st = path.stat()
+            except FileNotFoundError:
+                continue
+            return self._load(path, st)
+
+        path = BUNDLED_PROMPT_DIR / name
+        cached = self._cache.get(path)
+        if cached is not None:
+            return cached[2]
+        return self._load(path, path.stat())
+
+    def _load(self, path: Path, st: os.stat_result) -> PromptTemplate:
+        cached = self._cache.get(path)
+        if cached is not None and cached[:2] == (st.st_mtime_ns, st.st_size):
+            return cached[2]
+        with self._lock:
+            template = PromptTemplate(path.read_text(encoding="utf-8"))
+            if cached is not None:
+                logger.info("プロンプトを再読み込み: %s", path)
+            self._cache[path] = (st.st_mtime_ns, st.st_size, template)
+        return template
+
+
+@functools.cache
+def get_prompt_store(prompt_dir: Path | None = None) -> PromptStore:
+    """Return the shared store for ``prompt_dir`` (bundled prompts only if None)."""
+    return PromptStore([prompt_dir] if prompt_dir is not None else [])
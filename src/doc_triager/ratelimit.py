@@ -0,0 +1,127 @@
+"""Rate limiting module for doc-triager.
+
+Provides a thread-safe token bucket shared by all LLM calls in a run, so that
+concurrent workers stay within the provider's requests-per-minute and
+tokens-per-minute limits.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from collections.abc import Callable
+
+from doc_triager.config import RateLimitConfig
+from doc_triager.tokenizer import estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """Thread-safe token bucket.
+
+    Tokens refill continuously at ``rate_per_minute / 60`` per second up to
+    ``capacity``. ``acquire`` reserves tokens immediately (the balance may go
+    negative) and sleeps outside the lock until the reservation is covered,
+    so waiting callers are served in arrival order without busy looping.
+    """
+
+    def __init__(
+        self,
+        *,
+        rate_per_minute: float,
+        capacity: float,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        if rate_per_minute <= 0:
+            raise ValueError(f"rate_per_minute は正の値が必要です: {rate_per_minute}")
+        if capacity <= 0:
+            raise ValueError(f"capacity は正の値が必要です: {capacity}")
+        self._rate = rate_per_minute / 60.0
+        self._capacity = float(capacity)
+        self._tokens = float(capacity)
+        self._clock = clock
+        self._sleep = sleep
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def acquire(self, amount: float = 1.0) -> float:
+        """Take ``amount`` tokens, blocking until they are available.
+
+        Requests larger than the bucket capacity are clamped to the capacity.
+
+        Args:
+            amount: Number of tokens to take.
+
+        Returns:
+            Seconds spent waiting.
+        """
+        amount = min(float(amount), self._capacity)
+        with self._lock:
+            now = self._clock()
+            elapsed = now - self._updated
+            self._updated = now
+            self._tokens = min(self._capacity, self._tokens + elapsed * self._rate)
+            self._tokens -= amount
+            wait = -self._tokens / self._rate if self._tokens < 0 else 0.0
+
+        if wait > 0:
+            self._sleep(wait)
+        return wait
+
+
+class RateLimiter:
+    """Combined requests-per-minute and tokens-per-minute limiter."""
+
+    def __init__(
+        self,
+        *,
+        requests_per_minute: int,
+        tokens_per_minute: int = 0,
+        burst: int = 1,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        self._requests = (
+            TokenBucket(
+                rate_per_minute=requests_per_minute,
+                capacity=max(1, burst),
+                clock=clock,
+                sleep=sleep,
+            )
+            if requests_per_minute > 0
+            else None
+        )
+        self._tokens = (
+            TokenBucket(
+                rate_per_minute=tokens_per_minute,
+                capacity=tokens_per_minute,
+                clock=clock,
+                sleep=sleep,
+            )
+            if tokens_per_minute > 0
+            else None
+        )
+
+    @classmethod
+    def from_config(cls, config: RateLimitConfig) -> RateLimiter | None:
+        """Build a limiter from config. Returns None when no limit is set."""
+        if config.requests_per_minute <= 0 and config.tokens_per_minute <= 0:
+            return None
+        return cls(
+            requests_per_minute=config.requests_per_minute,
+            tokens_per_minute=config.tokens_per_minute,
+            burst=config.burst,
+        )
+
+    def acquire(self, prompt: str) -> None:
+        """Block until a request carrying ``prompt`` may be sent."""
+        waited = 0.0
+        if self._requests is not None:
+            waited += self._requests.acquire()
+        if self._tokens is not None:
+            waited += self._tokens.acquire(estimate_tokens(prompt))
+        if waited > 0:
+            logger.debug("レート制限により %.2f 秒待機", waited)
@@ -4,6 +4,9 @@ from __future__ import annotations
 
 import fnmatch
 import logging
+import os
+import re
+from collections.abc import Callable, Collection, Iterator
 from pathlib import Path
 
 logger = logging.getLogger(__name__)
@@ -34,41 +37,92 @@ DEFAULT_EXCLUDE_PATTERNS: list[str] = [
 ]
 
 
-def _is_excluded(file_path: Path, root: Path, exclude_patterns: list[str]) -> bool:
-    """Check if a file matches any exclude pattern."""
-    relative = file_path.relative_to(root)
-    rel_str = str(relative)
-    name = file_path.name
+class _ExcludeMatcher:
+    """Exclude patterns compiled into combined regexes.
 
-    for pattern in exclude_patterns:
-        if "**" in pattern or "/" in pattern:
-            if fnmatch.fnmatch(rel_str, pattern):
-                return True
-            if any(
-                fnmatch.fnmatch(part, pattern.split("/")[0]) for part in relative.parts
-            ):
-                return True
-        else:
-            if fnmatch.fnmatch(name, pattern):
-                return True
-    return False
+    Patterns without ``/`` or ``**`` are matched against the file name. Patterns
+    with them are matched against the relative path, and their first segment
+    excludes any directory (and everything below it) whose name matches.
+    Directory rules are checked once per directory, file rules once per file.
+    """
 
+    def __init__(self, patterns: list[str]) -> None:
+        name_patterns = []
+        path_patterns = []
+        dir_patterns = []
+        for pattern in patterns:
+            if "**" in pattern or "/" in pattern:
+                path_patterns.append(pattern)
+                dir_patterns.append(pattern.split("/")[0])
+            else:
+                name_patterns.append(pattern)
+
+        self._name = _compile(name_patterns + dir_patterns)
+        self._path = _compile(path_patterns)
+        self._dir = _compile(dir_patterns)
+
+    def match_dir(self, name: str) -> bool:
+        """Return True if a directory named ``name`` must not be entered."""
+        return self._dir is not None and self._dir.match(name) is not None
+
+    def match_file(self, name: str, relative: str) -> bool:
+        """Return True if a file is excluded by name or relative path."""
+        if self._name is not None and self._name.match(name):
+            return True
+        return self._path is not None and self._path.match(relative) is not None
+
+
+def _compile(patterns: list[str]) -> re.Pattern[str] | None:
+    """Combine glob patterns into one regex. Returns None for no patterns."""
+    if not patterns:
+        return None
+    return re.compile(
+        "|".join(
+            fnmatch.translate(os.path.normcase(p)) for p in dict.fromkeys(patterns)
+        )
+    )
 
-def scan_files(
+
+def _sorted_entries(directory: str | Path) -> list[os.DirEntry[str]]:
+    """List a directory sorted by name. Unreadable directories yield nothing."""
+    try:
+        with os.scandir(directory) as it:
+            return sorted(it, key=lambda e: e.name)
+    except OSError as e:
+        logger.warning("ディレクトリを読み込めません: %s - %s", directory, e)
+        return []
+
+
+def iter_files(
     source_dir: Path,
     *,
     exclude_patterns: list[str] | None = None,
     target_extensions: list[str] | None = None,
-) -> list[Path]:
-    """Scan a directory recursively and return supported files.
+    prune_dirs: Collection[Path] = (),
+    skip: Callable[[Path], bool] | None = None,
+    limit: int | None = None,
+) -> Iterator[Path]:
+    """Walk a directory recursively and yield supported files as they are found.
+
+    Excluded directories are pruned without being entered, and name-based
+    filters run before any stat call. Files are yielded in the same order as
+    ``sorted(source_dir.rglob("*"))``, one directory listing at a time.
 
     Args:
         source_dir: Directory to scan.
         exclude_patterns: Glob patterns to exclude. Defaults to DEFAULT_EXCLUDE_PATTERNS.
         target_extensions: If provided, only include these extensions.
+        prune_dirs: Directories never to descend into (e.g. an output
+            directory located inside the source directory).
+        skip: Predicate for candidates that need no work (e.g. already
+            processed). Skipped files do not count towards ``limit``.
+        limit: Stop walking once this many files have been yielded.
 
-    Returns:
-        Sorted list of file paths.
+    Yields:
+        Paths of supported files.
+
+    Raises:
+        FileNotFoundError: If source_dir does not exist.
     """
     if not source_dir.exists():
         msg = f"ソースディレクトリが見つかりません: {source_dir}"
@@ -82,25 +136,79 @@ def scan_files(
         if target_extensions
         else DEFAULT_SUPPORTED_EXTENSIONS
     )
+    pruned = {os.path.abspath(d) for d in prune_dirs}
+    excluder = _ExcludeMatcher(exclude_patterns)
+    if limit is not None and limit <= 0:
+        return
+    found = 0
+
+    stack = [("", iter(_sorted_entries(source_dir)))]
+    while stack:
+        prefix, entries = stack[-1]
+        entry = next(entries, None)
+        if entry is None:
+            stack.pop()
+            continue
 
-    result: list[Path] = []
+        relative = prefix + entry.name
 
-    for file_path in sorted(source_dir.rglob("*")):
-        if not file_path.is_file():
+        if entry.is_dir(follow_symlinks=False):
+            if excluder.match_dir(os.path.normcase(entry.name)):
+                logger.debug("除外: %s/", relative)
+            elif os.path.abspath(entry.path) in pruned:
+                logger.debug("スキャン対象外ディレクトリ: %s/", relative)
+            else:
+                stack.append((relative + os.sep, iter(_sorted_entries(entry.path))))
             continue
 
-        relative = file_path.relative_to(source_dir)
-
-        if _is_excluded(file_path, source_dir, exclude_patterns):
+        if excluder.match_file(
+            os.path.normcase(entry.name), os.path.normcase(relative)
+        ):
             logger.debug("除外: %s", relative)
             continue
 
-        if file_path.suffix.lower() not in supported:
+        if os.path.splitext(entry.name)[1].lower() not in supported:
             logger.debug("非対応拡張子をスキップ: %s", relative)
             continue
 
+        if not entry.is_file():
+            continue
+
+        file_path = Path(entry.path)
+        if skip is not None and skip(file_path):
+            logger.debug("処理済みをスキップ: %s", relative)
+            continue
+
         logger.debug("対象ファイル: %s", relative)
-        result.append(file_path)
+        yield file_path
+
+        found += 1
+        if limit is not None and found >= limit:
+            return
 
+
+def scan_files(
+    source_dir: Path,
+    *,
+    exclude_patterns: list[str] | None = None,
+    target_extensions: list[str] | None = None,
+) -> list[Path]:
+    """Scan a directory recursively and return supported files.
+
+    Args:
+        source_dir: Directory to scan.
+        exclude_patterns: Glob patterns to exclude. Defaults to DEFAULT_EXCLUDE_PATTERNS.
+        target_extensions: If provided, only include these extensions.
+
+    Returns:
+        Sorted list of file paths.
+    """
+    result = list(
+        iter_files(
+            source_dir,
+            exclude_patterns=exclude_patterns,
+            target_extensions=target_extensions,
+        )
+    )
     logger.debug("スキャン完了: %d 件のファイルを検出 (%s)", len(result), source_dir)
     return result
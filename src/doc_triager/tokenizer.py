@@ -0,0 +1,203 @@
+"""Tokenizer module for doc-triager.
+
+Counts and cuts text in LLM tokens rather than characters, so truncation fills
+``max_input_tokens`` whatever the language. The default estimate needs no
+model files; tiktoken encodings and local Hugging Face ``tokenizer.json`` files
+can be used for exact counts.
+"""
+
+from __future__ import annotations
+
+import functools
+import logging
+import math
+from typing import Any, Protocol
+
+logger = logging.getLogger(__name__)
+
+_DEFAULT_TIKTOKEN_ENCODING = "o200k_base"
+
+
+class Tokenizer(Protocol):
+    """Counts tokens and cuts text to a token budget."""
+
+    # 1トークンあたりの最大文字数の目安（トークン予算から抽出する文字数を見積もる）
+    max_chars_per_token: int
+
+    def count(self, text: str) -> int:
+        """Return the number of tokens in ``text``."""
+        ...
+
+    def head(self, text: str, max_tokens: int) -> str:
+        """Return the longest prefix of ``text`` within ``max_tokens``."""
+        ...
+
+    def tail(self, text: str, max_tokens: int) -> str:
+        """Return the longest suffix of ``text`` within ``max_tokens``."""
+        ...
+
+
+def estimate_tokens(text: str) -> int:
+    """Roughly estimate the token count of a text.
+
+    ASCII text is counted as about 4 characters per token, other characters
+    (CJK etc.) as 1 token each.
+
+    Args:
+        text: Text to estimate.
+
+    Returns:
+        Estimated number of tokens.
+    """
+    ascii_chars = len(text.encode("ascii", "ignore"))
+    return math.ceil(ascii_chars / 4) + (len(text) - ascii_chars)
+
+
+class EstimateTokenizer:
+    """Tokenizer using the ``estimate_tokens`` heuristic. Needs no model files."""
+
+    max_chars_per_token = 4
+
+    def count(self, text: str) -> int:
+        return estimate_tokens(text)
+
+    def head(self, text: str, max_tokens: int) -> str:
+        return text[: self._fit(iter(text), max_tokens)]
+
+    def tail(self, text: str, max_tokens: int) -> str:
+        length = self._fit(reversed(text), max_tokens)
+        return text[len(text) - length :]
+
+    @staticmethod
+    def _fit(chars: Any, max_tokens: int) -> int:
+        """Count how many of ``chars`` fit in ``max_tokens`` estimated tokens."""
+        ascii_chars = other_chars = 0
+        for c in chars:
+            if ord(c) < 128:
+                cost = (ascii_chars + 4) // 4 + other_chars
+            else:
+                cost = (ascii_chars + 3) // 4 + other_chars + 1
+            if cost > max_tokens:
+                break
+            if ord(c) < 128:
+                ascii_chars += 1
+            else:
+                other_chars += 1
+        return ascii_chars + other_chars
+
+
+class TiktokenTokenizer:
+    """Exact counts for OpenAI-style BPE encodings via ``tiktoken``.
+
+    The encoding file is downloaded on first use unless it is already in the
+    ``TIKTOKEN_CACHE_DIR`` cache.
+    """
+
+    max_chars_per_token = 8
+
+    def __init__(self, encoding_name: str = _DEFAULT_TIKTOKEN_ENCODING) -> None:
+        import tiktoken
+
+        self._encoding = tiktoken.get_encoding(encoding_name)
+
+    def _encode(self, text: str) -> list[int]:
+        return self._encoding.encode(text, disallowed_special=())
+
+    def count(self, text: str) -> int:
+        return len(self._encode(text))
+
+    def head(self, text: str, max_tokens: int) -> str:
+        if max_tokens <= 0:
+            return ""
+        # 全文をエンコードせず、予算を満たすまで先頭の窓を広げる
+        window = max_tokens * self.max_chars_per_token
+        while True:
+            chunk = text[:window]
+            tokens = self._encode(chunk)
+            if len(tokens) > max_tokens:
+                _, offsets = self._encoding.decode_with_offsets(tokens)
+                return chunk[: offsets[max_tokens]]
+            if len(chunk) == len(text):
+                return text
+            window *= 2
+
+    def tail(self, text: str, max_tokens: int) -> str:
+        if max_tokens <= 0:
+            return ""
+        window = max_tokens * self.max_chars_per_token
+        while True:
+            chunk = text[-window:]
+            tokens = self._encode(chunk)
+            if len(tokens) > max_tokens:
+                _, offsets = self._encoding.decode_with_offsets(tokens)
+                return chunk[offsets[len(tokens) - max_tokens] :]
+            if len(chunk) == len(text):
+                return text
+            window *= 2
+
+
+class HuggingFaceTokenizer:
+    """Exact counts from a local ``tokenizer.json`` via ``tokenizers``."""
+
+    max_chars_per_token = 8
+
+    def __init__(self, path: str) -> None:
+        from tokenizers import Tokenizer as _HfTokenizer
+
+        # from_file は読み込み失敗を OSError ではなく Exception で報告するため自分で読む
+        with open(path, encoding="utf-8") as f:
+            self._tokenizer = _HfTokenizer.from_str(f.read())
+
+    def _offsets(self, text: str) -> list[tuple[int, int]]:
+        return self._tokenizer.encode(text, add_special_tokens=False).offsets
+
+    def count(self, text: str) -> int:
+        return len(self._offsets(text))
+
+    def head(self, text: str, max_tokens: int) -> str:
+        if max_tokens <= 0:
+            return ""
+        offsets = self._offsets(text)
+        if len(offsets) <= max_tokens:
+            return text
+        return text[: offsets[max_tokens][0]]
+
+    def tail(self, text: str, max_tokens: int) -> str:
+        if max_tokens <= 0:
+            return ""
+        offsets = self._offsets(text)
+        if len(offsets) <= max_tokens:
+            return text
+        return text[offsets[len(offsets) - max_tokens][0] :]
+
+
+@functools.cache
+def get_tokenizer(spec: str) -> Tokenizer:
+    """Build the tokenizer named by ``[triage] tokenizer``.
+
+    Args:
+        spec: ``"estimate"``, ``"tiktoken"`` / ``"tiktoken:<encoding>"``, or
+            ``"hf:<path to tokenizer.json>"``.
+
+    Returns:
+        The tokenizer. Falls back to the estimate (with a warning) when the
+        library is not installed or the encoding or model file cannot be read.
+
+    Raises:
+        ValueError: If the spec names an unknown tokenizer.
+    """
+    kind, _, arg = spec.partition(":")
+    if kind in ("", "estimate"):
+        return EstimateTokenizer()
+    if kind not in ("tiktoken", "hf"):
+        raise ValueError(f"未対応のトークナイザです: {spec}")
+    if kind == "hf" and not arg:
+        raise ValueError(f"tokenizer.json のパスを指定してください: {spec}")
+
+    try:
+        if kind == "tiktoken":
+            return TiktokenTokenizer(arg or _DEFAULT_TIKTOKEN_ENCODING)
+        return HuggingFaceTokenizer(arg)
+    except (ImportError, OSError) as e:
+        logger.warning("トークナイザ %s を読み込めないため推定値を使用: %s", spec, e)
+        return EstimateTokenizer()
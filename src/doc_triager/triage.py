@@ -10,19 +10,43 @@ import json
 import logging
 import re
 import subprocess
+import threading
+from collections.abc import Sequence
+from concurrent.futures import Future
 from dataclasses import dataclass, field
 from pathlib import Path
+from typing import Any
 
-from doc_triager.llm import call_api, call_claude, call_codex
+import litellm
+
+from doc_triager.llm import (
+    RetryPolicy,
+    call_api,
+    call_claude,
+    call_codex,
+    call_with_retry,
+)
+from doc_triager.prompts import Prompt, PromptTemplate, get_prompt_store
+from doc_triager.ratelimit import RateLimiter
+from doc_triager.tokenizer import EstimateTokenizer, Tokenizer
 
 logger = logging.getLogger(__name__)
 
-_PROMPT_DIR = Path(__file__).parent / "prompt"
+_TRIAGE_LABELS = frozenset({"evergreen", "temporal", "unknown"})
+
+# LLM 呼び出しで想定されるエラー（CLI の設定誤り・起動失敗・タイムアウト・異常終了、API エラー）
+_LLM_ERRORS: tuple[type[Exception], ...] = (
+    ValueError,
+    OSError,
+    subprocess.TimeoutExpired,
+    RuntimeError,
+    *litellm.LITELLM_EXCEPTION_TYPES,
+)
 
 
-def _load_prompt(name: str) -> str:
-    """Load a prompt template from the prompt directory."""
-    return (_PROMPT_DIR / name).read_text(encoding="utf-8")
+def _load_prompt(name: str, prompt_dir: Path | None = None) -> PromptTemplate:
+    """Get a cached prompt template, preferring ``prompt_dir`` over the bundled one."""
+    return get_prompt_store(prompt_dir).get(name)
 
 
 @dataclass
@@ -47,15 +71,20 @@ class TriageResult:
 
 def _call_llm(
     *,
-    prompt: str,
+    prompt: Prompt,
     model: str,
     timeout: int,
     api_base: str | None = None,
     mode: str = "api",
     provider: str = "",
+    rate_limiter: RateLimiter | None = None,
+    retry: RetryPolicy | None = None,
 ) -> str:
     """Dispatch an LLM call to the appropriate backend.
 
+    When ``rate_limiter`` is given, every attempt blocks until it is allowed.
+    When ``retry`` is given, transient errors are retried with backoff.
+
     Raises:
         ValueError: If CLI provider is unsupported.
         FileNotFoundError: If CLI command not found.
@@ -71,9 +100,23 @@ def _call_llm(
         caller = callers.get(provider)
         if caller is None:
             raise ValueError(f"未対応のCLIプロバイダ: {provider}")
-        return caller(prompt=prompt, model=model, timeout=timeout)
-    else:
-        return call_api(prompt=prompt, model=model, timeout=timeout, api_base=api_base)
+
+    def attempt() -> str:
+        if rate_limiter is not None:
+            rate_limiter.acquire(prompt.as_text())
+        if mode == "cli":
+            return caller(prompt=prompt.as_text(), model=model, timeout=timeout)
+        return call_api(
+            prompt=prompt.user,
+            system=prompt.system or None,
+            model=model,
+            timeout=timeout,
+            api_base=api_base,
+        )
+
+    if retry is None:
+        return attempt()
+    return call_with_retry(attempt, policy=retry)
 
 
 def summarize_text(
@@ -85,6 +128,9 @@ def summarize_text(
     api_base: str | None = None,
     mode: str = "api",
     provider: str = "",
+    rate_limiter: RateLimiter | None = None,
+    retry: RetryPolicy | None = None,
+    prompt_dir: Path | None = None,
 ) -> SummaryResult:
     """Summarize document text using LLM for classification preprocessing.
 
@@ -98,11 +144,19 @@ def summarize_text(
         api_base: Optional API base URL.
         mode: "api" or "cli".
         provider: CLI provider name.
+        rate_limiter: Optional shared rate limiter.
+        retry: Optional retry policy for transient LLM errors.
+        prompt_dir: Optional directory whose templates override the bundled ones.
 
     Returns:
         SummaryResult with summary or fallback to original text.
     """
-    prompt = _load_prompt("summary.txt").format(filename=filename, text=text)
+    prompt = Prompt(
+        system="",
+        user=_load_prompt("summary.txt", prompt_dir).render(
+            filename=filename, text=text
+        ),
+    )
 
     try:
         raw = _call_llm(
@@ -112,6 +166,8 @@ def summarize_text(
             api_base=api_base,
             mode=mode,
             provider=provider,
+            rate_limiter=rate_limiter,
+            retry=retry,
         )
     except Exception as e:
         logger.warning("要約LLM呼び出し失敗（フォールバック）: %s", e)
@@ -133,8 +189,8 @@ def _extract_json(text: str) -> str:
     return text.strip()
 
 
-def _parse_response(raw: str) -> TriageResult:
-    """Parse LLM response into TriageResult."""
+def parse_classify_response(raw: str) -> TriageResult:
+    """Parse a classification response (a JSON object) into TriageResult."""
     json_str = _extract_json(raw)
     try:
         data = json.loads(json_str)
@@ -159,8 +215,13 @@ def build_classify_prompt(
     text: str = "",
     truncated: bool = False,
     file_path: Path | None = None,
-) -> str:
-    """Build classification prompt string.
+    prompt_dir: Path | None = None,
+) -> Prompt:
+    """Build the classification prompt.
+
+    In text mode the instructions go in a byte-identical system part
+    (``classify_system.txt``) and the document fields follow in the user part
+    (``classify_user.txt``), so every request shares a cacheable prefix.
 
     Args:
         filename: Original filename.
@@ -168,23 +229,29 @@ def build_classify_prompt(
         text: Extracted document text. Used when file_path is None.
         truncated: Whether the text was truncated. Used when file_path is None.
         file_path: If set, uses the file-direct prompt template.
+        prompt_dir: Optional directory whose templates override the bundled ones.
 
     Returns:
-        Formatted prompt string.
+        Prompt with system and user parts.
     """
     if file_path is not None:
-        return _load_prompt("classify_file.txt").format(
-            filename=filename,
-            file_extension=file_extension,
-            file_path=file_path,
+        return Prompt(
+            system="",
+            user=_load_prompt("classify_file.txt", prompt_dir).render(
+                filename=filename,
+                file_extension=file_extension,
+                file_path=file_path,
+            ),
         )
-    else:
-        return _load_prompt("classify.txt").format(
+    return Prompt(
+        system=_load_prompt("classify_system.txt", prompt_dir).render(),
+        user=_load_prompt("classify_user.txt", prompt_dir).render(
             filename=filename,
             file_extension=file_extension,
             truncated=truncated,
             extracted_text=text,
-        )
+        ),
+    )
 
 
 def classify_document(
@@ -199,6 +266,9 @@ def classify_document(
     mode: str = "api",
     provider: str = "",
     file_path: Path | None = None,
+    rate_limiter: RateLimiter | None = None,
+    retry: RetryPolicy | None = None,
+    prompt_dir: Path | None = None,
 ) -> TriageResult:
     """Classify a document using LLM.
 
@@ -213,6 +283,9 @@ def classify_document(
         mode: "api" (litellm) or "cli" (CLI subprocess).
         provider: CLI provider name (e.g. "claude", "codex"). Used when mode="cli".
         file_path: Optional file path for direct file attachment (CLI claude only).
+        rate_limiter: Optional shared rate limiter.
+        retry: Optional retry policy for transient LLM errors.
+        prompt_dir: Optional directory whose templates override the bundled ones.
 
     Returns:
         TriageResult with triage or error.
@@ -223,6 +296,7 @@ def classify_document(
         text=text,
         truncated=truncated,
         file_path=file_path,
+        prompt_dir=prompt_dir,
     )
 
     try:
@@ -233,6 +307,8 @@ def classify_document(
             api_base=api_base,
             mode=mode,
             provider=provider,
+            rate_limiter=rate_limiter,
+            retry=retry,
         )
     except ValueError as e:
         return TriageResult(error=str(e))
@@ -251,7 +327,308 @@ def classify_document(
         return TriageResult(error=str(e))
 
     logger.debug("LLMレスポンス: %s", raw)
-    return _parse_response(raw)
+    return parse_classify_response(raw)
+
+
+@dataclass
+class BatchDocument:
+    """A document waiting to be classified together with others."""
+
+    text: str
+    filename: str
+    file_extension: str
+    truncated: bool = False
+
+
+def build_batch_classify_prompt(
+    documents: Sequence[BatchDocument],
+    *,
+    prompt_dir: Path | None = None,
+) -> Prompt:
+    """Build one classification prompt covering several documents.
+
+    The system part is the same ``classify_system.txt`` as for single
+    documents, so batched and single requests share the cached prefix.
+    Documents are numbered ``doc-1``, ``doc-2``, ... in order.
+
+    Args:
+        documents: Documents to classify.
+        prompt_dir: Optional directory whose templates override the bundled ones.
+
+    Returns:
+        Prompt with system and user parts.
+    """
+    document_template = _load_prompt("classify_batch_document.txt", prompt_dir)
+    blocks = [
+        document_template.render(
+            id=_batch_id(i),
+            filename=doc.filename,
+            file_extension=doc.file_extension,
+            truncated=doc.truncated,
+            extracted_text=doc.text,
+        )
+        for i, doc in enumerate(documents)
+    ]
+    return Prompt(
+        system=_load_prompt("classify_system.txt", prompt_dir).render(),
+        user=_load_prompt("classify_batch_user.txt", prompt_dir).render(
+            count=len(documents),
+            documents="\n\n".join(blocks),
+        ),
+    )
+
+
+def _batch_id(index: int) -> str:
+    return f"doc-{index + 1}"
+
+
+def _parse_batch_entry(entry: Any) -> tuple[str, TriageResult] | None:
+    """Validate one element of a batch response. Returns None if malformed."""
+    if not isinstance(entry, dict) or "id" not in entry:
+        return None
+    triage = entry.get("classification")
+    try:
+        confidence = float(entry.get("confidence"))
+    except (TypeError, ValueError):
+        return None
+    if triage not in _TRIAGE_LABELS or not 0.0 <= confidence <= 1.0:
+        return None
+    topics = entry.get("topics", [])
+    return str(entry["id"]), TriageResult(
+        triage=triage,
+        confidence=confidence,
+        reason=str(entry.get("reason", "")),
+        topics=[str(t) for t in topics] if isinstance(topics, list) else [],
+    )
+
+
+def _parse_batch_response(raw: str) -> dict[str, TriageResult]:
+    """Parse a batch response into valid verdicts keyed by document id."""
+    json_str = _extract_json(raw)
+    try:
+        data = json.loads(json_str)
+    except json.JSONDecodeError:
+        # 配列の前後に説明文が付いた応答にも対応する
+        try:
+            data = json.loads(json_str[json_str.find("[") : json_str.rfind("]") + 1])
+        except json.JSONDecodeError:
+            return {}
+    if isinstance(data, dict):
+        # {"results": [...]} のように配列を包んだ応答
+        data = next((v for v in data.values() if isinstance(v, list)), [])
+    if not isinstance(data, list):
+        return {}
+
+    verdicts: dict[str, TriageResult] = {}
+    for entry in data:
+        parsed = _parse_batch_entry(entry)
+        if parsed is not None:
+            verdicts.setdefault(*parsed)
+    return verdicts
+
+
+def classify_batch(
+    documents: Sequence[BatchDocument],
+    *,
+    model: str,
+    timeout: int = 120,
+    api_base: str | None = None,
+    mode: str = "api",
+    provider: str = "",
+    rate_limiter: RateLimiter | None = None,
+    retry: RetryPolicy | None = None,
+    prompt_dir: Path | None = None,
+) -> list[TriageResult]:
+    """Classify several documents with a single LLM request.
+
+    The response is expected to be a JSON array of verdicts keyed by document
+    id. Entries that are missing or malformed (and every document, if the
+    request itself fails) are classified again one at a time with
+    ``classify_document``.
+
+    Args:
+        documents: Documents to classify.
+        model: litellm model string (e.g. "openai/gpt-4o") or CLI model name.
+        timeout: Request timeout in seconds.
+        api_base: Optional API base URL (for Ollama etc).
+        mode: "api" (litellm) or "cli" (CLI subprocess).
+        provider: CLI provider name (e.g. "claude", "codex"). Used when mode="cli".
+        rate_limiter: Optional shared rate limiter.
+        retry: Optional retry policy for transient LLM errors.
+        prompt_dir: Optional directory whose templates override the bundled ones.
+
+    Returns:
+        One TriageResult per document, in order.
+    """
+    llm_kwargs: dict[str, Any] = {
+        "model": model,
+        "timeout": timeout,
+        "api_base": api_base,
+        "mode": mode,
+        "provider": provider,
+        "rate_limiter": rate_limiter,
+        "retry": retry,
+    }
+    verdicts = _request_batch(documents, prompt_dir=prompt_dir, llm_kwargs=llm_kwargs)
+    results: list[TriageResult] = []
+    for i, doc in enumerate(documents):
+        result = verdicts.get(_batch_id(i))
+        if result is None:
+            if len(documents) > 1:
+                logger.info(
+                    "バッチ分類の結果が得られないため個別に再実行: %s", doc.filename
+                )
+            result = _classify_alone(doc, prompt_dir=prompt_dir, llm_kwargs=llm_kwargs)
+        results.append(result)
+    return results
+
+
+def _request_batch(
+    documents: Sequence[BatchDocument],
+    *,
+    prompt_dir: Path | None,
+    llm_kwargs: dict[str, Any],
+) -> dict[str, TriageResult]:
+    """Send one request for several documents and parse the verdicts.
+
+    Returns the verdicts keyed by document id; empty for a single document
+    or when the request fails with an expected LLM error.
+    """
+    if len(documents) < 2:
+        return {}
+    prompt = build_batch_classify_prompt(documents, prompt_dir=prompt_dir)
+    try:
+        raw = _call_llm(prompt=prompt, **llm_kwargs)
+    except _LLM_ERRORS as e:
+        logger.warning("バッチ分類の呼び出し失敗（個別に再実行）: %s", e)
+        return {}
+    logger.debug("バッチ分類レスポンス: %s", raw)
+    return _parse_batch_response(raw)
+
+
+def _classify_alone(
+    document: BatchDocument,
+    *,
+    prompt_dir: Path | None,
+    llm_kwargs: dict[str, Any],
+) -> TriageResult:
+    return classify_document(
+        text=document.text,
+        filename=document.filename,
+        file_extension=document.file_extension,
+        truncated=document.truncated,
+        prompt_dir=prompt_dir,
+        **llm_kwargs,
+    )
+
+
+class BatchClassifier:
+    """Groups small documents from concurrent workers into batched requests.
+
+    Each worker thread calls ``classify`` and blocks until its verdict is
+    ready. The call that fills a batch (``max_documents`` documents, or the
+    next document would exceed ``max_tokens``) sends it; a batch that does
+    not fill within ``wait_sec`` is sent by whichever of its callers times out
+    first. Documents larger than an even share of ``max_tokens`` are
+    classified on their own straight away. A document left without a verdict
+    (failed request, missing or malformed entry) is classified on its own by
+    its caller's thread through ``classify_document``, so the fallbacks run in
+    parallel and a failure only affects that document's result.
+
+    Args:
+        max_documents: Maximum number of documents per request.
+        max_tokens: Token budget for the documents of one request.
+        wait_sec: How long a partial batch waits for more documents.
+        tokenizer: Tokenizer used to measure documents.
+        prompt_dir: Optional directory whose templates override the bundled ones.
+        **llm_kwargs: LLM call arguments (as for ``classify_batch``).
+    """
+
+    def __init__(
+        self,
+        *,
+        max_documents: int,
+        max_tokens: int,
+        wait_sec: float = 2.0,
+        tokenizer: Tokenizer | None = None,
+        prompt_dir: Path | None = None,
+        **llm_kwargs: Any,
+    ) -> None:
+        self._max_documents = max(1, max_documents)
+        self._max_tokens = max_tokens
+        self._wait_sec = wait_sec
+        self._tokenizer = tokenizer or EstimateTokenizer()
+        self._prompt_dir = prompt_dir
+        # 省略時のタイムアウトは classify_batch / classify_document と同じ
+        self._llm_kwargs = {"timeout": 120, **llm_kwargs}
+        self._lock = threading.Lock()
+        self._pending: list[tuple[BatchDocument, Future[TriageResult | None]]] = []
+        self._pending_tokens = 0
+
+    def classify(self, document: BatchDocument) -> TriageResult:
+        """Classify ``document``, batched with others when it is small."""
+        tokens = self._tokenizer.count(document.text)
+        if tokens > self._max_tokens // self._max_documents:
+            return self._classify_alone(document)
+
+        future: Future[TriageResult | None] = Future()
+        ready: list[list[tuple[BatchDocument, Future[TriageResult | None]]]] = []
+        with self._lock:
+            if self._pending and self._pending_tokens + tokens > self._max_tokens:
+                ready.append(self._take())
+            self._pending.append((document, future))
+            self._pending_tokens += tokens
+            if len(self._pending) >= self._max_documents:
+                ready.append(self._take())
+        for batch in ready:
+            self._send(batch)
+
+        try:
+            result = future.result(timeout=self._wait_sec)
+        except TimeoutError:
+            # 待機時間内に埋まらなかったバッチは、まだ送信されていなければ自分で送る
+            with self._lock:
+                pending = any(f is future for _, f in self._pending)
+                batch = self._take() if pending else None
+            if batch is not None:
+                self._send(batch)
+            result = future.result()
+        # バッチで結果が得られなかった文書は、送信側ではなく各呼び出し元で個別に分類する
+        return result if result is not None else self._classify_alone(document)
+
+    def _classify_alone(self, document: BatchDocument) -> TriageResult:
+        return _classify_alone(
+            document, prompt_dir=self._prompt_dir, llm_kwargs=self._llm_kwargs
+        )
+
+    def _take(self) -> list[tuple[BatchDocument, Future[TriageResult | None]]]:
+        batch, self._pending = self._pending, []
+        self._pending_tokens = 0
+        return batch
+
+    def _send(
+        self, batch: list[tuple[BatchDocument, Future[TriageResult | None]]]
+    ) -> None:
+        """Send one batched request and hand each caller its verdict (or None)."""
+        if len(batch) > 1:
+            logger.info("バッチ分類: %d 件を1リクエストで分類", len(batch))
+        try:
+            verdicts = _request_batch(
+                [doc for doc, _ in batch],
+                prompt_dir=self._prompt_dir,
+                llm_kwargs=self._llm_kwargs,
+            )
+        except Exception:
+            # 想定外のエラーでも実行は止めず、各文書を個別の分類（エラーは結果に記録）に回す
+            logger.exception("バッチ分類失敗（個別に再実行）: %d 件", len(batch))
+            verdicts = {}
+        for i, (doc, future) in enumerate(batch):
+            verdict = verdicts.get(_batch_id(i))
+            if verdict is None and len(batch) > 1:
+                logger.info(
+                    "バッチ分類の結果が得られないため個別に再実行: %s", doc.filename
+                )
+            future.set_result(verdict)
 
 
 def apply_threshold(
@@ -0,0 +1,552 @@
+"""Tests for batch_api module and the batch submit / collect workflow."""
+
+import json
+import threading
+from collections.abc import Callable, Iterator
+from email.message import Message
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any
+from unittest.mock import patch
+
+import pytest
+
+from doc_triager.batch_api import (
+    AnthropicBatchClient,
+    BatchApiError,
+    BatchSubmission,
+    OpenAIBatchClient,
+    collect_batches,
+    create_batch_client,
+)
+from doc_triager.config import (
+    Config,
+    DatabaseConfig,
+    InputConfig,
+    LlmConfig,
+    OutputConfig,
+    TextExtractionConfig,
+    TriageConfig,
+)
+from doc_triager.database import (
+    TriageDatabase,
+    export_all,
+    get_by_source_path,
+    init_database,
+)
+from doc_triager.pipeline import process_files
+from doc_triager.prompts import Prompt
+
+
+class _StandInServer(ThreadingHTTPServer):
+    """In-memory stand-in for the OpenAI and Anthropic batch endpoints."""
+
+    def __init__(self) -> None:
+        super().__init__(("127.0.0.1", 0), _StandInHandler)
+        self.files: dict[str, bytes] = {}
+        self.batches: dict[str, dict[str, Any]] = {}
+        self.inputs: dict[str, list[dict[str, Any]]] = {}
+        self.outputs: dict[str, bytes] = {}
+        self.headers_seen: list[Message] = []
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}/v1"
+
+    def complete(
+        self, job_id: str, respond: Callable[[dict[str, Any]], str | None]
+    ) -> None:
+        """End a job, answering each request line with ``respond`` (None = error)."""
+        batch = self.batches[job_id]
+        lines = []
+        for request in self.inputs[job_id]:
+            text = respond(request)
+            if "processing_status" in batch:
+                result = (
+                    {
+                        "type": "succeeded",
+                        "message": {"content": [{"type": "text", "text": text}]},
+                    }
+                    if text is not None
+                    else {"type": "errored", "error": {"type": "server_error"}}
+                )
+                lines.append({"custom_id": request["custom_id"], "result": result})
+            elif text is not None:
+                lines.append(
+                    {
+                        "custom_id": request["custom_id"],
+                        "response": {
+                            "status_code": 200,
+                            "body": {"choices": [{"message": {"content": text}}]},
+                        },
+                        "error": None,
+                    }
+                )
+        content = "".join(json.dumps(line) + "\n" for line in lines).encode()
+        if "processing_status" in batch:
+            batch["processing_status"] = "ended"
+            batch["results_url"] = f"{self.base_url}/messages/batches/{job_id}/results"
+            self.outputs[job_id] = content
+        else:
+            batch["status"] = "completed"
+            batch["output_file_id"] = f"file-out-{job_id}"
+            self.files[batch["output_file_id"]] = content
+
+
+class _StandInHandler(BaseHTTPRequestHandler):
+    server: _StandInServer
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+    def _reply(self, status: int, body: Any) -> None:
+        data = body if isinstance(body, bytes) else json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _body(self) -> bytes:
+        return self.rfile.read(int(self.headers.get("Content-Length", 0)))
+
+    def do_POST(self) -> None:
+        self.server.headers_seen.append(self.headers)
+        body = self._body()
+        if self.path == "/v1/files":
+            if b'name="purpose"\r\n\r\nbatch' not in body:
+                self._reply(400, {"error": "purpose must be batch"})
+                return
+            boundary = self.headers["Content-Type"].split("boundary=")[1].encode()
+            content = body.split(b"\r\n\r\n", 2)[2].rsplit(b"\r\n--" + boundary, 1)[0]
+            file_id = f"file-{len(self.server.files) + 1}"
+            self.server.files[file_id] = content
+            self._reply(200, {"id": file_id})
+        elif self.path == "/v1/batches":
+            request = json.loads(body)
+            job_id = f"batch_{len(self.server.batches) + 1}"
+            content = self.server.files[request["input_file_id"]].decode()
+            self.server.inputs[job_id] = [
+                json.loads(line) for line in content.splitlines() if line
+            ]
+            self.server.batches[job_id] = {"id": job_id, "status": "in_progress"}
+            self._reply(200, self.server.batches[job_id])
+        elif self.path == "/v1/messages/batches":
+            job_id = f"msgbatch_{len(self.server.batches) + 1}"
+            self.server.inputs[job_id] = json.loads(body)["requests"]
+            self.server.batches[job_id] = {
+                "id": job_id,
+                "processing_status": "in_progress",
+            }
+            self._reply(200, self.server.batches[job_id])
+        else:
+            self._reply(404, {"error": "not found"})
+
+    def do_GET(self) -> None:
+        self.server.headers_seen.append(self.headers)
+        parts = self.path.strip("/").split("/")
+        if parts[1:2] == ["batches"] and parts[2] in self.server.batches:
+            self._reply(200, self.server.batches[parts[2]])
+        elif parts[1:2] == ["files"] and parts[2] in self.server.files:
+            self._reply(200, self.server.files[parts[2]])
+        elif parts[1:3] == ["messages", "batches"] and len(parts) == 4:
+            self._reply(200, self.server.batches[parts[3]])
+        elif parts[1:3] == ["messages", "batches"] and parts[-1] == "results":
+            self._reply(200, self.server.outputs[parts[3]])
+        else:
+            self._reply(404, {"error": "not found"})
+
+
+@pytest.fixture()
+def stand_in() -> Iterator[_StandInServer]:
+    server = _StandInServer()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _verdict(classification: str = "evergreen", confidence: float = 0.9) -> str:
+    return json.dumps(
+        {
+            "classification": classification,
+            "confidence": confidence,
+            "reason": "Batch reason",
+            "topics": ["batch"],
+        }
+    )
+
+
+def _write_requests(client: Any, path: Path, count: int) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        for i in range(1, count + 1):
+            line = client.request_line(
+                custom_id=f"doc-{i}",
+                prompt=Prompt(system="Instructions", user=f"Document {i}"),
+                model="test-model",
+                max_tokens=256,
+            )
+            f.write(json.dumps(line) + "\n")
+
+
+class TestCreateBatchClient:
+    """Tests for create_batch_client."""
+
+    def test_supported_providers(self) -> None:
+        assert isinstance(create_batch_client("openai", api_key="k"), OpenAIBatchClient)
+        assert isinstance(
+            create_batch_client("anthropic", api_key="k"), AnthropicBatchClient
+        )
+
+    def test_unsupported_provider_raises(self) -> None:
+        with pytest.raises(ValueError, match="バッチAPI"):
+            create_batch_client("ollama", api_key="k")
+
+
+class TestOpenAIBatchClient:
+    """Tests for the OpenAI Batch API client."""
+
+    def test_request_line_format(self) -> None:
+        client = OpenAIBatchClient(api_key="k")
+
+        line = client.request_line(
+            custom_id="doc-1",
+            prompt=Prompt(system="Instructions", user="Document"),
+            model="gpt-4o",
+            max_tokens=256,
+        )
+
+        assert line["custom_id"] == "doc-1"
+        assert line["method"] == "POST"
+        assert line["url"] == "/v1/chat/completions"
+        assert line["body"]["model"] == "gpt-4o"
+        assert line["body"]["messages"] == [
+            {"role": "system", "content": "Instructions"},
+            {"role": "user", "content": "Document"},
+        ]
+
+    def test_submit_poll_and_results(
+        self, stand_in: _StandInServer, tmp_path: Path
+    ) -> None:
+        client = OpenAIBatchClient(api_key="sk-test", base_url=stand_in.base_url)
+        input_path = tmp_path / "requests.jsonl"
+        _write_requests(client, input_path, 3)
+
+        job_id = client.submit(input_path)
+
+        assert len(stand_in.inputs[job_id]) == 3
+        assert stand_in.headers_seen[0]["Authorization"] == "Bearer sk-test"
+        assert client.poll(job_id).ended is False
+
+        # 2件目は失敗（出力に含まれない）
+        stand_in.complete(
+            job_id,
+            lambda r: None if r["custom_id"] == "doc-2" else _verdict(),
+        )
+        status = client.poll(job_id)
+        results = {r.custom_id: r for r in client.results(job_id)}
+
+        assert status.ended is True
+        assert status.status == "completed"
+        assert set(results) == {"doc-1", "doc-3"}
+        assert json.loads(results["doc-1"].text)["classification"] == "evergreen"
+
+    def test_error_line_is_parsed_as_error(self) -> None:
+        result = OpenAIBatchClient._parse_line(
+            {
+                "custom_id": "doc-1",
+                "response": {"status_code": 429, "body": {"error": "rate limited"}},
+                "error": None,
+            }
+        )
+
+        assert result.text is None
+        assert result.error == "rate limited"
+
+    def test_http_error_raises_batch_api_error(self, stand_in: _StandInServer) -> None:
+        client = OpenAIBatchClient(api_key="k", base_url=stand_in.base_url)
+
+        with pytest.raises(BatchApiError, match="404"):
+            client.poll("batch_missing")
+
+
+class TestAnthropicBatchClient:
+    """Tests for the Anthropic Message Batches API client."""
+
+    def test_request_line_caches_system_prompt(self) -> None:
+        client = AnthropicBatchClient(api_key="k")
+
+        line = client.request_line(
+            custom_id="doc-1",
+            prompt=Prompt(system="Instructions. " * 400, user="Document"),
+            model="claude-sonnet-4-5",
+            max_tokens=256,
+        )
+
+        params = line["params"]
+        assert line["custom_id"] == "doc-1"
+        assert params["max_tokens"] == 256
+        assert params["system"][0]["cache_control"] == {"type": "ephemeral"}
+        assert params["messages"] == [{"role": "user", "content": "Document"}]
+
+    def test_short_system_prompt_is_not_marked_for_caching(self) -> None:
+        client = AnthropicBatchClient(api_key="k")
+
+        line = client.request_line(
+            custom_id="doc-1",
+            prompt=Prompt(system="Instructions", user="Document"),
+            model="claude-sonnet-4-5",
+            max_tokens=256,
+        )
+
+        assert line["params"]["system"] == [{"type": "text", "text": "Instructions"}]
+
+    def test_submit_poll_and_results(
+        self, stand_in: _StandInServer, tmp_path: Path
+    ) -> None:
+        client = AnthropicBatchClient(api_key="ak-test", base_url=stand_in.base_url)
+        input_path = tmp_path / "requests.jsonl"
+        _write_requests(client, input_path, 2)
+
+        job_id = client.submit(input_path)
+
+        assert stand_in.headers_seen[0]["x-api-key"] == "ak-test"
+        assert stand_in.headers_seen[0]["anthropic-version"] == "2023-06-01"
+        assert client.poll(job_id).ended is False
+
+        stand_in.complete(
+            job_id,
+            lambda r: None if r["custom_id"] == "doc-2" else _verdict("temporal"),
+        )
+        results = {r.custom_id: r for r in client.results(job_id)}
+
+        assert client.poll(job_id).ended is True
+        assert json.loads(results["doc-1"].text)["classification"] == "temporal"
+        assert results["doc-2"].text is None
+        assert "server_error" in results["doc-2"].error
+
+
+class TestBatchSubmission:
+    """Tests for splitting requests into job files."""
+
+    def _add(self, submission: BatchSubmission, tmp_path: Path, count: int) -> None:
+        for i in range(count):
+            f = tmp_path / f"{i}.md"
+            f.write_text("x")
+            submission.add(
+                file_path=f,
+                checksum=f"sum{i}",
+                file_stat=f.stat(),
+                prompt=Prompt(system="", user="本文" * 500),
+                extracted_text_length=1000,
+                truncated=False,
+            )
+
+    def _submission(self, tmp_path: Path, **limits: int) -> BatchSubmission:
+        return BatchSubmission(
+            client=OpenAIBatchClient(api_key="k"),
+            directory=tmp_path / "batches",
+            provider="openai",
+            model="gpt-4o",
+            max_output_tokens=256,
+            **limits,
+        )
+
+    def test_splits_by_request_count(self, tmp_path: Path) -> None:
+        submission = self._submission(tmp_path, max_requests=2, max_bytes=10**9)
+
+        self._add(submission, tmp_path, 5)
+
+        files = sorted((tmp_path / "batches").iterdir())
+        assert [len(f.read_text().splitlines()) for f in files] == [2, 2, 1]
+
+    def test_splits_by_size(self, tmp_path: Path) -> None:
+        """1ファイルが容量上限を超える前に次のファイルへ分割する。"""
+        submission = self._submission(tmp_path, max_requests=100, max_bytes=8000)
+
+        self._add(submission, tmp_path, 5)
+
+        files = sorted((tmp_path / "batches").iterdir())
+        assert [len(f.read_text().splitlines()) for f in files] == [2, 2, 1]
+        assert all(f.stat().st_size <= 8000 for f in files)
+        ids = [json.loads(line)["custom_id"] for line in files[1].open()]
+        assert ids == ["doc-1", "doc-2"]
+
+    def test_oversized_request_gets_its_own_file(self, tmp_path: Path) -> None:
+        submission = self._submission(tmp_path, max_requests=100, max_bytes=100)
+
+        self._add(submission, tmp_path, 2)
+
+        files = sorted((tmp_path / "batches").iterdir())
+        assert [len(f.read_text().splitlines()) for f in files] == [1, 1]
+
+
+@pytest.fixture()
+def workspace(tmp_path: Path, stand_in: _StandInServer) -> dict:
+    source_dir = tmp_path / "source"
+    output_dir = tmp_path / "output"
+    source_dir.mkdir()
+    output_dir.mkdir()
+    db_path = tmp_path / "test.db"
+    init_database(db_path)
+    for name in ("a.md", "b.md"):
+        (source_dir / name).write_text(f"# {name}\n\n" + "Design principles. " * 20)
+
+    cfg = Config(
+        input=InputConfig(directory=str(source_dir)),
+        output=OutputConfig(directory=str(output_dir)),
+        triage=TriageConfig(confidence_threshold=0.7),
+        llm=LlmConfig(provider="openai", model="gpt-4o", base_url=stand_in.base_url),
+        database=DatabaseConfig(path=str(db_path)),
+        text_extraction=TextExtractionConfig(min_text_length=10),
+    )
+    return {
+        "source_dir": source_dir,
+        "output_dir": output_dir,
+        "db_path": db_path,
+        "cfg": cfg,
+        "client": OpenAIBatchClient(api_key="k", base_url=stand_in.base_url),
+    }
+
+
+class TestBatchWorkflow:
+    """Tests for run --batch-submit and batch-collect."""
+
+    def _submit(self, workspace: dict) -> dict[str, int]:
+        cfg = workspace["cfg"]
+        return process_files(
+            files=sorted(workspace["source_dir"].glob("*.md")),
+            cfg=cfg,
+            dry_run=False,
+            batch_submission=BatchSubmission.from_config(
+                cfg, client=workspace["client"]
+            ),
+        )
+
+    def test_submit_records_job_without_moving(
+        self, workspace: dict, stand_in: _StandInServer
+    ) -> None:
+        summary = self._submit(workspace)
+
+        assert summary["submitted"] == 2
+        assert len(stand_in.batches) == 1
+        assert (workspace["source_dir"] / "a.md").exists()
+        with TriageDatabase(workspace["db_path"]) as db:
+            jobs = db.list_pending_batch_jobs()
+            items = db.get_batch_items(jobs[0]["job_id"])
+        assert jobs[0]["request_count"] == 2
+        assert [Path(i["source_path"]).name for i in items] == ["a.md", "b.md"]
+        # JSONL はデータベースの隣の batches/ に残る
+        assert Path(jobs[0]["input_path"]).parent == workspace["db_path"].parent / (
+            "batches"
+        )
+
+    def test_aborted_run_leaves_no_partial_file(
+        self, workspace: dict, stand_in: _StandInServer
+    ) -> None:
+        """投入前に中断した実行は書きかけの JSONL を残さない。"""
+        batches_dir = workspace["db_path"].parent / "batches"
+
+        with (
+            patch(
+                "doc_triager.pipeline._tally",
+                side_effect=[None, RuntimeError("aborted")],
+            ),
+            pytest.raises(RuntimeError, match="aborted"),
+        ):
+            self._submit(workspace)
+
+        assert batches_dir.is_dir()
+        assert list(batches_dir.iterdir()) == []
+        assert stand_in.batches == {}
+        # 中断した実行の対象ファイルは次回の投入で送られる
+        assert self._submit(workspace)["submitted"] == 2
+
+    def test_pending_files_are_not_submitted_again(
+        self, workspace: dict, stand_in: _StandInServer
+    ) -> None:
+        self._submit(workspace)
+
+        summary = self._submit(workspace)
+
+        assert summary["skipped"] == 2
+        assert summary["submitted"] == 0
+        assert len(stand_in.batches) == 1
+
+    def test_collect_moves_and_records(
+        self, workspace: dict, stand_in: _StandInServer
+    ) -> None:
+        """結果が揃ったジョブだけを回収し、移動と DB 記録を行う。"""
+        cfg = workspace["cfg"]
+        self._submit(workspace)
+
+        running = collect_batches(
+            cfg=cfg, client=workspace["client"], db=workspace["db_path"]
+        )
+        assert running["running"] == 1
+        assert (workspace["source_dir"] / "a.md").exists()
+
+        job_id = next(iter(stand_in.batches))
+        stand_in.complete(
+            job_id,
+            lambda r: _verdict() if r["custom_id"] == "doc-1" else None,
+        )
+        summary = collect_batches(
+            cfg=cfg, client=workspace["client"], db=workspace["db_path"]
+        )
+
+        assert summary == {
+            "jobs": 1,
+            "running": 0,
+            "evergreen": 1,
+            "temporal": 0,
+            "unknown": 0,
+            "error": 0,
+            "unresolved": 1,
+        }
+        assert (workspace["output_dir"] / "evergreen" / "a.md").exists()
+        record = get_by_source_path(
+            workspace["db_path"], str(workspace["source_dir"] / "a.md")
+        )
+        assert record is not None
+        assert record["triage"] == "evergreen"
+        assert record["topics"] == '["batch"]'
+        # 結果のなかったファイルは次回の投入で再実行される
+        assert (workspace["source_dir"] / "b.md").exists()
+        resubmit = self._submit(workspace)
+        assert resubmit["submitted"] == 1
+
+    def test_results_are_written_before_job_is_marked_collected(
+        self, workspace: dict, stand_in: _StandInServer
+    ) -> None:
+        """バッファ中の結果を書き込んでからジョブを回収済みにする。"""
+        self._submit(workspace)
+        stand_in.complete(next(iter(stand_in.batches)), lambda r: _verdict())
+        written: list[int] = []
+
+        def mark_collected(self: TriageDatabase, job_id: str, *, status: str) -> None:
+            written.append(len(export_all(workspace["db_path"])))
+
+        with (
+            TriageDatabase(workspace["db_path"], flush_rows=100) as db,
+            patch.object(TriageDatabase, "mark_batch_job_collected", mark_collected),
+        ):
+            collect_batches(cfg=workspace["cfg"], client=workspace["client"], db=db)
+
+        assert written == [2]
+
+    def test_file_changed_after_submit_is_left_for_resubmission(
+        self, workspace: dict, stand_in: _StandInServer
+    ) -> None:
+        self._submit(workspace)
+        changed = workspace["source_dir"] / "a.md"
+        changed.write_text("# changed\n\n" + "Different content. " * 30)
+        stand_in.complete(next(iter(stand_in.batches)), lambda r: _verdict())
+
+        summary = collect_batches(
+            cfg=workspace["cfg"], client=workspace["client"], db=workspace["db_path"]
+        )
+
+        assert summary["unresolved"] == 1
+        assert summary["evergreen"] == 1
+        assert changed.exists()
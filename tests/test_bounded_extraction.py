@@ -0,0 +1,209 @@
+"""Tests for bounded_extraction module."""
+
+from collections.abc import Iterator
+from pathlib import Path
+
+import pytest
+
+from doc_triager.bounded_extraction import (
+    OMITTED_MARKER,
+    _head_tail,
+    _stream_head,
+    extract_bounded,
+)
+
+
+def _write_pdf(path: Path, pages: list[str]) -> None:
+    """Write a minimal PDF with one line of Helvetica text per page."""
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"",  # ページツリー（ページ番号確定後に埋める）
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    kids = []
+    for text in pages:
+        stream = f"BT /F1 12 Tf 72 720 Td ({text}) Tj ET".encode()
+        objects.append(
+            b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream)
+        )
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792]"
+            b" /Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>"
+            % (len(objects))
+        )
+        kids.append(f"{len(objects)} 0 R")
+    objects[1] = (
+        f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(pages)} >>".encode()
+    )
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    for offset in offsets:
+        out += b"%010d 00000 n \n" % offset
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (
+        len(objects) + 1,
+        xref,
+    )
+    path.write_bytes(bytes(out))
+
+
+class TestHeadTail:
+    """Tests for head/tail selection over random-access units."""
+
+    def test_renders_only_both_ends(self) -> None:
+        rendered: list[int] = []
+
+        def render(i: int) -> str:
+            rendered.append(i)
+            return f"[{i}]" + "x" * 7
+
+        text, complete = _head_tail(100, render, head_chars=20, tail_chars=10)
+
+        assert complete is False
+        assert sorted(rendered) == [0, 1, 99]
+        assert text.startswith("[0]")
+        assert text.endswith("[99]xxxxxxx")
+        assert "[...omitted...]" in text
+
+    def test_small_sequence_is_complete(self) -> None:
+        text, complete = _head_tail(3, str, head_chars=20, tail_chars=10)
+
+        assert complete is True
+        assert text == "012"
+
+
+class TestStreamHead:
+    """Tests for head selection over a forward-only stream."""
+
+    def test_stops_reading_once_budget_is_filled(self) -> None:
+        read: list[int] = []
+
+        def chunks() -> Iterator[str]:
+            for i in range(1000):
+                read.append(i)
+                yield f"{i:03d}\n"
+
+        text, complete = _stream_head(chunks(), max_chars=12)
+
+        assert complete is False
+        assert text == "000\n001\n002\n" + OMITTED_MARKER
+        assert read == [0, 1, 2, 3]
+
+    def test_short_stream_is_complete(self) -> None:
+        text, complete = _stream_head(["a", "b", "c"], 12)
+
+        assert complete is True
+        assert text == "abc"
+
+
+class TestExtractBounded:
+    """Tests for extract_bounded format dispatch."""
+
+    def test_unsupported_format_returns_none(self, tmp_path: Path) -> None:
+        f = tmp_path / "a.docx"
+        f.write_bytes(b"PK")
+
+        assert extract_bounded(f, max_chars=100) is None
+
+    def test_long_pdf_reads_first_and_last_pages(self, tmp_path: Path) -> None:
+        """長い PDF は先頭と末尾のページだけを変換する。"""
+        pytest.importorskip("pdfminer")
+        f = tmp_path / "long.pdf"
+        _write_pdf(f, [f"Page {i:03d} body text" for i in range(1, 201)])
+
+        result = extract_bounded(f, max_chars=90)
+
+        assert result is not None
+        assert result.complete is False
+        assert "Page 001" in result.text
+        assert "Page 200" in result.text
+        assert "Page 100" not in result.text
+
+    def test_short_pdf_is_returned_whole(self, tmp_path: Path) -> None:
+        pytest.importorskip("pdfminer")
+        f = tmp_path / "short.pdf"
+        _write_pdf(f, ["Page one", "Page two"])
+
+        result = extract_bounded(f, max_chars=8000)
+
+        assert result is not None
+        assert result.complete is True
+        assert result.exact is True
+        assert "Page one" in result.text
+        assert "Page two" in result.text
+
+    def test_long_xlsx_reads_only_leading_rows(self, tmp_path: Path) -> None:
+        """長いブックは先頭の行だけを読み、予算が埋まったら読み込みをやめる。"""
+        openpyxl = pytest.importorskip("openpyxl")
+        f = tmp_path / "big.xlsx"
+        workbook = openpyxl.Workbook()
+        sheet = workbook.active
+        sheet.title = "Data"
+        for i in range(5000):
+            sheet.append([f"row{i:04d}", i])
+        workbook.save(f)
+
+        result = extract_bounded(f, max_chars=300)
+
+        assert result is not None
+        assert result.complete is False
+        assert result.exact is False
+        assert result.text.startswith("## Data\n| row0000 | 0 |")
+        assert result.text.endswith(OMITTED_MARKER)
+        assert len(result.text) < 400
+        assert "row4999" not in result.text
+
+    def test_small_xlsx_is_returned_whole(self, tmp_path: Path) -> None:
+        """全体が予算に収まる場合も変換済みのテキストを返し、二度変換しない。"""
+        openpyxl = pytest.importorskip("openpyxl")
+        f = tmp_path / "small.xlsx"
+        workbook = openpyxl.Workbook()
+        workbook.active.title = "Data"
+        workbook.active.append(["a", "b"])
+        workbook.save(f)
+
+        result = extract_bounded(f, max_chars=8000)
+
+        assert result is not None
+        assert result.complete is True
+        assert result.exact is False
+        assert result.text.startswith("## Data\n| a | b |")
+
+    def test_long_pptx_reads_first_and_last_slides(self, tmp_path: Path) -> None:
+        pptx = pytest.importorskip("pptx")
+        f = tmp_path / "deck.pptx"
+        presentation = pptx.Presentation()
+        for i in range(1, 101):
+            slide = presentation.slides.add_slide(presentation.slide_layouts[1])
+            slide.shapes.title.text = f"Slide {i:03d}"
+            slide.placeholders[1].text = "Bullet text " * 3
+        presentation.save(f)
+
+        result = extract_bounded(f, max_chars=300)
+
+        assert result is not None
+        assert result.complete is False
+        assert "# Slide 001" in result.text
+        assert "# Slide 100" in result.text
+        assert "Slide 050" not in result.text
+
+    def test_small_pptx_is_returned_whole(self, tmp_path: Path) -> None:
+        pptx = pytest.importorskip("pptx")
+        f = tmp_path / "deck.pptx"
+        presentation = pptx.Presentation()
+        for i in range(1, 4):
+            slide = presentation.slides.add_slide(presentation.slide_layouts[1])
+            slide.shapes.title.text = f"Slide {i:03d}"
+        presentation.save(f)
+
+        result = extract_bounded(f, max_chars=8000)
+
+        assert result is not None
+        assert result.complete is True
+        assert "# Slide 001" in result.text
+        assert "# Slide 003" in result.text
@@ -1,12 +1,14 @@
 """Tests for checksum module."""
 
 import hashlib
+import os
 from datetime import datetime
 from pathlib import Path
+from unittest.mock import patch
 
 import pytest
 
-from doc_triager.checksum import compute_checksum, is_processed
+from doc_triager.checksum import compute_checksum, is_processed, is_unchanged
 
 
 class TestComputeChecksum:
@@ -49,6 +51,15 @@ class TestComputeChecksum:
 
         assert result == expected
 
+    def test_small_buffer_size(self, tmp_path: Path) -> None:
+        f = tmp_path / "data.bin"
+        data = bytes(range(256)) * 100
+        f.write_bytes(data)
+
+        result = compute_checksum(f, buf_size=7)
+
+        assert result == hashlib.sha256(data).hexdigest()
+
     def test_empty_file(self, tmp_path: Path) -> None:
         f = tmp_path / "empty.txt"
         f.write_bytes(b"")
@@ -74,19 +85,28 @@ class TestIsProcessed:
         init_database(p)
         return p
 
-    def _insert_record(self, db_path: Path, *, source_path: str, checksum: str) -> None:
+    def _insert_record(
+        self,
+        db_path: Path,
+        *,
+        source_path: str,
+        checksum: str,
+        stat: os.stat_result | None = None,
+    ) -> None:
         from doc_triager.database import insert_result
 
-        insert_result(
-            db_path,
-            {
-                "source_path": source_path,
-                "checksum": checksum,
-                "triage": "evergreen",
-                "confidence": 0.9,
-                "processed_at": datetime.now(),
-            },
-        )
+        record = {
+            "source_path": source_path,
+            "checksum": checksum,
+            "triage": "evergreen",
+            "confidence": 0.9,
+            "processed_at": datetime.now(),
+        }
+        if stat is not None:
+            record["file_size"] = stat.st_size
+            record["file_mtime_ns"] = stat.st_mtime_ns
+            record["file_inode"] = stat.st_ino
+        insert_result(db_path, record)
 
     def test_unprocessed_file(self, db_path: Path, tmp_path: Path) -> None:
         f = tmp_path / "new.txt"
@@ -120,3 +140,136 @@ class TestIsProcessed:
         result = is_processed(db_path, f)
 
         assert result is False
+
+    def test_precomputed_checksum_skips_hashing(
+        self, db_path: Path, tmp_path: Path
+    ) -> None:
+        """チェックサムを渡した場合はファイルを再度読まない。"""
+        f = tmp_path / "done.txt"
+        content = b"already done"
+        f.write_bytes(content)
+        checksum = hashlib.sha256(content).hexdigest()
+        self._insert_record(db_path, source_path=str(f), checksum=checksum)
+
+        with patch("doc_triager.checksum.compute_checksum") as mock_compute:
+            result = is_processed(db_path, f, checksum=checksum)
+
+        assert result is True
+        mock_compute.assert_not_called()
+
+    def test_precomputed_checksum_mismatch(self, db_path: Path, tmp_path: Path) -> None:
+        f = tmp_path / "changed.txt"
+        f.write_bytes(b"original")
+        old_checksum = hashlib.sha256(b"original").hexdigest()
+        self._insert_record(db_path, source_path=str(f), checksum=old_checksum)
+
+        result = is_processed(
+            db_path, f, checksum=hashlib.sha256(b"modified").hexdigest()
+        )
+
+        assert result is False
+
+    def test_stat_match_skips_hashing(self, db_path: Path, tmp_path: Path) -> None:
+        """サイズ・mtime・inode が一致すればファイルを読まない。"""
+        f = tmp_path / "done.txt"
+        f.write_bytes(b"already done")
+        self._insert_record(
+            db_path, source_path=str(f), checksum="stale", stat=f.stat()
+        )
+
+        with patch("doc_triager.checksum.compute_checksum") as mock_compute:
+            result = is_processed(db_path, f)
+
+        assert result is True
+        mock_compute.assert_not_called()
+
+    def test_paranoid_ignores_stat_match(self, db_path: Path, tmp_path: Path) -> None:
+        f = tmp_path / "done.txt"
+        f.write_bytes(b"already done")
+        self._insert_record(
+            db_path, source_path=str(f), checksum="stale", stat=f.stat()
+        )
+
+        result = is_processed(db_path, f, paranoid=True)
+
+        assert result is False
+
+    def test_stat_mismatch_falls_back_to_checksum(
+        self, db_path: Path, tmp_path: Path
+    ) -> None:
+        """mtime だけ変わった場合はチェックサムで照合する。"""
+        f = tmp_path / "touched.txt"
+        content = b"same content"
+        f.write_bytes(content)
+        self._insert_record(
+            db_path,
+            source_path=str(f),
+            checksum=hashlib.sha256(content).hexdigest(),
+            stat=f.stat(),
+        )
+        st = f.stat()
+        os.utime(f, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+        assert is_unchanged(db_path, f) is False
+
+    def test_uses_preloaded_index(self, db_path: Path, tmp_path: Path) -> None:
+        """事前読込した索引から判定できる。"""
+        from doc_triager.database import TriageDatabase
+
+        f = tmp_path / "a.txt"
+        f.write_bytes(b"a")
+        st = f.stat()
+        with TriageDatabase(db_path) as db:
+            db.insert_result(
+                {
+                    "source_path": str(f),
+                    "checksum": "x",
+                    "file_size": st.st_size,
+                    "file_mtime_ns": st.st_mtime_ns,
+                    "file_inode": st.st_ino,
+                    "triage": "evergreen",
+                    "processed_at": datetime.now(),
+                }
+            )
+            db.preload_processed()
+
+            assert is_unchanged(db, f) is True
+        assert is_processed(db_path, f) is True
+
+
+class TestIsUnchanged:
+    """Tests for is_unchanged function."""
+
+    @pytest.fixture()
+    def db_path(self, tmp_path: Path) -> Path:
+        from doc_triager.database import init_database
+
+        p = tmp_path / "test.db"
+        init_database(p)
+        return p
+
+    def test_unrecorded_file(self, db_path: Path, tmp_path: Path) -> None:
+        f = tmp_path / "new.txt"
+        f.write_bytes(b"new")
+
+        assert is_unchanged(db_path, f) is False
+
+    def test_record_without_stat_is_not_unchanged(
+        self, db_path: Path, tmp_path: Path
+    ) -> None:
+        """stat 未記録の古いレコードは一致扱いにしない。"""
+        from doc_triager.database import insert_result
+
+        f = tmp_path / "old.txt"
+        f.write_bytes(b"old")
+        insert_result(
+            db_path,
+            {
+                "source_path": str(f),
+                "checksum": "x",
+                "triage": "evergreen",
+                "processed_at": datetime.now(),
+            },
+        )
+
+        assert is_unchanged(db_path, f) is False
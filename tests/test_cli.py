@@ -1,13 +1,14 @@
 """Tests for cli module."""
 
 import textwrap
+from datetime import UTC, datetime
 from pathlib import Path
 from unittest.mock import patch
 
 from typer.testing import CliRunner
 
 from doc_triager.cli import app
-from doc_triager.database import init_database
+from doc_triager.database import init_database, insert_result
 
 runner = CliRunner()
 
@@ -123,3 +124,96 @@ class TestLimitAndMaxFiles:
 
         assert result.exit_code == 0
         assert mock_process_file.call_count == 3
+
+    @patch("doc_triager.pipeline.process_file")
+    def test_limit_counts_only_unprocessed_files(
+        self, mock_process_file, tmp_path: Path
+    ) -> None:
+        """--limit は処理済みファイルを除いた次の N 件を対象にする。"""
+        mock_process_file.return_value = {
+            "triage": None,
+            "skipped": False,
+            "error": None,
+        }
+        config_file = _setup_workspace(tmp_path, max_files=0)
+        for i in range(2):
+            path = tmp_path / "source" / f"doc{i}.pdf"
+            st = path.stat()
+            insert_result(
+                tmp_path / "test.db",
+                {
+                    "source_path": str(path),
+                    "checksum": f"sha256:{i}",
+                    "file_size": st.st_size,
+                    "file_mtime_ns": st.st_mtime_ns,
+                    "file_inode": st.st_ino,
+                    "triage": "evergreen",
+                    "confidence": 0.9,
+                    "processed_at": datetime(2025, 1, 1, tzinfo=UTC),
+                },
+            )
+
+        result = runner.invoke(
+            app, ["run", "--config", str(config_file), "--dry-run", "--limit", "2"]
+        )
+
+        assert result.exit_code == 0
+        processed = [
+            c.kwargs["file_path"].name for c in mock_process_file.call_args_list
+        ]
+        assert processed == ["doc2.pdf", "doc3.pdf"]
+
+
+class TestBatchCommands:
+    """Tests for run --batch-submit and batch-collect options."""
+
+    def test_batch_submit_requires_api_key(self, tmp_path: Path, monkeypatch) -> None:
+        monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+        monkeypatch.chdir(tmp_path)
+        config_file = _setup_workspace(tmp_path)
+
+        result = runner.invoke(
+            app, ["run", "--config", str(config_file), "--batch-submit"]
+        )
+
+        assert result.exit_code == 1
+        assert "OPENAI_API_KEY" in result.output
+
+    @patch("doc_triager.cli.process_files")
+    def test_batch_submit_rejects_llm_summary(
+        self, mock_process_files, tmp_path: Path, monkeypatch
+    ) -> None:
+        """バッチ投入では要約を作らないため、要約の有効化とは併用できない。"""
+        monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+        monkeypatch.chdir(tmp_path)
+        config_file = _setup_workspace(tmp_path)
+        config_file.write_text(
+            config_file.read_text().replace(
+                "min_text_length = 10",
+                "min_text_length = 10\nllm_summary_enabled = true",
+            )
+        )
+
+        result = runner.invoke(
+            app, ["run", "--config", str(config_file), "--batch-submit"]
+        )
+
+        assert result.exit_code == 1
+        assert "llm_summary_enabled" in result.output
+        mock_process_files.assert_not_called()
+
+    @patch("doc_triager.cli.collect_batches")
+    def test_batch_collect_uses_configured_provider(
+        self, mock_collect, tmp_path: Path, monkeypatch
+    ) -> None:
+        monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+        monkeypatch.chdir(tmp_path)
+        config_file = _setup_workspace(tmp_path)
+
+        result = runner.invoke(app, ["batch-collect", "--config", str(config_file)])
+
+        assert result.exit_code == 0
+        mock_collect.assert_called_once()
+        assert type(mock_collect.call_args.kwargs["client"]).__name__ == (
+            "OpenAIBatchClient"
+        )
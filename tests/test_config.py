@@ -98,12 +98,19 @@ class TestLoadConfig:
         assert config.input.max_files == 0
         assert config.triage.confidence_threshold == 0.7
         assert config.triage.max_input_tokens == 8000
+        assert config.triage.tokenizer == "estimate"
+        assert config.triage.prompt_dir == ""
+        assert config.triage.batch_size == 1
+        assert config.triage.batch_wait_ms == 2000
         assert config.llm.mode == "api"
         assert config.llm.rate_limit.requests_per_minute == 30
         assert config.llm.rate_limit.max_retries == 3
         assert config.llm.rate_limit.retry_delay_sec == 5
         assert config.llm.rate_limit.request_timeout_sec == 120
         assert config.database.path == "./triage.db"
+        assert config.database.flush_rows == 100
+        assert config.database.keep_history is False
+        assert config.database.flush_interval_ms == 1000
         assert config.text_extraction.min_text_length == 100
         assert config.text_extraction.llm_summary_enabled is False
         assert config.logging.level == "INFO"
@@ -233,6 +240,18 @@ class TestTextExtractionConfig:
         te = TextExtractionConfig()
         assert te.llm_summary_enabled is False
 
+    def test_extraction_cache_disabled_by_default(self) -> None:
+        from doc_triager.config import TextExtractionConfig
+
+        te = TextExtractionConfig()
+        assert te.cache_dir == ""
+        assert te.cache_max_mb == 1024
+
+    def test_bounded_extraction_enabled_by_default(self) -> None:
+        from doc_triager.config import TextExtractionConfig
+
+        assert TextExtractionConfig().bounded_extraction is True
+
     def test_no_llm_description_fields(self) -> None:
         from doc_triager.config import TextExtractionConfig
 
@@ -264,9 +283,88 @@ class TestTextExtractionConfig:
         assert config.text_extraction.llm_summary_enabled is True
 
 
+class TestProcessingConfig:
+    """Tests for ProcessingConfig fields."""
+
+    def test_workers_default_is_one(self) -> None:
+        from doc_triager.config import Config
+
+        assert Config().processing.workers == 1
+
+    def test_extraction_pool_disabled_by_default(self) -> None:
+        from doc_triager.config import Config
+
+        assert Config().processing.extract_workers == 0
+        assert Config().processing.extract_max_tasks_per_child == 50
+        assert Config().processing.extract_timeout_sec == 600
+        assert Config().processing.extract_memory_mb == 0
+
+    def test_workers_loaded_from_toml(self, tmp_path: Path) -> None:
+        from doc_triager.config import load_config
+
+        config_file = tmp_path / "workers.toml"
+        config_file.write_text(
+            textwrap.dedent("""\
+                [input]
+                directory = "/path/to/source"
+
+                [output]
+                directory = "/path/to/output"
+
+                [processing]
+                workers = 8
+            """)
+        )
+        config = load_config(config_file)
+        assert config.processing.workers == 8
+
+
+class TestBatchConfig:
+    """Tests for BatchConfig fields."""
+
+    def test_defaults(self) -> None:
+        from doc_triager.config import Config
+
+        assert Config().batch.directory == ""
+        assert Config().batch.max_requests_per_job == 1000
+        assert Config().batch.max_bytes_per_job == 100 * 1024 * 1024
+        assert Config().batch.max_output_tokens == 1024
+
+    def test_loaded_from_toml(self, tmp_path: Path) -> None:
+        from doc_triager.config import load_config
+
+        config_file = tmp_path / "batch.toml"
+        config_file.write_text(
+            textwrap.dedent("""\
+                [batch]
+                directory = "/var/batches"
+                max_requests_per_job = 500
+            """)
+        )
+        config = load_config(config_file)
+        assert config.batch.directory == "/var/batches"
+        assert config.batch.max_requests_per_job == 500
+
+
 class TestResolveConfig:
     """Tests for resolve_config function."""
 
+    def test_cli_overrides_workers(self, config_toml: Path) -> None:
+        from doc_triager.config import load_config, resolve_config
+
+        config = load_config(config_toml)
+        resolved = resolve_config(config, workers=4)
+
+        assert resolved.processing.workers == 4
+
+    def test_invalid_workers_raises_error(self, config_toml: Path) -> None:
+        from doc_triager.config import load_config, resolve_config
+
+        config = load_config(config_toml)
+
+        with pytest.raises(ValueError, match="workers"):
+            resolve_config(config, workers=0)
+
     def test_cli_overrides_source_and_output(self, config_toml: Path) -> None:
         from doc_triager.config import load_config, resolve_config
 
@@ -4,6 +4,7 @@ import json
 import sqlite3
 from datetime import datetime, timezone
 from pathlib import Path
+from unittest.mock import patch
 
 import pytest
 
@@ -54,6 +55,27 @@ class TestInitDatabase:
         assert "idx_source_path" in indexes
         conn.close()
 
+    def test_adds_stat_columns_to_existing_table(self, db_path: Path) -> None:
+        """旧スキーマの DB に stat 用カラムを追加する。"""
+        from doc_triager.database import init_database
+
+        conn = sqlite3.connect(db_path)
+        conn.execute(
+            "CREATE TABLE triage_results (id INTEGER PRIMARY KEY, "
+            "source_path TEXT NOT NULL, checksum TEXT NOT NULL, "
+            "file_size INTEGER, triage TEXT NOT NULL, processed_at DATETIME NOT NULL)"
+        )
+        conn.commit()
+        conn.close()
+
+        init_database(db_path)
+
+        conn = sqlite3.connect(db_path)
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(triage_results)")}
+        conn.close()
+        assert "file_mtime_ns" in columns
+        assert "file_inode" in columns
+
     def test_idempotent_init(self, db_path: Path) -> None:
         from doc_triager.database import init_database
 
@@ -153,6 +175,60 @@ class TestGetByChecksum:
         assert row is None
 
 
+class TestFindReusableByChecksum:
+    """Tests for find_reusable_by_checksum."""
+
+    def test_ignores_error_results(self, db_path: Path, sample_record: dict) -> None:
+        from doc_triager.database import (
+            find_reusable_by_checksum,
+            init_database,
+            insert_result,
+        )
+
+        init_database(db_path)
+        insert_result(db_path, {**sample_record, "error_message": "JSONパース失敗"})
+
+        assert find_reusable_by_checksum(db_path, "abc123def456") is None
+
+    def test_ignores_unmoved_results(self, db_path: Path, sample_record: dict) -> None:
+        """移動していない結果（テキスト不足など）は再利用しない。"""
+        from doc_triager.database import (
+            find_reusable_by_checksum,
+            init_database,
+            insert_result,
+        )
+
+        init_database(db_path)
+        insert_result(
+            db_path,
+            {**sample_record, "triage": "unknown", "destination_path": None},
+        )
+
+        assert find_reusable_by_checksum(db_path, "abc123def456") is None
+
+    def test_returns_latest_success(self, db_path: Path, sample_record: dict) -> None:
+        from doc_triager.database import (
+            find_reusable_by_checksum,
+            init_database,
+            insert_result,
+        )
+
+        init_database(db_path)
+        insert_result(db_path, sample_record)
+        insert_result(
+            db_path,
+            {**sample_record, "source_path": "/src/b.pdf", "triage": "temporal"},
+        )
+        insert_result(
+            db_path,
+            {**sample_record, "source_path": "/src/c.pdf", "error_message": "x"},
+        )
+
+        row = find_reusable_by_checksum(db_path, "abc123def456")
+        assert row is not None
+        assert row["source_path"] == "/src/b.pdf"
+
+
 class TestGetSummary:
     """Tests for triage summary."""
 
@@ -261,3 +337,447 @@ class TestExportAll:
         rows = export_all(db_path)
         assert len(rows) == 1
         assert rows[0]["source_path"] == "/src/docs/design.pdf"
+
+
+class TestTriageDatabase:
+    """Tests for the run-scoped TriageDatabase connection."""
+
+    def test_uses_wal_mode(self, db_path: Path) -> None:
+        from doc_triager.database import TriageDatabase
+
+        with TriageDatabase(db_path) as db:
+            db.init_schema()
+
+        conn = sqlite3.connect(db_path)
+        mode = conn.execute("PRAGMA journal_mode").fetchone()[0]
+        conn.close()
+        assert mode == "wal"
+
+    def test_insert_and_lookup(self, db_path: Path, sample_record: dict) -> None:
+        from doc_triager.database import TriageDatabase
+
+        with TriageDatabase(db_path) as db:
+            db.init_schema()
+            db.insert_result(sample_record)
+
+            assert db.get_by_source_path("/src/docs/design.pdf")["triage"] == (
+                "evergreen"
+            )
+            assert db.get_by_checksum("abc123def456") is not None
+            assert db.get_summary()["total"] == 1
+
+    def test_module_functions_accept_open_database(
+        self, db_path: Path, sample_record: dict
+    ) -> None:
+        """モジュール関数に開いた接続を渡すと新しい接続を作らずに使う。"""
+        from doc_triager.database import (
+            TriageDatabase,
+            export_all,
+            init_database,
+            insert_result,
+        )
+
+        with TriageDatabase(db_path) as db:
+            init_database(db)
+            insert_result(db, sample_record)
+            assert len(export_all(db)) == 1
+
+        assert len(export_all(db_path)) == 1
+
+    def test_concurrent_inserts(self, db_path: Path, sample_record: dict) -> None:
+        from concurrent.futures import ThreadPoolExecutor
+
+        from doc_triager.database import TriageDatabase
+
+        with TriageDatabase(db_path) as db:
+            db.init_schema()
+
+            def insert(i: int) -> None:
+                db.insert_result({**sample_record, "source_path": f"/src/{i}.pdf"})
+
+            with ThreadPoolExecutor(max_workers=8) as pool:
+                list(pool.map(insert, range(50)))
+
+            assert db.get_summary()["total"] == 50
+
+
+class TestBatchedWrites:
+    """Tests for write-behind inserts via ResultWriter."""
+
+    def _count(self, db_path: Path) -> int:
+        conn = sqlite3.connect(db_path)
+        try:
+            return conn.execute("SELECT COUNT(*) FROM triage_results").fetchone()[0]
+        finally:
+            conn.close()
+
+    def test_rows_are_buffered_until_close(
+        self, db_path: Path, sample_record: dict
+    ) -> None:
+        from doc_triager.database import TriageDatabase, init_database
+
+        init_database(db_path)
+        with TriageDatabase(db_path, flush_rows=100) as db:
+            for i in range(3):
+                db.insert_result({**sample_record, "source_path": f"/src/{i}.pdf"})
+            assert self._count(db_path) == 0
+
+        assert self._count(db_path) == 3
+
+    def test_flushes_when_row_limit_reached(
+        self, db_path: Path, sample_record: dict
+    ) -> None:
+        import time
+
+        from doc_triager.database import TriageDatabase, init_database
+
+        init_database(db_path)
+        with TriageDatabase(db_path, flush_rows=2) as db:
+            db.insert_result({**sample_record, "source_path": "/src/a.pdf"})
+            db.insert_result({**sample_record, "source_path": "/src/b.pdf"})
+            deadline = time.monotonic() + 5
+            while self._count(db_path) < 2 and time.monotonic() < deadline:
+                time.sleep(0.01)
+            assert self._count(db_path) == 2
+
+    def test_flushes_after_interval(self, db_path: Path, sample_record: dict) -> None:
+        import time
+
+        from doc_triager.database import TriageDatabase, init_database
+
+        init_database(db_path)
+        with TriageDatabase(db_path, flush_rows=100, flush_interval_ms=20) as db:
+            db.insert_result(sample_record)
+            deadline = time.monotonic() + 5
+            while self._count(db_path) < 1 and time.monotonic() < deadline:
+                time.sleep(0.01)
+            assert self._count(db_path) == 1
+
+    def test_lookup_sees_buffered_row(self, db_path: Path, sample_record: dict) -> None:
+        """未書き込みの行に当たる照会は先に書き込んでから検索する。"""
+        from doc_triager.database import TriageDatabase, init_database
+
+        init_database(db_path)
+        with TriageDatabase(db_path, flush_rows=100) as db:
+            db.insert_result(sample_record)
+
+            found = db.find_reusable_by_checksum("abc123def456")
+
+            assert found is not None
+            assert found["id"] is not None
+            assert db.get_by_source_path("/src/docs/design.pdf") is not None
+
+    def test_from_config(self, db_path: Path) -> None:
+        from doc_triager.config import DatabaseConfig
+        from doc_triager.database import TriageDatabase
+
+        config = DatabaseConfig(path=str(db_path), flush_rows=1)
+
+        with TriageDatabase.from_config(config) as db:
+            db.init_schema()
+            assert db.path == db_path
+
+
+class TestProcessedIndex:
+    """Tests for the preloaded processed-state index."""
+
+    def test_latest_row_wins(self, db_path: Path, sample_record: dict) -> None:
+        """同じ source_path の行が複数あれば最新の行を使う。"""
+        from doc_triager.database import TriageDatabase, get_by_source_path
+
+        with TriageDatabase(db_path) as db:
+            db.init_schema()
+            db.insert_result({**sample_record, "checksum": "old"})
+            db.insert_result({**sample_record, "checksum": "new"})
+
+            assert db.preload_processed() == 1
+            state = db.get_processed_state("/src/docs/design.pdf")
+
+        assert state == {
+            "checksum": "new",
+            "file_size": 1024,
+            "file_mtime_ns": None,
+            "file_inode": None,
+        }
+        assert get_by_source_path(db_path, "/src/docs/design.pdf")["checksum"] == "new"
+
+    def test_answers_from_memory(self, db_path: Path, sample_record: dict) -> None:
+        from doc_triager.database import TriageDatabase
+
+        with TriageDatabase(db_path) as db:
+            db.init_schema()
+            db.insert_result(sample_record)
+            db.preload_processed()
+
+            with patch.object(db, "_fetch_one") as mock_fetch:
+                assert db.get_processed_state("/src/docs/design.pdf") is not None
+                assert db.get_processed_state("/src/other.pdf") is None
+            mock_fetch.assert_not_called()
+
+    def test_insert_updates_index(self, db_path: Path, sample_record: dict) -> None:
+        from doc_triager.database import TriageDatabase
+
+        with TriageDatabase(db_path, flush_rows=100) as db:
+            db.init_schema()
+            db.preload_processed()
+            db.insert_result(sample_record)
+
+            state = db.get_processed_state("/src/docs/design.pdf")
+
+        assert state is not None
+        assert state["checksum"] == "abc123def456"
+
+    def test_without_preload_queries_database(
+        self, db_path: Path, sample_record: dict
+    ) -> None:
+        from doc_triager.database import (
+            get_processed_state,
+            init_database,
+            insert_result,
+        )
+
+        init_database(db_path)
+        insert_result(db_path, sample_record)
+
+        state = get_processed_state(db_path, "/src/docs/design.pdf")
+
+        assert state is not None
+        assert state["checksum"] == "abc123def456"
+
+
+class TestUpsert:
+    """Tests for source_path-keyed upsert and history."""
+
+    def test_reinsert_replaces_current_row(
+        self, db_path: Path, sample_record: dict
+    ) -> None:
+        from doc_triager.database import export_all, init_database, insert_result
+
+        init_database(db_path)
+        insert_result(db_path, sample_record)
+        insert_result(db_path, {**sample_record, "triage": "temporal"})
+
+        rows = export_all(db_path)
+        assert len(rows) == 1
+        assert rows[0]["triage"] == "temporal"
+
+    def test_keep_history_keeps_overwritten_rows(
+        self, db_path: Path, sample_record: dict
+    ) -> None:
+        """上書きされる前の結果だけが履歴に残る。"""
+        from doc_triager.database import TriageDatabase
+
+        with TriageDatabase(db_path, keep_history=True) as db:
+            db.init_schema()
+            db.insert_result(sample_record)
+            db.insert_result({**sample_record, "triage": "temporal"})
+            current = db.get_by_source_path("/src/docs/design.pdf")
+
+        conn = sqlite3.connect(db_path)
+        history = conn.execute(
+            "SELECT result_id, triage FROM triage_history ORDER BY id"
+        ).fetchall()
+        conn.close()
+        assert current["triage"] == "temporal"
+        assert history == [(current["id"], "evergreen")]
+
+    def test_keep_history_with_buffered_duplicates(
+        self, db_path: Path, sample_record: dict
+    ) -> None:
+        """同じバッチに同じパスが複数あっても途中の結果を失わない。"""
+        from doc_triager.database import TriageDatabase
+
+        with TriageDatabase(db_path, flush_rows=10, keep_history=True) as db:
+            db.init_schema()
+            for triage in ("evergreen", "temporal", "unknown"):
+                db.insert_result({**sample_record, "triage": triage})
+
+        conn = sqlite3.connect(db_path)
+        history = conn.execute(
+            "SELECT triage FROM triage_history ORDER BY id"
+        ).fetchall()
+        current = conn.execute("SELECT triage FROM triage_results").fetchall()
+        conn.close()
+        assert history == [("evergreen",), ("temporal",)]
+        assert current == [("unknown",)]
+
+    def test_history_disabled_by_default(
+        self, db_path: Path, sample_record: dict
+    ) -> None:
+        from doc_triager.database import init_database, insert_result
+
+        init_database(db_path)
+        insert_result(db_path, sample_record)
+
+        conn = sqlite3.connect(db_path)
+        count = conn.execute("SELECT COUNT(*) FROM triage_history").fetchone()[0]
+        conn.close()
+        assert count == 0
+
+
+class TestMigration:
+    """Tests for migrating append-only databases to the current schema."""
+
+    def _create_legacy(self, db_path: Path) -> None:
+        conn = sqlite3.connect(db_path)
+        conn.execute(
+            "CREATE TABLE triage_results (id INTEGER PRIMARY KEY, "
+            "source_path TEXT NOT NULL, checksum TEXT NOT NULL, "
+            "triage TEXT NOT NULL, dedup_of INTEGER, processed_at DATETIME NOT NULL)"
+        )
+        conn.execute("CREATE INDEX idx_source_path ON triage_results (source_path)")
+        conn.executemany(
+            "INSERT INTO triage_results "
+            "(id, source_path, checksum, triage, dedup_of, processed_at) "
+            "VALUES (?, ?, ?, ?, ?, '2025-01-01')",
+            [
+                (1, "/a.pdf", "c1", "unknown", None),
+                (2, "/b.pdf", "c1", "unknown", 1),
+                (3, "/a.pdf", "c2", "evergreen", None),
+            ],
+        )
+        conn.commit()
+        conn.close()
+
+    def test_keeps_latest_row_per_source_path(self, db_path: Path) -> None:
+        """旧形式の重複行は最新行だけを残し、古い行は履歴に移す。"""
+        from doc_triager.database import SCHEMA_VERSION, export_all, init_database
+
+        self._create_legacy(db_path)
+
+        init_database(db_path)
+
+        rows = {r["source_path"]: r for r in export_all(db_path)}
+        assert set(rows) == {"/a.pdf", "/b.pdf"}
+        assert rows["/a.pdf"]["id"] == 3
+        assert rows["/b.pdf"]["dedup_of"] == 3
+
+        conn = sqlite3.connect(db_path)
+        history = conn.execute(
+            "SELECT result_id, source_path, checksum FROM triage_history"
+        ).fetchall()
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        conn.close()
+        assert history == [(3, "/a.pdf", "c1")]
+        assert version == SCHEMA_VERSION
+
+    def test_source_path_becomes_unique(self, db_path: Path) -> None:
+        from doc_triager.database import init_database
+
+        self._create_legacy(db_path)
+        init_database(db_path)
+
+        conn = sqlite3.connect(db_path)
+        with pytest.raises(sqlite3.IntegrityError):
+            conn.execute(
+                "INSERT INTO triage_results (source_path, checksum, triage, "
+                "processed_at) VALUES ('/a.pdf', 'x', 'unknown', '2025-01-01')"
+            )
+        conn.close()
+
+    def test_migration_runs_once(self, db_path: Path) -> None:
+        from doc_triager.database import init_database
+
+        self._create_legacy(db_path)
+        init_database(db_path)
+        init_database(db_path)
+
+        conn = sqlite3.connect(db_path)
+        count = conn.execute("SELECT COUNT(*) FROM triage_history").fetchone()[0]
+        conn.close()
+        assert count == 1
+
+    def test_overwrites_after_migration_lose_nothing(self, db_path: Path) -> None:
+        """移行後の上書きでも、移行時に現状として残した行が履歴に入る。"""
+        from doc_triager.database import _CREATE_TABLE, TriageDatabase
+
+        conn = sqlite3.connect(db_path)
+        conn.execute(_CREATE_TABLE)
+        conn.executemany(
+            "INSERT INTO triage_results (source_path, checksum, triage, processed_at) "
+            "VALUES ('/a.pdf', ?, 'evergreen', '2025-01-01')",
+            [("c1",), ("c2",)],
+        )
+        conn.commit()
+        conn.close()
+        with TriageDatabase(db_path, keep_history=True) as db:
+            db.init_schema()
+            for checksum in ("c3", "c4"):
+                db.insert_result(
+                    {
+                        "source_path": "/a.pdf",
+                        "checksum": checksum,
+                        "triage": "temporal",
+                        "processed_at": "2025-02-01",
+                    }
+                )
+
+        conn = sqlite3.connect(db_path)
+        history = conn.execute(
+            "SELECT checksum FROM triage_history "
+            "WHERE source_path = '/a.pdf' ORDER BY id"
+        ).fetchall()
+        current = conn.execute(
+            "SELECT checksum FROM triage_results WHERE source_path = '/a.pdf'"
+        ).fetchone()
+        conn.close()
+        assert history == [("c1",), ("c2",), ("c3",)]
+        assert current == ("c4",)
+
+
+class TestBatchJobs:
+    """Tests for batch job bookkeeping."""
+
+    def _items(self, *paths: str) -> list[dict]:
+        return [
+            {
+                "custom_id": f"doc-{i}",
+                "source_path": path,
+                "checksum": f"sum{i}",
+                "file_size": 10,
+                "file_mtime_ns": 1,
+                "file_inode": 2,
+                "extracted_text_length": 100,
+                "truncated": False,
+            }
+            for i, path in enumerate(paths, 1)
+        ]
+
+    def _job(self, job_id: str) -> dict:
+        return {
+            "job_id": job_id,
+            "llm_provider": "openai",
+            "llm_model": "gpt-4o",
+            "input_path": "/batches/1.jsonl",
+            "submitted_at": datetime(2025, 1, 1, 12, 0, 0),
+        }
+
+    def test_add_and_list_pending(self, db_path: Path) -> None:
+        from doc_triager.database import TriageDatabase
+
+        with TriageDatabase(db_path) as db:
+            db.init_schema()
+            db.add_batch_job(self._job("batch_1"), self._items("/a.pdf", "/b.pdf"))
+
+            jobs = db.list_pending_batch_jobs()
+            items = db.get_batch_items("batch_1")
+
+        assert [job["job_id"] for job in jobs] == ["batch_1"]
+        assert jobs[0]["request_count"] == 2
+        assert jobs[0]["status"] == "submitted"
+        assert [item["custom_id"] for item in items] == ["doc-1", "doc-2"]
+        assert items[1]["source_path"] == "/b.pdf"
+
+    def test_collected_jobs_are_no_longer_pending(self, db_path: Path) -> None:
+        from doc_triager.database import TriageDatabase
+
+        with TriageDatabase(db_path) as db:
+            db.init_schema()
+            db.add_batch_job(self._job("batch_1"), self._items("/a.pdf"))
+            db.add_batch_job(self._job("batch_2"), self._items("/b.pdf"))
+            assert db.pending_batch_paths() == {"/a.pdf", "/b.pdf"}
+
+            db.mark_batch_job_collected("batch_1", status="completed")
+
+            assert [j["job_id"] for j in db.list_pending_batch_jobs()] == ["batch_2"]
+            assert db.pending_batch_paths() == {"/b.pdf"}
@@ -0,0 +1,127 @@
+"""Tests for extraction_cache module."""
+
+import os
+import pickle
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+from doc_triager.config import TextExtractionConfig
+from doc_triager.extraction_cache import ExtractionCache
+from doc_triager.extractor import extract_text
+
+CHECKSUM_A = "a" * 64
+CHECKSUM_B = "b" * 64
+CHECKSUM_C = "c" * 64
+
+
+class TestExtractionCache:
+    """Tests for ExtractionCache."""
+
+    def test_miss_returns_none(self, tmp_path: Path) -> None:
+        cache = ExtractionCache(tmp_path, max_bytes=0)
+
+        assert cache.get(CHECKSUM_A) is None
+
+    def test_put_then_get(self, tmp_path: Path) -> None:
+        cache = ExtractionCache(tmp_path, max_bytes=0)
+
+        cache.put(CHECKSUM_A, "# 見出し\n\n本文")
+
+        assert cache.get(CHECKSUM_A) == "# 見出し\n\n本文"
+        entries = list(tmp_path.glob("aa/*.md.gz"))
+        assert len(entries) == 1
+        assert entries[0].name.startswith(CHECKSUM_A)
+
+    def test_keyed_by_converter_version(self, tmp_path: Path) -> None:
+        """コンバータのバージョンが変わると別エントリとして扱う。"""
+        cache = ExtractionCache(tmp_path, max_bytes=0)
+        cache.put(CHECKSUM_A, "old")
+
+        with patch(
+            "doc_triager.extraction_cache.converter_version", return_value="v-next"
+        ):
+            upgraded = ExtractionCache(tmp_path, max_bytes=0)
+
+        assert upgraded.get(CHECKSUM_A) is None
+
+    def test_corrupt_entry_is_a_miss(self, tmp_path: Path) -> None:
+        cache = ExtractionCache(tmp_path, max_bytes=0)
+        cache.put(CHECKSUM_A, "text")
+        next(tmp_path.glob("aa/*.md.gz")).write_bytes(b"not gzip")
+
+        assert cache.get(CHECKSUM_A) is None
+
+    def test_evicts_least_recently_used(self, tmp_path: Path) -> None:
+        """容量超過時は最後に使われたのが古いエントリから削除する。"""
+        text = os.urandom(2000).hex()
+        cache = ExtractionCache(tmp_path, max_bytes=1_000_000)
+        cache.put(CHECKSUM_A, text)
+        cache.put(CHECKSUM_B, text)
+        entry_size = next(tmp_path.glob("aa/*.md.gz")).stat().st_size
+        os.utime(next(tmp_path.glob("aa/*.md.gz")), (1, 1))
+        os.utime(next(tmp_path.glob("bb/*.md.gz")), (2, 2))
+        assert cache.get(CHECKSUM_A) == text  # A を参照して最新にする
+
+        cache.max_bytes = entry_size * 2 + entry_size // 2
+        cache.put(CHECKSUM_C, text)
+
+        assert cache.get(CHECKSUM_A) == text
+        assert cache.get(CHECKSUM_B) is None
+        assert cache.get(CHECKSUM_C) == text
+
+    def test_from_config_disabled_without_dir(self) -> None:
+        assert ExtractionCache.from_config(TextExtractionConfig()) is None
+
+    def test_pickles_to_shared_instance(self, tmp_path: Path) -> None:
+        """抽出プロセスへ渡せるよう、pickle するとプロセス内共有のインスタンスになる。"""
+        cache = ExtractionCache.from_config(
+            TextExtractionConfig(cache_dir=str(tmp_path), cache_max_mb=1)
+        )
+
+        restored = pickle.loads(pickle.dumps(cache))
+
+        assert restored is cache
+        assert restored.max_bytes == 1024 * 1024
+
+
+class TestExtractTextWithCache:
+    """Tests for extract_text reading through the cache."""
+
+    def test_hit_skips_conversion(self, tmp_path: Path) -> None:
+        f = tmp_path / "a.pdf"
+        f.write_bytes(b"%PDF")
+        cache = ExtractionCache(tmp_path / "cache", max_bytes=0)
+
+        with patch("doc_triager.extractor.MarkItDown") as mock_cls:
+            mock_cls.return_value.convert.return_value = MagicMock(markdown="A" * 200)
+
+            first = extract_text(f, checksum=CHECKSUM_A, cache=cache)
+            second = extract_text(f, checksum=CHECKSUM_A, cache=cache)
+
+        assert first.text == second.text == "A" * 200
+        assert mock_cls.return_value.convert.call_count == 1
+
+    def test_failure_is_not_cached(self, tmp_path: Path) -> None:
+        f = tmp_path / "a.pdf"
+        f.write_bytes(b"%PDF")
+        cache = ExtractionCache(tmp_path / "cache", max_bytes=0)
+
+        with patch("doc_triager.extractor.MarkItDown") as mock_cls:
+            mock_cls.return_value.convert.side_effect = ValueError("broken")
+
+            result = extract_text(f, checksum=CHECKSUM_A, cache=cache)
+
+        assert result.error == "broken"
+        assert cache.get(CHECKSUM_A) is None
+
+    def test_insufficient_text_still_applies_on_hit(self, tmp_path: Path) -> None:
+        """キャッシュ済みでも min_text_length の判定は毎回行う。"""
+        f = tmp_path / "a.pdf"
+        f.write_bytes(b"%PDF")
+        cache = ExtractionCache(tmp_path / "cache", max_bytes=0)
+        cache.put(CHECKSUM_A, "short")
+
+        result = extract_text(f, checksum=CHECKSUM_A, cache=cache, min_text_length=100)
+
+        assert result.insufficient is True
+        assert result.text == "short"
@@ -0,0 +1,177 @@
+"""Tests for extraction_pool module."""
+
+import time
+from concurrent.futures import Future
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from doc_triager.extraction_pool import (
+    ExtractionPool,
+    PendingExtraction,
+    _extract_limited,
+)
+from doc_triager.extractor import ExtractionResult
+
+
+def _stuck_extract(file_path: Path, **kwargs: object) -> ExtractionResult:
+    """Extraction task that neither SIGALRM nor the CPU limit would stop."""
+    time.sleep(60)
+    return ExtractionResult(text=None, error="unreachable")
+
+
+class TestExtractLimited:
+    """Tests for running extract_text under limits."""
+
+    def test_returns_extraction_result(self, tmp_path: Path) -> None:
+        f = tmp_path / "a.md"
+        f.write_text("A" * 200)
+
+        result = _extract_limited(f, timeout_sec=10, memory_mb=0, min_text_length=10)
+
+        assert result.error is None
+        assert "A" * 200 in result.text
+
+    def test_timeout(self, tmp_path: Path) -> None:
+        """時間制限を超えた抽出は打ち切り、タイムアウトとして返す。"""
+        f = tmp_path / "slow.pdf"
+        f.write_text("x")
+
+        with patch(
+            "doc_triager.extraction_pool.extract_text",
+            side_effect=lambda *a, **k: time.sleep(5),
+        ):
+            start = time.monotonic()
+            result = _extract_limited(f, timeout_sec=1, memory_mb=0)
+
+        assert time.monotonic() - start < 4
+        assert result.text is None
+        assert result.error == "抽出タイムアウト（1秒）"
+
+    def test_memory_error(self, tmp_path: Path) -> None:
+        f = tmp_path / "huge.xlsx"
+        f.write_text("x")
+
+        with patch("doc_triager.extraction_pool.extract_text", side_effect=MemoryError):
+            result = _extract_limited(f, timeout_sec=0, memory_mb=512)
+
+        assert result.text is None
+        assert result.error == "抽出メモリ上限超過（512 MB）"
+
+    def test_converter_memory_error(self, tmp_path: Path) -> None:
+        """変換中のメモリ不足は抽出プロセスのメモリ上限超過として記録する。"""
+        f = tmp_path / "huge.xyz"
+        f.write_bytes(b"\x00")
+
+        with patch("doc_triager.extractor.MarkItDown") as mock_cls:
+            mock_cls.return_value.convert.side_effect = MemoryError
+            result = _extract_limited(f, timeout_sec=0, memory_mb=512)
+
+        assert result.text is None
+        assert result.error == "抽出メモリ上限超過（512 MB）"
+
+    def test_restores_alarm_handler(self, tmp_path: Path) -> None:
+        import signal
+
+        f = tmp_path / "a.md"
+        f.write_text("A" * 200)
+        before = signal.getsignal(signal.SIGALRM)
+
+        _extract_limited(f, timeout_sec=10, memory_mb=0)
+
+        assert signal.getsignal(signal.SIGALRM) is before
+        assert signal.getitimer(signal.ITIMER_REAL) == (0.0, 0.0)
+
+
+class TestExtractionPool:
+    """Tests for ExtractionPool."""
+
+    def test_extracts_in_worker_process(self, tmp_path: Path) -> None:
+        f = tmp_path / "a.md"
+        f.write_text("# Title\n\n" + "Body text. " * 20)
+
+        with ExtractionPool(workers=1, timeout_sec=30, min_text_length=10) as pool:
+            result = pool.submit(f).result()
+
+        assert result.error is None
+        assert "Body text." in result.text
+
+    def test_broken_pool_reruns_file_alone(self, tmp_path: Path) -> None:
+        """ワーカーが異常終了した場合は単独プロセスで再実行する。"""
+        f = tmp_path / "a.md"
+        f.write_text("# Title\n\n" + "Body text. " * 20)
+
+        with ExtractionPool(workers=1, timeout_sec=30, min_text_length=10) as pool:
+            broken: Future[ExtractionResult] = Future()
+            broken.set_exception(BrokenProcessPool("worker died"))
+            pending = PendingExtraction(
+                file_path=f, future=broken, pool=pool, executor=MagicMock()
+            )
+
+            result = pending.result()
+
+        assert result.error is None
+        assert "Body text." in result.text
+
+    def test_unresponsive_worker_is_terminated(self, tmp_path: Path) -> None:
+        """タイムアウトを過ぎても応答しないワーカーは停止し、タイムアウトとして記録する。"""
+        stuck = tmp_path / "stuck.pdf"
+        stuck.write_text("x")
+        f = tmp_path / "a.md"
+        f.write_text("# Title\n\n" + "Body text. " * 20)
+
+        with ExtractionPool(workers=1, timeout_sec=1, min_text_length=10) as pool:
+            with (
+                patch("doc_triager.extraction_pool._WAIT_MARGIN_SEC", 1),
+                patch("doc_triager.extraction_pool._extract_limited", _stuck_extract),
+            ):
+                pending = pool.submit(stuck)
+                start = time.monotonic()
+                result = pending.result()
+                elapsed = time.monotonic() - start
+
+            after = pool.submit(f).result()
+
+        assert elapsed < 20
+        assert result.text is None
+        assert result.error == "抽出タイムアウト（1秒）"
+        assert after.error is None
+        assert "Body text." in after.text
+
+    def test_repeated_failure_is_recorded(self, tmp_path: Path) -> None:
+        f = tmp_path / "a.pdf"
+        f.write_text("x")
+
+        with ExtractionPool(workers=1, min_text_length=10) as pool:
+            broken: Future[ExtractionResult] = Future()
+            broken.set_exception(BrokenProcessPool("worker died"))
+            pending = PendingExtraction(
+                file_path=f, future=broken, pool=pool, executor=MagicMock()
+            )
+            solo = MagicMock()
+            solo.submit.return_value = broken
+            with patch.object(pool, "_new_executor", return_value=solo):
+                result = pending.result()
+
+        assert result.text is None
+        assert result.error == "抽出プロセス異常終了（CPU・メモリ上限超過の可能性）"
+
+
+@pytest.mark.parametrize("memory_mb", [0, 4096])
+def test_init_worker_sets_address_space_limit(memory_mb: int) -> None:
+    from doc_triager.extraction_pool import _init_worker
+
+    with patch("doc_triager.extraction_pool.resource") as mock_resource:
+        mock_resource.getrlimit.return_value = (-1, -1)
+        mock_resource.RLIM_INFINITY = -1
+
+        _init_worker(memory_mb)
+
+    if memory_mb:
+        mock_resource.setrlimit.assert_called_once_with(
+            mock_resource.RLIMIT_AS, (memory_mb * 1024 * 1024, -1)
+        )
+    else:
+        mock_resource.setrlimit.assert_not_called()
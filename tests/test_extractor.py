@@ -3,7 +3,9 @@
 from pathlib import Path
 from unittest.mock import MagicMock, patch
 
-from doc_triager.extractor import extract_text, truncate_text
+import pytest
+
+from doc_triager.extractor import extract_text, propagate_memory_errors, truncate_text
 
 
 class TestExtractText:
@@ -34,6 +36,31 @@ class TestExtractText:
         assert result.error is not None
         assert "Unsupported format" in result.error
 
+    def test_memory_error_is_recorded_in_process(self, tmp_path: Path) -> None:
+        """抽出プロセス外のメモリ不足はそのファイルの抽出エラーとして記録する。"""
+        f = tmp_path / "huge.xyz"
+        f.write_bytes(b"\x00")
+
+        with patch("doc_triager.extractor.MarkItDown") as mock_cls:
+            mock_cls.return_value.convert.side_effect = MemoryError
+
+            result = extract_text(f)
+
+        assert result.text is None
+        assert result.error == "メモリ不足"
+
+    def test_memory_error_propagates_in_worker(self, tmp_path: Path) -> None:
+        f = tmp_path / "huge.xyz"
+        f.write_bytes(b"\x00")
+
+        with (
+            patch("doc_triager.extractor.MarkItDown") as mock_cls,
+            propagate_memory_errors(),
+            pytest.raises(MemoryError),
+        ):
+            mock_cls.return_value.convert.side_effect = MemoryError
+            extract_text(f)
+
     def test_insufficient_text(self, tmp_path: Path) -> None:
         f = tmp_path / "short.md"
         f.write_text("Hi")
@@ -137,3 +164,126 @@ class TestTruncateText:
 
         assert result.truncated is False
         assert result.text == text
+
+
+class TestConverterReuse:
+    """Tests for per-thread MarkItDown reuse."""
+
+    def test_constructed_once_per_thread(self, tmp_path: Path) -> None:
+        """同一スレッドでは MarkItDown を1回だけ生成して使い回す。"""
+        f = tmp_path / "a.docx"
+        f.write_bytes(b"PK")
+
+        with patch("doc_triager.extractor.MarkItDown") as mock_cls:
+            mock_cls.return_value.convert.return_value = MagicMock(markdown="A" * 200)
+
+            extract_text(f)
+            extract_text(f)
+            extract_text(f)
+
+        assert mock_cls.call_count == 1
+        assert mock_cls.return_value.convert.call_count == 3
+
+    def test_separate_instance_per_thread(self, tmp_path: Path) -> None:
+        import threading
+
+        f = tmp_path / "a.docx"
+        f.write_bytes(b"PK")
+
+        with patch("doc_triager.extractor.MarkItDown") as mock_cls:
+            mock_cls.return_value.convert.return_value = MagicMock(markdown="A" * 200)
+
+            extract_text(f)
+            thread = threading.Thread(target=extract_text, args=(f,))
+            thread.start()
+            thread.join()
+
+        assert mock_cls.call_count == 2
+
+
+class TestBoundedExtraction:
+    """Tests for extract_text with a max_chars budget."""
+
+    def test_uses_bounded_text_when_content_is_omitted(self, tmp_path: Path) -> None:
+        from doc_triager.bounded_extraction import BoundedText
+
+        f = tmp_path / "a.pdf"
+        f.write_bytes(b"%PDF")
+        bounded = BoundedText(text="head ... tail " * 20, complete=False)
+
+        with (
+            patch("doc_triager.extractor.extract_bounded", return_value=bounded),
+            patch("doc_triager.extractor.MarkItDown") as mock_cls,
+        ):
+            result = extract_text(f, max_chars=100)
+
+        assert result.text == bounded.text
+        mock_cls.return_value.convert.assert_not_called()
+
+    def test_falls_back_to_full_conversion_on_error(self, tmp_path: Path) -> None:
+        """部分抽出に失敗した場合は MarkItDown で全体を変換する。"""
+        f = tmp_path / "a.pdf"
+        f.write_bytes(b"%PDF")
+
+        with (
+            patch(
+                "doc_triager.extractor.extract_bounded",
+                side_effect=ValueError("bad xref"),
+            ),
+            patch("doc_triager.extractor.MarkItDown") as mock_cls,
+        ):
+            mock_cls.return_value.convert.return_value = MagicMock(markdown="A" * 200)
+            result = extract_text(f, max_chars=100)
+
+        assert result.error is None
+        assert result.text == "A" * 200
+
+    def test_disabled_without_budget(self, tmp_path: Path) -> None:
+        f = tmp_path / "a.pdf"
+        f.write_bytes(b"%PDF")
+
+        with (
+            patch("doc_triager.extractor.extract_bounded") as mock_bounded,
+            patch("doc_triager.extractor.MarkItDown") as mock_cls,
+        ):
+            mock_cls.return_value.convert.return_value = MagicMock(markdown="A" * 200)
+            extract_text(f)
+
+        mock_bounded.assert_not_called()
+
+    def test_partial_text_cached_per_budget(self, tmp_path: Path) -> None:
+        """部分抽出の結果は予算ごとに別エントリとしてキャッシュする。"""
+        from doc_triager.bounded_extraction import BoundedText
+        from doc_triager.extraction_cache import ExtractionCache
+
+        f = tmp_path / "a.pdf"
+        f.write_bytes(b"%PDF")
+        cache = ExtractionCache(tmp_path / "cache", max_bytes=0)
+        checksum = "d" * 64
+        bounded = BoundedText(text="partial " * 30, complete=False)
+
+        with patch("doc_triager.extractor.extract_bounded", return_value=bounded):
+            extract_text(f, checksum=checksum, cache=cache, max_chars=100)
+
+        assert cache.get(checksum) is None
+        assert cache.get(checksum, variant="bounded100") == bounded.text
+
+    def test_complete_text_cached_as_full_only_when_exact(self, tmp_path: Path) -> None:
+        """MarkItDown と同じ全文だけを全文として、独自の変換結果は別版としてキャッシュする。"""
+        from doc_triager.bounded_extraction import BoundedText
+        from doc_triager.extraction_cache import ExtractionCache
+
+        f = tmp_path / "a.xlsx"
+        f.write_bytes(b"PK")
+        cache = ExtractionCache(tmp_path / "cache", max_bytes=0)
+        rendered = BoundedText(text="| a | b |\n" * 30, complete=True)
+        exact = BoundedText(text="page text " * 30, complete=True, exact=True)
+
+        with patch("doc_triager.extractor.extract_bounded", return_value=rendered):
+            extract_text(f, checksum="e" * 64, cache=cache, max_chars=1000)
+        with patch("doc_triager.extractor.extract_bounded", return_value=exact):
+            extract_text(f, checksum="f" * 64, cache=cache, max_chars=1000)
+
+        assert cache.get("e" * 64) is None
+        assert cache.get("e" * 64, variant="bounded1000") == rendered.text
+        assert cache.get("f" * 64) == exact.text
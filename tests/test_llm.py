@@ -7,12 +7,33 @@ from unittest.mock import MagicMock, patch
 import pytest
 
 from doc_triager.llm import (
+    MIN_CACHEABLE_TOKENS,
+    CliError,
+    RetryPolicy,
     build_claude_cmd,
     build_codex_cmd,
+    build_messages,
     call_api,
     call_claude,
     call_codex,
+    call_with_retry,
+    is_retryable,
 )
+from doc_triager.tokenizer import estimate_tokens
+from doc_triager.triage import build_classify_prompt
+
+# キャッシュ最小長を超える指示部分
+_LONG_SYSTEM = "Classification rules. " * 400
+
+
+class _StatusError(Exception):
+    """API error carrying an HTTP status and optional Retry-After header."""
+
+    def __init__(self, status_code: int, retry_after: str | None = None) -> None:
+        super().__init__(f"status {status_code}")
+        self.status_code = status_code
+        self.response = MagicMock()
+        self.response.headers = {"retry-after": retry_after} if retry_after else {}
 
 
 class TestCallApi:
@@ -90,6 +111,74 @@ class TestCallApi:
             assert "API connection failed" in str(e)
 
 
+class TestBuildMessages:
+    """Tests for build_messages (prompt-cache friendly message layout)."""
+
+    def test_user_only_without_system(self) -> None:
+        messages = build_messages(prompt="doc", model="openai/gpt-4o")
+
+        assert messages == [{"role": "user", "content": "doc"}]
+
+    def test_system_first_for_openai(self) -> None:
+        messages = build_messages(prompt="doc", model="openai/gpt-4o", system="rules")
+
+        assert messages == [
+            {"role": "system", "content": "rules"},
+            {"role": "user", "content": "doc"},
+        ]
+
+    @pytest.mark.parametrize(
+        "model",
+        [
+            "anthropic/claude-sonnet-4-20250514",
+            "bedrock/anthropic.claude-3-5-haiku-20241022-v1:0",
+        ],
+    )
+    def test_cache_control_for_claude(self, model: str) -> None:
+        """Claude 系では指示部分に cache_control を付ける。"""
+        messages = build_messages(prompt="doc", model=model, system=_LONG_SYSTEM)
+
+        assert messages[0]["content"] == [
+            {
+                "type": "text",
+                "text": _LONG_SYSTEM,
+                "cache_control": {"type": "ephemeral"},
+            }
+        ]
+        assert messages[1] == {"role": "user", "content": "doc"}
+
+    def test_no_cache_control_below_cache_minimum(self) -> None:
+        """キャッシュされない短い指示部分には cache_control を付けない。"""
+        messages = build_messages(
+            prompt="doc", model="anthropic/claude-sonnet-4-20250514", system="rules"
+        )
+
+        assert messages[0] == {"role": "system", "content": "rules"}
+
+    def test_bundled_system_prefix_is_below_cache_minimum(self) -> None:
+        """同梱の指示部分は約400トークンで、プロンプトキャッシュの対象にならない。
+
+        指示を増やして最小長を超えたらこのテストを更新し、cache_control が
+        付くことを確認する。
+        """
+        system = build_classify_prompt(filename="a.pdf", file_extension=".pdf").system
+
+        assert 300 < estimate_tokens(system) < MIN_CACHEABLE_TOKENS
+        messages = build_messages(
+            prompt="doc", model="anthropic/claude-sonnet-4-20250514", system=system
+        )
+        assert messages[0]["content"] == system
+
+    @patch("doc_triager.llm.litellm.completion")
+    def test_call_api_sends_system_message(self, mock_completion: MagicMock) -> None:
+        mock_completion.return_value.choices = [MagicMock()]
+
+        call_api(prompt="doc", system="rules", model="openai/gpt-4o", timeout=120)
+
+        messages = mock_completion.call_args.kwargs["messages"]
+        assert [m["role"] for m in messages] == ["system", "user"]
+
+
 class TestCallClaude:
     """Tests for call_claude function."""
 
@@ -365,3 +454,99 @@ class TestCliPromptLogging:
             call_codex(prompt="codex prompt text", model=None, timeout=120)
 
         assert any("codex prompt text" in record.message for record in caplog.records)
+
+
+class TestIsRetryable:
+    """Tests for is_retryable function."""
+
+    @pytest.mark.parametrize("status", [408, 429, 500, 502, 503, 529])
+    def test_transient_status_is_retryable(self, status: int) -> None:
+        assert is_retryable(_StatusError(status)) is True
+
+    @pytest.mark.parametrize("status", [400, 401, 403, 404])
+    def test_client_error_is_fatal(self, status: int) -> None:
+        assert is_retryable(_StatusError(status)) is False
+
+    def test_cli_timeout_is_retryable(self) -> None:
+        exc = subprocess.TimeoutExpired(cmd="claude", timeout=120)
+        assert is_retryable(exc) is True
+
+    def test_cli_transient_stderr_is_retryable(self) -> None:
+        assert is_retryable(CliError(1, "API Error: 529 Overloaded")) is True
+
+    def test_cli_other_failure_is_fatal(self) -> None:
+        assert is_retryable(CliError(1, "Invalid API key")) is False
+
+    def test_cli_not_found_is_fatal(self) -> None:
+        assert is_retryable(FileNotFoundError("claude")) is False
+
+    def test_generic_exception_is_fatal(self) -> None:
+        assert is_retryable(Exception("boom")) is False
+
+
+class TestCallWithRetry:
+    """Tests for call_with_retry function."""
+
+    def test_retries_transient_then_succeeds(self) -> None:
+        func = MagicMock(side_effect=[_StatusError(503), _StatusError(429), "ok"])
+        sleeps: list[float] = []
+
+        result = call_with_retry(
+            func, policy=RetryPolicy(max_retries=3), sleep=sleeps.append
+        )
+
+        assert result == "ok"
+        assert func.call_count == 3
+        assert len(sleeps) == 2
+
+    def test_fatal_error_not_retried(self) -> None:
+        func = MagicMock(side_effect=_StatusError(401))
+        sleeps: list[float] = []
+
+        with pytest.raises(_StatusError):
+            call_with_retry(
+                func, policy=RetryPolicy(max_retries=3), sleep=sleeps.append
+            )
+
+        assert func.call_count == 1
+        assert sleeps == []
+
+    def test_gives_up_after_max_retries(self) -> None:
+        func = MagicMock(side_effect=_StatusError(500))
+
+        with pytest.raises(_StatusError):
+            call_with_retry(
+                func, policy=RetryPolicy(max_retries=2), sleep=lambda _: None
+            )
+
+        assert func.call_count == 3
+
+    def test_exponential_backoff_with_jitter(self) -> None:
+        func = MagicMock(side_effect=[_StatusError(500)] * 3 + ["ok"])
+        sleeps: list[float] = []
+
+        call_with_retry(
+            func,
+            policy=RetryPolicy(max_retries=3, base_delay_sec=2.0),
+            sleep=sleeps.append,
+        )
+
+        # 2, 4, 8 秒を上限に、その半分以上の値になる
+        for delay, cap in zip(sleeps, [2.0, 4.0, 8.0], strict=True):
+            assert cap / 2 <= delay <= cap
+
+    def test_honors_retry_after(self) -> None:
+        func = MagicMock(side_effect=[_StatusError(429, retry_after="7"), "ok"])
+        sleeps: list[float] = []
+
+        call_with_retry(func, policy=RetryPolicy(max_retries=1), sleep=sleeps.append)
+
+        assert sleeps == [7.0]
+
+    def test_zero_retries_raises_immediately(self) -> None:
+        func = MagicMock(side_effect=_StatusError(503))
+
+        with pytest.raises(_StatusError):
+            call_with_retry(func, policy=RetryPolicy(), sleep=lambda _: None)
+
+        assert func.call_count == 1
@@ -1,5 +1,6 @@
 """Tests for mover module."""
 
+import threading
 from pathlib import Path
 
 import pytest
@@ -126,6 +127,37 @@ class TestMoveFile:
         assert dest.name == "report_2.pdf"
         assert dest.exists()
 
+    def test_concurrent_moves_do_not_collide(self, tmp_path: Path) -> None:
+        """同じ移動先に並列で移動しても上書きされない。"""
+        output_dir = tmp_path / "output"
+        sources = []
+        for i in range(8):
+            source_dir = tmp_path / f"source{i}"
+            source_dir.mkdir()
+            f = source_dir / "report.pdf"
+            f.write_bytes(f"v{i}".encode())
+            sources.append((source_dir, f))
+
+        dests: list[Path] = []
+        lock = threading.Lock()
+
+        def worker(source_dir: Path, f: Path) -> None:
+            dest = move_file(
+                f, source_dir=source_dir, output_dir=output_dir, triage="evergreen"
+            )
+            with lock:
+                dests.append(dest)
+
+        threads = [threading.Thread(target=worker, args=s) for s in sources]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert len(set(dests)) == 8
+        contents = {d.read_bytes() for d in dests}
+        assert contents == {f"v{i}".encode() for i in range(8)}
+
     def test_source_file_not_found_raises(self, dirs: tuple[Path, Path]) -> None:
         source_dir, output_dir = dirs
         f = source_dir / "missing.pdf"
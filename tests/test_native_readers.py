@@ -0,0 +1,156 @@
+"""Tests for native_readers module."""
+
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from doc_triager.extractor import extract_text
+from doc_triager.native_readers import detect_encoding, read_native
+
+
+class TestDetectEncoding:
+    """Tests for detect_encoding."""
+
+    @pytest.mark.parametrize(
+        ("data", "expected"),
+        [
+            ("日本語のテキスト".encode(), "utf-8"),
+            ("日本語のテキスト".encode("cp932"), "cp932"),
+            ("日本語のテキスト".encode("euc-jp"), "euc-jp"),
+            ("日本語のテキスト".encode("utf-8-sig"), "utf-8-sig"),
+            ("日本語のテキスト".encode("utf-16"), "utf-16"),
+            (b"caf\xe9 cr\xe8me \xff\xfe", "latin-1"),
+        ],
+    )
+    def test_detects(self, data: bytes, expected: str) -> None:
+        assert detect_encoding(data) == expected
+
+    @pytest.mark.parametrize(
+        "text", ["会議メモ", "年次報告書", "アーキテクチャ", "テスト"]
+    )
+    @pytest.mark.parametrize("encoding", ["euc-jp", "shift_jis"])
+    def test_short_japanese_text(self, text: str, encoding: str) -> None:
+        """短い EUC-JP を cp932 と誤判定しない（Shift_JIS は cp932 で読む）。"""
+        data = text.encode(encoding)
+
+        assert data.decode(detect_encoding(data)) == text
+
+    def test_ignores_multibyte_char_cut_at_sample_end(self) -> None:
+        """判定用サンプルの末尾で切れた多バイト文字は無視する。"""
+        data = "あいう".encode()[:-1]
+
+        assert detect_encoding(data) == "utf-8"
+
+
+class TestReadNative:
+    """Tests for read_native."""
+
+    def test_binary_formats_are_not_handled(self, tmp_path: Path) -> None:
+        f = tmp_path / "a.pdf"
+        f.write_bytes(b"%PDF")
+
+        assert read_native(f, max_chars=None) is None
+
+    def test_reads_cp932_text(self, tmp_path: Path) -> None:
+        f = tmp_path / "a.txt"
+        f.write_bytes("社内規程\n第1条 目的".encode("cp932"))
+
+        result = read_native(f, max_chars=8000)
+
+        assert result is not None
+        assert result.complete is True
+        assert result.text == "社内規程\n第1条 目的"
+
+    @pytest.mark.parametrize("encoding", ["euc-jp", "shift_jis"])
+    def test_reads_legacy_japanese_text(self, tmp_path: Path, encoding: str) -> None:
+        f = tmp_path / "memo.txt"
+        f.write_bytes("会議メモ\nテスト".encode(encoding))
+
+        result = read_native(f, max_chars=8000)
+
+        assert result is not None
+        assert result.text == "会議メモ\nテスト"
+
+    def test_large_file_reads_only_head_and_tail(self, tmp_path: Path) -> None:
+        """予算を超える大きなファイルは先頭と末尾だけを読む。"""
+        f = tmp_path / "log.txt"
+        lines = [f"{i:06d} ログ行\n" for i in range(100_000)]
+        f.write_text("".join(lines), encoding="utf-8")
+
+        result = read_native(f, max_chars=300)
+
+        assert result is not None
+        assert result.complete is False
+        head, tail = result.text.split("\n\n[...omitted...]\n\n")
+        assert head.startswith("000000 ログ行\n")
+        assert len(head) == 200
+        assert tail.endswith("099999 ログ行\n")
+        assert len(tail) == 100
+        assert "050000" not in result.text
+
+    def test_csv_rendered_as_markdown_table(self, tmp_path: Path) -> None:
+        f = tmp_path / "a.csv"
+        f.write_text('id,name\n1,"Smith, J"\n2,山田\n', encoding="utf-8")
+
+        result = read_native(f, max_chars=None)
+
+        assert result is not None
+        assert result.text == (
+            "| id | name |\n| --- | --- |\n| 1 | Smith, J |\n| 2 | 山田 |"
+        )
+
+    def test_large_csv_drops_partial_rows(self, tmp_path: Path) -> None:
+        f = tmp_path / "big.csv"
+        rows = "".join(f"{i},value{i}\n" for i in range(100_000))
+        f.write_text("id,value\n" + rows, encoding="utf-8")
+
+        result = read_native(f, max_chars=300)
+
+        assert result is not None
+        assert result.complete is False
+        head, tail = result.text.split("\n\n[...omitted...]\n\n")
+        assert head.startswith("| id | value |\n| --- | --- |\n| 0 | value0 |")
+        assert all(line.count("|") == 3 for line in head.splitlines())
+        assert all(line.count("|") == 3 for line in tail.splitlines())
+        assert tail.endswith("| 99999 | value99999 |")
+
+    def test_html_visible_text(self, tmp_path: Path) -> None:
+        f = tmp_path / "a.html"
+        f.write_bytes(
+            """<html><head><meta charset="shift_jis"><title>t</title>
+            <style>body { color: red; }</style></head>
+            <body><h1>お知らせ</h1><script>var x = 1;</script>
+            <p>本文の&amp;段落です。</p><ul><li>項目1</li><li>項目2</li></ul>
+            </body></html>""".encode("cp932")
+        )
+
+        result = read_native(f, max_chars=None)
+
+        assert result is not None
+        assert result.text == "# お知らせ\n\n本文の&段落です。\n\n- 項目1\n- 項目2"
+
+
+class TestExtractTextDispatch:
+    """Tests for format dispatch in extract_text."""
+
+    def test_plain_text_bypasses_markitdown(self, tmp_path: Path) -> None:
+        f = tmp_path / "a.json"
+        f.write_text('{"title": "' + "x" * 200 + '"}')
+
+        with patch("doc_triager.extractor.MarkItDown") as mock_cls:
+            result = extract_text(f)
+
+        mock_cls.assert_not_called()
+        assert result.text == f.read_text()
+
+    def test_binary_format_uses_markitdown(self, tmp_path: Path) -> None:
+        f = tmp_path / "a.docx"
+        f.write_bytes(b"PK")
+
+        with patch("doc_triager.extractor.MarkItDown") as mock_cls:
+            mock_cls.return_value.convert.return_value.markdown = "A" * 200
+            result = extract_text(f)
+
+        mock_cls.return_value.convert.assert_called_once_with(f)
+        assert result.text == "A" * 200
@@ -1,7 +1,10 @@
 """Tests for pipeline module."""
 
 import json
+import time
+from datetime import datetime
 from pathlib import Path
+from typing import Any
 from unittest.mock import MagicMock, patch
 
 import pytest
@@ -13,9 +16,18 @@ from doc_triager.config import (
     InputConfig,
     LlmConfig,
     OutputConfig,
+    RateLimitConfig,
     TextExtractionConfig,
 )
-from doc_triager.database import get_by_source_path, init_database
+from doc_triager.checksum import compute_checksum
+from doc_triager.database import (
+    export_all,
+    get_by_source_path,
+    init_database,
+    insert_result,
+)
+from doc_triager.extraction_pool import ExtractionPool, _extract_limited
+from doc_triager.extractor import ExtractionResult
 from doc_triager.pipeline import _is_file_direct_mode, process_file, process_files
 
 
@@ -39,7 +51,11 @@ def workspace(tmp_path: Path) -> dict:
         input=InputConfig(directory=str(source_dir)),
         output=OutputConfig(directory=str(output_dir)),
         triage=TriageConfig(confidence_threshold=0.7),
-        llm=LlmConfig(provider="openai", model="gpt-4o"),
+        llm=LlmConfig(
+            provider="openai",
+            model="gpt-4o",
+            rate_limit=RateLimitConfig(requests_per_minute=0),
+        ),
         database=DatabaseConfig(path=str(db_path)),
         text_extraction=TextExtractionConfig(min_text_length=10),
     )
@@ -60,6 +76,15 @@ def _mock_summary_response(summary: str) -> MagicMock:
     return resp
 
 
+def _hanging_extract(file_path: Path, **kwargs: Any) -> ExtractionResult:
+    """Extraction task whose converter never returns (runs in the worker)."""
+    with patch(
+        "doc_triager.extraction_pool.extract_text",
+        side_effect=lambda *a, **k: time.sleep(60),
+    ):
+        return _extract_limited(file_path, **kwargs)
+
+
 def _mock_llm_response(triage: str, confidence: float) -> MagicMock:
     resp = MagicMock()
     resp.choices = [MagicMock()]
@@ -155,6 +180,116 @@ class TestProcessFile:
         assert result["skipped"] is True
         assert mock_completion.call_count == 1
 
+    @patch("doc_triager.llm.litellm.completion")
+    def test_checksum_computed_once_on_resume(
+        self, mock_completion: MagicMock, workspace: dict
+    ) -> None:
+        """再開時の処理済み判定でファイルを二重にハッシュしない。"""
+        mock_completion.return_value = _mock_llm_response("evergreen", 0.9)
+        process_file(file_path=workspace["file"], cfg=workspace["cfg"], dry_run=False)
+        dest = next(Path(workspace["output_dir"]).rglob("design.pdf"))
+        dest.rename(workspace["file"])
+
+        with patch("doc_triager.checksum.compute_checksum") as mock_compute:
+            result = process_file(
+                file_path=workspace["file"], cfg=workspace["cfg"], dry_run=False
+            )
+
+        assert result["skipped"] is True
+        mock_compute.assert_not_called()
+
+    @patch("doc_triager.llm.litellm.completion")
+    def test_paranoid_rehashes_unchanged_file(
+        self, mock_completion: MagicMock, workspace: dict
+    ) -> None:
+        mock_completion.return_value = _mock_llm_response("evergreen", 0.9)
+        process_file(file_path=workspace["file"], cfg=workspace["cfg"], dry_run=False)
+        dest = next(Path(workspace["output_dir"]).rglob("design.pdf"))
+        dest.rename(workspace["file"])
+
+        with patch(
+            "doc_triager.pipeline.compute_checksum", wraps=compute_checksum
+        ) as mock_compute:
+            result = process_file(
+                file_path=workspace["file"],
+                cfg=workspace["cfg"],
+                dry_run=False,
+                paranoid=True,
+            )
+
+        assert result["skipped"] is True
+        mock_compute.assert_called_once()
+
+    @patch("doc_triager.llm.litellm.completion")
+    def test_duplicate_content_reuses_verdict(
+        self, mock_completion: MagicMock, workspace: dict
+    ) -> None:
+        """同一内容のファイルは LLM を呼ばずに既存の分類結果を再利用する。"""
+        mock_completion.return_value = _mock_llm_response("evergreen", 0.9)
+        copy_dir = workspace["source_dir"] / "copies"
+        copy_dir.mkdir()
+        duplicate = copy_dir / "design-copy.pdf"
+        duplicate.write_bytes(workspace["file"].read_bytes())
+
+        process_file(file_path=workspace["file"], cfg=workspace["cfg"], dry_run=False)
+        with patch("doc_triager.pipeline.extract_text") as mock_extract:
+            result = process_file(
+                file_path=duplicate, cfg=workspace["cfg"], dry_run=False
+            )
+
+        assert mock_completion.call_count == 1
+        mock_extract.assert_not_called()
+        assert result["triage"] == "evergreen"
+        assert result["deduplicated"] is True
+        assert not duplicate.exists()
+        assert Path(result["destination_path"]).exists()
+
+        original = get_by_source_path(workspace["db_path"], str(workspace["file"]))
+        record = get_by_source_path(workspace["db_path"], str(duplicate))
+        assert record is not None
+        assert record["dedup_of"] == original["id"]
+        assert record["triage"] == "evergreen"
+        assert json.loads(record["topics"]) == ["test"]
+
+    @patch("doc_triager.llm.litellm.completion")
+    def test_duplicate_of_error_result_is_reclassified(
+        self, mock_completion: MagicMock, workspace: dict
+    ) -> None:
+        """エラー結果は再利用しない。"""
+        mock_completion.side_effect = [
+            Exception("API down"),
+            _mock_llm_response("temporal", 0.9),
+        ]
+        duplicate = workspace["source_dir"] / "design-copy.pdf"
+        duplicate.write_bytes(workspace["file"].read_bytes())
+
+        process_file(file_path=workspace["file"], cfg=workspace["cfg"], dry_run=False)
+        result = process_file(file_path=duplicate, cfg=workspace["cfg"], dry_run=False)
+
+        assert mock_completion.call_count == 2
+        assert result["triage"] == "temporal"
+        assert "deduplicated" not in result
+
+    @patch("doc_triager.llm.litellm.completion")
+    def test_duplicate_of_insufficient_text_stays_in_place(
+        self, mock_completion: MagicMock, workspace: dict
+    ) -> None:
+        """テキスト不足で移動しなかったファイルの重複も移動しない。"""
+        original = workspace["source_dir"] / "scan.pdf"
+        original.write_text("x")
+        duplicate = workspace["source_dir"] / "scan-copy.pdf"
+        duplicate.write_text("x")
+
+        process_file(file_path=original, cfg=workspace["cfg"], dry_run=False)
+        result = process_file(file_path=duplicate, cfg=workspace["cfg"], dry_run=False)
+
+        mock_completion.assert_not_called()
+        assert "deduplicated" not in result
+        assert result["triage"] == "unknown"
+        assert result["destination_path"] is None
+        assert original.exists()
+        assert duplicate.exists()
+
     def test_extraction_error_records_unknown(self, workspace: dict) -> None:
         with patch("doc_triager.pipeline.extract_text") as mock_extract:
             from doc_triager.extractor import ExtractionResult
@@ -218,6 +353,257 @@ class TestProcessFiles:
             == summary["total"]
         )
 
+    @patch("doc_triager.llm.litellm.completion")
+    def test_batch_size_classifies_small_files_together(
+        self, mock_completion: MagicMock, workspace: dict
+    ) -> None:
+        """batch_size 件の小さな文書を1リクエストで分類する。"""
+        source_dir = workspace["source_dir"]
+        workspace["file"].unlink()
+        for i in range(4):
+            (source_dir / f"memo{i}.md").write_text(f"Memo {i} " * 20)
+        files = sorted(source_dir.glob("*.md"))
+
+        resp = MagicMock()
+        resp.choices = [MagicMock()]
+        resp.choices[0].message.content = json.dumps(
+            [
+                {
+                    "id": f"doc-{i}",
+                    "classification": "evergreen",
+                    "confidence": 0.9,
+                    "reason": "Test reason",
+                    "topics": [],
+                }
+                for i in range(1, 5)
+            ]
+        )
+        mock_completion.return_value = resp
+        workspace["cfg"].processing.workers = 4
+        workspace["cfg"].triage.batch_size = 4
+        workspace["cfg"].triage.batch_wait_ms = 5000
+
+        summary = process_files(files=files, cfg=workspace["cfg"], dry_run=False)
+
+        assert mock_completion.call_count == 1
+        assert summary["evergreen"] == len(files)
+        moved = list((workspace["output_dir"] / "evergreen").glob("*.md"))
+        assert len(moved) == len(files)
+
+    @patch("doc_triager.llm.litellm.completion")
+    def test_parallel_workers_match_serial_counts(
+        self, mock_completion: MagicMock, tmp_path: Path
+    ) -> None:
+        """workers=1 と workers=4 で同じファイル群を処理し、結果が一致する。"""
+
+        def respond(*, messages: list[dict], **_: object) -> MagicMock:
+            content = messages[-1]["content"]
+            # 内容に応じて分類を変え、ファイルと結果の対応の取り違えを検出する
+            if "Content 3 " in content or "Content 7 " in content:
+                return _mock_llm_response("temporal", 0.8)
+            if "Content 5 " in content:
+                return _mock_llm_response("evergreen", 0.5)
+            return _mock_llm_response("evergreen", 0.9)
+
+        mock_completion.side_effect = respond
+
+        def run(workers: int) -> tuple[dict[str, int], list[tuple]]:
+            base = tmp_path / f"workers{workers}"
+            source_dir = base / "source"
+            output_dir = base / "output"
+            source_dir.mkdir(parents=True)
+            output_dir.mkdir()
+            db_path = base / "test.db"
+            init_database(db_path)
+            for i in range(10):
+                (source_dir / f"doc{i}.md").write_text(f"Content {i} " * 20)
+            cfg = Config(
+                input=InputConfig(directory=str(source_dir)),
+                output=OutputConfig(directory=str(output_dir)),
+                triage=TriageConfig(confidence_threshold=0.7),
+                llm=LlmConfig(
+                    provider="openai",
+                    model="gpt-4o",
+                    rate_limit=RateLimitConfig(requests_per_minute=0),
+                ),
+                database=DatabaseConfig(path=str(db_path)),
+                text_extraction=TextExtractionConfig(min_text_length=10),
+            )
+            cfg.processing.workers = workers
+
+            summary = process_files(
+                files=sorted(source_dir.glob("*.md")), cfg=cfg, dry_run=False
+            )
+
+            rows = [
+                (
+                    Path(row["source_path"]).relative_to(source_dir).as_posix(),
+                    Path(row["destination_path"]).relative_to(output_dir).as_posix(),
+                    row["checksum"],
+                    row["triage"],
+                    row["confidence"],
+                    row["reason"],
+                    row["topics"],
+                    row["extracted_text_length"],
+                    row["truncated"],
+                    row["error_message"],
+                )
+                for row in export_all(db_path)
+            ]
+            return summary, sorted(rows)
+
+        serial_summary, serial_rows = run(1)
+        parallel_summary, parallel_rows = run(4)
+
+        assert parallel_summary == serial_summary
+        assert parallel_rows == serial_rows
+        assert serial_summary["total"] == 10
+        assert serial_summary["temporal"] == 2
+        assert serial_summary["unknown"] == 1
+        assert len(serial_rows) == 10
+        assert mock_completion.call_count == 20
+
+    @patch("doc_triager.llm.litellm.completion")
+    def test_hash_prepass_hashes_each_file_once(
+        self, mock_completion: MagicMock, workspace: dict
+    ) -> None:
+        source_dir = workspace["source_dir"]
+        for i in range(5):
+            (source_dir / f"doc{i}.pdf").write_text(f"Content {i} " * 20)
+        files = sorted(source_dir.glob("*.pdf"))
+
+        mock_completion.return_value = _mock_llm_response("evergreen", 0.9)
+        workspace["cfg"].processing.hash_workers = 2
+
+        with patch(
+            "doc_triager.pipeline.compute_checksum", wraps=compute_checksum
+        ) as mock_compute:
+            summary = process_files(files=files, cfg=workspace["cfg"], dry_run=False)
+
+        assert summary["evergreen"] == len(files)
+        assert mock_compute.call_count == len(files)
+        for f in files:
+            record = get_by_source_path(workspace["db_path"], str(f))
+            assert record is not None
+            assert record["checksum"] == compute_checksum(
+                workspace["output_dir"] / "evergreen" / f.name
+            )
+
+    @patch("doc_triager.llm.litellm.completion")
+    def test_hash_prepass_disabled(
+        self, mock_completion: MagicMock, workspace: dict
+    ) -> None:
+        mock_completion.return_value = _mock_llm_response("evergreen", 0.9)
+        workspace["cfg"].processing.hash_workers = 0
+
+        summary = process_files(
+            files=[workspace["file"]], cfg=workspace["cfg"], dry_run=False
+        )
+
+        assert summary["evergreen"] == 1
+
+    @patch("doc_triager.llm.litellm.completion")
+    def test_extraction_process_pool(
+        self, mock_completion: MagicMock, workspace: dict
+    ) -> None:
+        """テキスト抽出を別プロセスで実行しても結果は同じ。"""
+        source_dir = workspace["source_dir"]
+        (source_dir / "notes.md").write_text("# Notes\n\n" + "Design notes. " * 20)
+        files = sorted(source_dir.iterdir())
+        mock_completion.return_value = _mock_llm_response("evergreen", 0.9)
+        workspace["cfg"].processing.extract_workers = 2
+        workspace["cfg"].processing.hash_workers = 0
+
+        with patch(
+            "doc_triager.pipeline.ExtractionPool", wraps=ExtractionPool
+        ) as mock_pool:
+            summary = process_files(files=files, cfg=workspace["cfg"], dry_run=False)
+
+        mock_pool.assert_called_once()
+        assert mock_pool.call_args.kwargs["workers"] == 2
+        assert summary["evergreen"] == 2
+        for f in files:
+            assert get_by_source_path(workspace["db_path"], str(f)) is not None
+
+    @patch("doc_triager.llm.litellm.completion")
+    def test_default_config_times_out_hanging_extraction(
+        self, mock_completion: MagicMock, workspace: dict
+    ) -> None:
+        """extract_workers を指定しなくても抽出タイムアウトが適用される。"""
+        cfg = workspace["cfg"]
+        assert cfg.processing.extract_workers == 0
+        cfg.processing.extract_timeout_sec = 1
+
+        start = time.monotonic()
+        with patch("doc_triager.extraction_pool._extract_limited", _hanging_extract):
+            summary = process_files(files=[workspace["file"]], cfg=cfg, dry_run=False)
+
+        assert time.monotonic() - start < 30
+        assert summary["error"] == 1
+        mock_completion.assert_not_called()
+        row = get_by_source_path(workspace["db_path"], str(workspace["file"]))
+        assert row["error_message"] == "抽出タイムアウト（1秒）"
+
+    def test_prepare_skips_extraction_for_known_content(self, workspace: dict) -> None:
+        """処理済み・重複ファイルは抽出プロセスに投入しない。"""
+        from doc_triager.pipeline import _prepare
+
+        source_dir = workspace["source_dir"]
+        copy = source_dir / "copy.pdf"
+        copy.write_bytes(workspace["file"].read_bytes())
+        extract = MagicMock()
+
+        checksum, pending = _prepare(
+            workspace["file"],
+            db=workspace["db_path"],
+            paranoid=False,
+            buf_size=1024,
+            extract=extract,
+        )
+        assert checksum == compute_checksum(workspace["file"])
+        assert pending is extract.return_value
+        extract.assert_called_once_with(workspace["file"], checksum)
+
+        insert_result(
+            workspace["db_path"],
+            {
+                "source_path": str(workspace["file"]),
+                "destination_path": str(workspace["output_dir"] / "design.pdf"),
+                "checksum": checksum,
+                "triage": "evergreen",
+                "processed_at": datetime.now(),
+            },
+        )
+        extract.reset_mock()
+
+        _, pending = _prepare(
+            copy,
+            db=workspace["db_path"],
+            paranoid=False,
+            buf_size=1024,
+            extract=extract,
+        )
+        assert pending is None
+        extract.assert_not_called()
+
+    @patch("doc_triager.llm.litellm.completion")
+    def test_accepts_lazy_iterator(
+        self, mock_completion: MagicMock, workspace: dict
+    ) -> None:
+        """スキャン結果をジェネレータのまま渡しても処理できる。"""
+        from doc_triager.scanner import iter_files
+
+        source_dir = workspace["source_dir"]
+        (source_dir / "a.pdf").write_text("Content A " * 20)
+        mock_completion.return_value = _mock_llm_response("evergreen", 0.9)
+
+        summary = process_files(
+            files=iter_files(source_dir), cfg=workspace["cfg"], dry_run=False
+        )
+
+        assert summary["total"] == 2
+        assert summary["evergreen"] == 2
+
 
 class TestSummaryIntegration:
     """Tests for LLM summary step in pipeline."""
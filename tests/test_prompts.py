@@ -0,0 +1,85 @@
+"""Tests for prompts module."""
+
+import os
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from doc_triager.prompts import BUNDLED_PROMPT_DIR, PromptStore, PromptTemplate
+
+
+class TestPromptTemplate:
+    """Tests for PromptTemplate."""
+
+    def test_render_matches_str_format(self) -> None:
+        source = 'File: {filename}\nTruncated: {truncated}\n{{"a": {n:.2f}}} {name!r}'
+        values = {"filename": "a.pdf", "truncated": True, "n": 0.5, "name": "x"}
+
+        assert PromptTemplate(source).render(**values) == source.format(**values)
+
+    @pytest.mark.parametrize(
+        "name",
+        [
+            "classify_system.txt",
+            "classify_user.txt",
+            "classify_file.txt",
+            "summary.txt",
+        ],
+    )
+    def test_bundled_templates_render_like_format(self, name: str) -> None:
+        source = (BUNDLED_PROMPT_DIR / name).read_text(encoding="utf-8")
+        template = PromptTemplate(source)
+        values = {field: f"<{field}>" for field in template.fields}
+
+        assert template.render(**values) == source.format(**values)
+
+    def test_missing_value_raises_key_error(self) -> None:
+        with pytest.raises(KeyError):
+            PromptTemplate("{filename}").render()
+
+
+class TestPromptStore:
+    """Tests for PromptStore."""
+
+    def test_bundled_template_read_once(self) -> None:
+        """同梱テンプレートは初回だけ読み込む。"""
+        store = PromptStore()
+
+        with patch.object(Path, "read_text", autospec=True, return_value="x") as read:
+            store.get("summary.txt")
+            store.get("summary.txt")
+            store.get("summary.txt")
+
+        assert read.call_count == 1
+
+    def test_user_directory_overrides_bundled(self, tmp_path: Path) -> None:
+        (tmp_path / "summary.txt").write_text("Custom {filename}", encoding="utf-8")
+        store = PromptStore([tmp_path])
+
+        assert store.get("summary.txt").render(filename="a.pdf") == "Custom a.pdf"
+        assert "{filename}" in store.get("classify_user.txt").source
+
+    def test_reloads_when_file_changes(self, tmp_path: Path) -> None:
+        """ユーザーテンプレートは mtime が変わったら再読み込みする。"""
+        path = tmp_path / "summary.txt"
+        path.write_text("v1 {text}", encoding="utf-8")
+        store = PromptStore([tmp_path])
+        assert store.get("summary.txt").render(text="t") == "v1 t"
+
+        path.write_text("v2 {text}", encoding="utf-8")
+        st = path.stat()
+        os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+        assert store.get("summary.txt").render(text="t") == "v2 t"
+
+    def test_unchanged_user_template_not_reread(self, tmp_path: Path) -> None:
+        (tmp_path / "summary.txt").write_text("v1 {text}", encoding="utf-8")
+        store = PromptStore([tmp_path])
+        first = store.get("summary.txt")
+
+        assert store.get("summary.txt") is first
+
+    def test_missing_template_raises(self) -> None:
+        with pytest.raises(FileNotFoundError):
+            PromptStore().get("nonexistent.txt")
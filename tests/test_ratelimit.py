@@ -0,0 +1,122 @@
+"""Tests for ratelimit module."""
+
+import pytest
+
+from doc_triager.config import RateLimitConfig
+from doc_triager.ratelimit import RateLimiter, TokenBucket, estimate_tokens
+
+
+class FakeClock:
+    """Deterministic clock whose sleep advances time."""
+
+    def __init__(self) -> None:
+        self.now = 0.0
+        self.sleeps: list[float] = []
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class TestEstimateTokens:
+    """Tests for estimate_tokens function."""
+
+    def test_ascii_counts_four_chars_per_token(self) -> None:
+        assert estimate_tokens("a" * 400) == 100
+
+    def test_non_ascii_counts_one_per_char(self) -> None:
+        assert estimate_tokens("設計原則") == 4
+
+    def test_empty(self) -> None:
+        assert estimate_tokens("") == 0
+
+
+class TestTokenBucket:
+    """Tests for TokenBucket class."""
+
+    def test_first_acquire_within_capacity_does_not_wait(self) -> None:
+        clock = FakeClock()
+        bucket = TokenBucket(
+            rate_per_minute=60, capacity=2, clock=clock, sleep=clock.sleep
+        )
+
+        assert bucket.acquire() == 0.0
+        assert bucket.acquire() == 0.0
+        assert clock.sleeps == []
+
+    def test_waits_when_empty(self) -> None:
+        clock = FakeClock()
+        bucket = TokenBucket(
+            rate_per_minute=30, capacity=1, clock=clock, sleep=clock.sleep
+        )
+
+        bucket.acquire()
+        waited = bucket.acquire()
+
+        # 30 rpm = 2秒に1回
+        assert waited == pytest.approx(2.0)
+
+    def test_refills_over_time(self) -> None:
+        clock = FakeClock()
+        bucket = TokenBucket(
+            rate_per_minute=60, capacity=1, clock=clock, sleep=clock.sleep
+        )
+
+        bucket.acquire()
+        clock.now += 1.0
+
+        assert bucket.acquire() == 0.0
+
+    def test_amount_clamped_to_capacity(self) -> None:
+        clock = FakeClock()
+        bucket = TokenBucket(
+            rate_per_minute=600, capacity=100, clock=clock, sleep=clock.sleep
+        )
+
+        # 容量を超える要求でも永久に待たない
+        assert bucket.acquire(1000) == 0.0
+        assert bucket.acquire(50) == pytest.approx(5.0)
+
+    def test_invalid_rate_raises(self) -> None:
+        with pytest.raises(ValueError):
+            TokenBucket(rate_per_minute=0, capacity=1)
+
+
+class TestRateLimiter:
+    """Tests for RateLimiter class."""
+
+    def test_from_config_disabled(self) -> None:
+        config = RateLimitConfig(requests_per_minute=0, tokens_per_minute=0)
+
+        assert RateLimiter.from_config(config) is None
+
+    def test_from_config_enabled(self) -> None:
+        config = RateLimitConfig(requests_per_minute=30)
+
+        assert isinstance(RateLimiter.from_config(config), RateLimiter)
+
+    def test_requests_per_minute_spacing(self) -> None:
+        clock = FakeClock()
+        limiter = RateLimiter(requests_per_minute=60, clock=clock, sleep=clock.sleep)
+
+        for _ in range(3):
+            limiter.acquire("prompt")
+
+        assert clock.now == pytest.approx(2.0)
+
+    def test_tokens_per_minute_budget(self) -> None:
+        clock = FakeClock()
+        limiter = RateLimiter(
+            requests_per_minute=0,
+            tokens_per_minute=600,
+            clock=clock,
+            sleep=clock.sleep,
+        )
+
+        limiter.acquire("a" * 2400)  # 600 tokens: バケット満タン分
+        limiter.acquire("a" * 400)  # 100 tokens: 10秒待ち
+
+        assert clock.now == pytest.approx(10.0)
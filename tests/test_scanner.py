@@ -165,3 +165,148 @@ class TestScanFiles:
         # 除外・スキップも相対パスで出力される
         assert any("binary.exe" in msg for msg in caplog.messages)
         assert any("除外: .DS_Store" in msg for msg in caplog.messages)
+
+
+class TestIterFiles:
+    """Tests for iter_files generator."""
+
+    def test_is_lazy(self, source_tree: Path) -> None:
+        from doc_triager.scanner import iter_files
+
+        files = iter_files(source_tree)
+
+        first = next(files)
+        assert first.is_file()
+
+    def test_same_order_as_scan_files(self, source_tree: Path) -> None:
+        from doc_triager.scanner import iter_files, scan_files
+
+        assert list(iter_files(source_tree)) == scan_files(source_tree)
+
+    def test_order_matches_sorted_rglob(self, tmp_path: Path) -> None:
+        from doc_triager.scanner import iter_files
+
+        (tmp_path / "a").mkdir()
+        (tmp_path / "a-b").mkdir()
+        (tmp_path / "a" / "x.pdf").write_text("x")
+        (tmp_path / "a-b" / "y.pdf").write_text("y")
+        (tmp_path / "a.pdf").write_text("a")
+
+        expected = sorted(p for p in tmp_path.rglob("*") if p.is_file())
+
+        assert list(iter_files(tmp_path)) == expected
+
+    def test_excluded_directory_is_not_entered(
+        self, source_tree: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        import os
+
+        from doc_triager import scanner
+
+        listed: list[str] = []
+        original = os.scandir
+
+        def recording_scandir(path):
+            listed.append(os.path.basename(path))
+            return original(path)
+
+        monkeypatch.setattr(scanner.os, "scandir", recording_scandir)
+
+        list(scanner.iter_files(source_tree))
+
+        assert ".git" not in listed
+        assert "__MACOSX" not in listed
+        assert "deep" in listed
+
+    def test_prune_dirs(self, source_tree: Path) -> None:
+        from doc_triager.scanner import iter_files
+
+        files = list(iter_files(source_tree, prune_dirs=[source_tree / "sub"]))
+
+        assert not any(f.name == "nested.pdf" for f in files)
+        assert any(f.name == "design.pdf" for f in files)
+
+    def test_nonexistent_directory(self, tmp_path: Path) -> None:
+        from doc_triager.scanner import iter_files
+
+        with pytest.raises(FileNotFoundError):
+            next(iter_files(tmp_path / "nonexistent"))
+
+
+class TestExcludeMatcher:
+    """Tests for compiled exclude patterns."""
+
+    def test_name_pattern(self) -> None:
+        from doc_triager.scanner import _ExcludeMatcher
+
+        matcher = _ExcludeMatcher(["*.DS_Store", "*.tmp"])
+
+        assert matcher.match_file("x.tmp", "a/x.tmp")
+        assert matcher.match_file(".DS_Store", ".DS_Store")
+        assert not matcher.match_file("x.pdf", "a/x.pdf")
+        assert not matcher.match_dir("tmp")
+
+    def test_path_pattern(self) -> None:
+        from doc_triager.scanner import _ExcludeMatcher
+
+        matcher = _ExcludeMatcher(["drafts/*.docx"])
+
+        assert matcher.match_file("a.docx", "drafts/a.docx")
+        assert not matcher.match_file("a.docx", "final/a.docx")
+
+    def test_directory_part(self) -> None:
+        """`/` や `**` を含むパターンの先頭要素はディレクトリ名として判定される。"""
+        from doc_triager.scanner import _ExcludeMatcher
+
+        matcher = _ExcludeMatcher([".git/**", "__MACOSX/**", "*.gitkeep"])
+
+        assert matcher.match_dir(".git")
+        assert matcher.match_dir("__MACOSX")
+        assert not matcher.match_dir("docs")
+        assert matcher.match_file(".git", ".git")
+
+    def test_no_patterns(self) -> None:
+        from doc_triager.scanner import _ExcludeMatcher
+
+        matcher = _ExcludeMatcher([])
+
+        assert not matcher.match_dir(".git")
+        assert not matcher.match_file("a.pdf", "a.pdf")
+
+    def test_nested_path_pattern_in_scan(self, tmp_path: Path) -> None:
+        from doc_triager.scanner import scan_files
+
+        (tmp_path / "a" / "drafts").mkdir(parents=True)
+        (tmp_path / "a" / "drafts" / "x.pdf").write_text("x")
+        (tmp_path / "a" / "y.pdf").write_text("y")
+
+        files = scan_files(tmp_path, exclude_patterns=["drafts/*"])
+
+        assert [f.name for f in files] == ["y.pdf"]
+
+
+class TestIterFilesLimit:
+    """Tests for limit and skip options of iter_files."""
+
+    def test_limit_stops_walk(self, source_tree: Path) -> None:
+        from doc_triager.scanner import iter_files, scan_files
+
+        files = list(iter_files(source_tree, limit=2))
+
+        assert files == scan_files(source_tree)[:2]
+
+    def test_limit_zero_yields_nothing(self, source_tree: Path) -> None:
+        from doc_triager.scanner import iter_files
+
+        assert list(iter_files(source_tree, limit=0)) == []
+
+    def test_skipped_files_do_not_count(self, source_tree: Path) -> None:
+        """処理済みとしてスキップしたファイルは上限に数えない。"""
+        from doc_triager.scanner import iter_files, scan_files
+
+        all_files = scan_files(source_tree)
+        done = set(all_files[:2])
+
+        files = list(iter_files(source_tree, skip=done.__contains__, limit=2))
+
+        assert files == all_files[2:4]
@@ -0,0 +1,171 @@
+"""Tests for tokenizer module."""
+
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+
+from doc_triager.extractor import truncate_text
+from doc_triager.tokenizer import (
+    EstimateTokenizer,
+    HuggingFaceTokenizer,
+    TiktokenTokenizer,
+    Tokenizer,
+    estimate_tokens,
+    get_tokenizer,
+)
+
+
+class TestEstimateTokenizer:
+    """Tests for EstimateTokenizer."""
+
+    @pytest.mark.parametrize(
+        "text", ["a" * 1000, "設計原則" * 250, "ab設計cd原則" * 100]
+    )
+    @pytest.mark.parametrize("max_tokens", [0, 1, 7, 100])
+    def test_head_and_tail_fill_budget_exactly(
+        self, text: str, max_tokens: int
+    ) -> None:
+        """切り出した部分は予算内で、1文字でも増やすと予算を超える。"""
+        tokenizer = EstimateTokenizer()
+
+        head = tokenizer.head(text, max_tokens)
+        tail = tokenizer.tail(text, max_tokens)
+
+        assert text.startswith(head)
+        assert text.endswith(tail)
+        assert estimate_tokens(head) <= max_tokens
+        assert estimate_tokens(text[: len(head) + 1]) > max_tokens
+        assert estimate_tokens(tail) <= max_tokens
+        assert estimate_tokens(text[len(text) - len(tail) - 1 :]) > max_tokens
+
+    def test_short_text_returned_whole(self) -> None:
+        tokenizer = EstimateTokenizer()
+
+        assert tokenizer.head("短い文", 100) == "短い文"
+        assert tokenizer.tail("短い文", 100) == "短い文"
+
+
+class TestTruncateByTokens:
+    """Tests for truncate_text with a tokenizer."""
+
+    def test_fits_budget(self) -> None:
+        tokenizer = EstimateTokenizer()
+        text = "日本語の本文です。" * 2000
+
+        result = truncate_text(text, max_length=1000, tokenizer=tokenizer)
+
+        assert result.truncated is True
+        assert estimate_tokens(result.text) <= 1000
+        assert estimate_tokens(result.text) >= 995
+
+    def test_english_gets_more_characters_than_japanese(self) -> None:
+        """同じトークン予算でも英語は日本語より多くの文字を渡せる。"""
+        tokenizer = EstimateTokenizer()
+
+        english = truncate_text("word " * 10000, max_length=1000, tokenizer=tokenizer)
+        japanese = truncate_text("単語" * 10000, max_length=1000, tokenizer=tokenizer)
+
+        assert len(english.text) > 3 * len(japanese.text)
+
+    def test_within_budget_not_truncated(self) -> None:
+        text = "a" * 4000
+
+        result = truncate_text(text, max_length=1000, tokenizer=EstimateTokenizer())
+
+        assert result.truncated is False
+        assert result.text == text
+
+
+class TestGetTokenizer:
+    """Tests for get_tokenizer."""
+
+    def test_estimate_is_default(self) -> None:
+        assert isinstance(get_tokenizer("estimate"), EstimateTokenizer)
+
+    def test_unknown_spec_raises(self) -> None:
+        with pytest.raises(ValueError, match="未対応のトークナイザ"):
+            get_tokenizer("sentencepiece")
+
+    def test_missing_library_falls_back_to_estimate(self) -> None:
+        get_tokenizer.cache_clear()
+        with patch.dict(sys.modules, {"tiktoken": None}):
+            tokenizer = get_tokenizer("tiktoken:cl100k_base")
+        get_tokenizer.cache_clear()
+
+        assert isinstance(tokenizer, EstimateTokenizer)
+
+    def test_missing_model_file_falls_back_to_estimate(self, tmp_path: Path) -> None:
+        get_tokenizer.cache_clear()
+        with patch.dict(sys.modules, {"tokenizers": _stub_tokenizers()}):
+            tokenizer = get_tokenizer(f"hf:{tmp_path / 'missing.json'}")
+        get_tokenizer.cache_clear()
+
+        assert isinstance(tokenizer, EstimateTokenizer)
+
+    def test_tiktoken_cuts_at_token_boundaries(self) -> None:
+        pytest.importorskip("tiktoken")
+
+        try:
+            tokenizer = TiktokenTokenizer("cl100k_base")
+        except OSError:  # エンコーディングを取得できないオフライン環境
+            pytest.skip("tiktoken encoding not available")
+        text = "The quick brown fox jumps over the lazy dog. " * 200
+
+        head = tokenizer.head(text, 50)
+        tail = tokenizer.tail(text, 50)
+
+        assert tokenizer.count(head) == 50
+        assert tokenizer.count(tail) <= 50
+        assert text.startswith(head)
+        assert text.endswith(tail)
+
+
+class _CharEncoding:
+    """tiktoken encoding stand-in with one token per character."""
+
+    def encode(self, text: str, **_: object) -> list[int]:
+        return [ord(c) for c in text]
+
+    def decode_with_offsets(self, tokens: list[int]) -> tuple[str, list[int]]:
+        return "".join(map(chr, tokens)), list(range(len(tokens)))
+
+
+class _CharHfTokenizer:
+    """tokenizers.Tokenizer stand-in with one token per character."""
+
+    def encode(self, text: str, **_: object) -> SimpleNamespace:
+        return SimpleNamespace(offsets=[(i, i + 1) for i in range(len(text))])
+
+
+def _stub_tokenizers() -> SimpleNamespace:
+    return SimpleNamespace(
+        Tokenizer=SimpleNamespace(from_str=lambda _: _CharHfTokenizer())
+    )
+
+
+class TestExactTokenizers:
+    """Tests for the tiktoken and Hugging Face tokenizers with stub encoders."""
+
+    @pytest.fixture(params=["tiktoken", "hf"])
+    def tokenizer(self, request: pytest.FixtureRequest, tmp_path: Path) -> Tokenizer:
+        if request.param == "tiktoken":
+            tiktoken = SimpleNamespace(get_encoding=lambda _: _CharEncoding())
+            with patch.dict(sys.modules, {"tiktoken": tiktoken}):
+                return TiktokenTokenizer("stub")
+        model = tmp_path / "tokenizer.json"
+        model.write_text("{}")
+        with patch.dict(sys.modules, {"tokenizers": _stub_tokenizers()}):
+            return HuggingFaceTokenizer(str(model))
+
+    def test_head_and_tail(self, tokenizer: Tokenizer) -> None:
+        assert tokenizer.head("abcdefgh", 3) == "abc"
+        assert tokenizer.tail("abcdefgh", 3) == "fgh"
+        assert tokenizer.tail("abc", 10) == "abc"
+
+    def test_zero_budget_returns_empty(self, tokenizer: Tokenizer) -> None:
+        """予算0（tail_chars = 0 など）でも例外にならず空文字列を返す。"""
+        assert tokenizer.head("abcdefgh", 0) == ""
+        assert tokenizer.tail("abcdefgh", 0) == ""
@@ -2,14 +2,22 @@
 
 import json
 import subprocess
+import threading
 from pathlib import Path
+from typing import Any
 from unittest.mock import MagicMock, patch
 
+import litellm
+import pytest
 
 from doc_triager.triage import (
+    BatchClassifier,
+    BatchDocument,
     SummaryResult,
     TriageResult,
+    build_batch_classify_prompt,
     build_classify_prompt,
+    classify_batch,
     classify_document,
     apply_threshold,
     summarize_text,
@@ -180,7 +188,7 @@ class TestClassifyDocument:
 
         call_kwargs = mock_completion.call_args
         messages = call_kwargs.kwargs["messages"]
-        user_content = messages[0]["content"]
+        user_content = messages[-1]["content"]
         assert "algorithms.pdf" in user_content
         assert "Content about algorithms" in user_content
         assert "True" in user_content or "true" in user_content.lower()
@@ -514,6 +522,81 @@ class TestClassifyDocumentDispatch:
         assert result.triage == "evergreen"
         mock_api.assert_called_once()
 
+    @patch("doc_triager.triage.call_api")
+    def test_rate_limiter_acquired_before_call(self, mock_api: MagicMock) -> None:
+        mock_api.return_value = json.dumps(
+            {"classification": "evergreen", "confidence": 0.9}
+        )
+        limiter = MagicMock()
+
+        classify_document(
+            text="Some text",
+            filename="test.pdf",
+            file_extension=".pdf",
+            truncated=False,
+            model="openai/gpt-4o",
+            rate_limiter=limiter,
+        )
+
+        limiter.acquire.assert_called_once()
+        prompt = limiter.acquire.call_args.args[0]
+        assert "Some text" in prompt
+
+
+class TestClassifyDocumentRetry:
+    """Tests for retry handling in classify_document."""
+
+    @patch("doc_triager.llm.time.sleep")
+    @patch("doc_triager.triage.call_claude")
+    def test_transient_cli_failure_is_retried(
+        self, mock_cli: MagicMock, mock_sleep: MagicMock
+    ) -> None:
+        from doc_triager.llm import RetryPolicy
+
+        mock_cli.side_effect = [
+            subprocess.TimeoutExpired(cmd="claude", timeout=120),
+            json.dumps({"classification": "evergreen", "confidence": 0.9}),
+        ]
+
+        result = classify_document(
+            text="Some text",
+            filename="test.pdf",
+            file_extension=".pdf",
+            truncated=False,
+            model="",
+            mode="cli",
+            provider="claude",
+            retry=RetryPolicy(max_retries=2),
+        )
+
+        assert result.triage == "evergreen"
+        assert result.error is None
+        assert mock_cli.call_count == 2
+
+    @patch("doc_triager.llm.time.sleep")
+    @patch("doc_triager.triage.call_claude")
+    def test_fatal_cli_failure_is_not_retried(
+        self, mock_cli: MagicMock, mock_sleep: MagicMock
+    ) -> None:
+        from doc_triager.llm import CliError, RetryPolicy
+
+        mock_cli.side_effect = CliError(1, "Invalid API key")
+
+        result = classify_document(
+            text="Some text",
+            filename="test.pdf",
+            file_extension=".pdf",
+            truncated=False,
+            model="",
+            mode="cli",
+            provider="claude",
+            retry=RetryPolicy(max_retries=2),
+        )
+
+        assert result.error is not None
+        assert mock_cli.call_count == 1
+        mock_sleep.assert_not_called()
+
 
 class TestSummarizeText:
     """Tests for summarize_text function."""
@@ -703,7 +786,7 @@ class TestClassifyDocumentFilePath:
         prompt = call_kwargs["prompt"]
         # classify_file.txt 固有の文言が含まれる（@ 参照）
         assert "@/tmp/slides.pdf" in prompt
-        # classify.txt 固有の文言（extracted_text プレースホルダの展開結果）が含まれない
+        # classify_user.txt 固有の文言（extracted_text プレースホルダの展開結果）が含まれない
         assert "{extracted_text}" not in prompt
 
     @patch("doc_triager.triage.call_claude")
@@ -729,7 +812,7 @@ class TestClassifyDocumentFilePath:
 
     @patch("doc_triager.triage.call_claude")
     def test_text_mode_unchanged(self, mock_cli: MagicMock) -> None:
-        """file_path=None 時は既存動作（classify.txt 使用）のまま。"""
+        """file_path=None 時は既存動作（classify_system.txt / classify_user.txt 使用）のまま。"""
         mock_cli.return_value = self._success_json()
 
         classify_document(
@@ -753,13 +836,28 @@ class TestClassifyDocumentFilePath:
 class TestBuildClassifyPrompt:
     """Tests for build_classify_prompt function."""
 
+    def test_system_part_is_identical_across_documents(self) -> None:
+        """指示部分は文書によらずバイト単位で同一で、文書固有の値は user 側に入る。"""
+        a = build_classify_prompt(
+            filename="a.pdf", file_extension=".pdf", text="Alpha", truncated=True
+        )
+        b = build_classify_prompt(
+            filename="b.docx", file_extension=".docx", text="Beta", truncated=False
+        )
+
+        assert a.system == b.system
+        assert "a.pdf" not in a.system
+        assert "Alpha" not in a.system
+        assert "a.pdf" in a.user
+        assert "Alpha" in a.user
+
     def test_build_prompt_file_mode(self) -> None:
         """file_path 指定時に classify_file.txt テンプレートが使用される。"""
         prompt = build_classify_prompt(
             filename="slides.pdf",
             file_extension=".pdf",
             file_path=Path("/tmp/slides.pdf"),
-        )
+        ).as_text()
 
         # classify_file.txt の特徴的な文言（@ 参照）
         assert "@/tmp/slides.pdf" in prompt
@@ -769,13 +867,13 @@ class TestBuildClassifyPrompt:
         assert "{extracted_text}" not in prompt
 
     def test_build_prompt_text_mode(self) -> None:
-        """file_path=None 時に classify.txt テンプレートが使用される。"""
+        """file_path=None 時に classify_system.txt / classify_user.txt テンプレートが使用される。"""
         prompt = build_classify_prompt(
             filename="doc.pdf",
             file_extension=".pdf",
             text="Document content about algorithms",
             truncated=True,
-        )
+        ).as_text()
 
         assert "doc.pdf" in prompt
         assert ".pdf" in prompt
@@ -787,7 +885,7 @@ class TestBuildClassifyPrompt:
         prompt = build_classify_prompt(
             filename="test.txt",
             file_extension=".txt",
-        )
+        ).as_text()
 
         assert "test.txt" in prompt
         assert ".txt" in prompt
@@ -798,7 +896,7 @@ class TestBuildClassifyPrompt:
             filename="report.pptx",
             file_extension=".pptx",
             file_path=Path("/tmp/report.pptx"),
-        )
+        ).as_text()
 
         assert "evergreen" in prompt
         assert "temporal" in prompt
@@ -810,7 +908,299 @@ class TestBuildClassifyPrompt:
             filename="report.pdf",
             file_extension=".pdf",
             text="Some text",
-        )
+        ).as_text()
 
         assert "evergreen" in prompt
         assert "temporal" in prompt
+
+
+def _verdict(doc_id: str, classification: str = "evergreen") -> dict:
+    return {
+        "id": doc_id,
+        "classification": classification,
+        "confidence": 0.9,
+        "reason": "test",
+        "topics": ["t"],
+    }
+
+
+def _mock_completion_response(content: str) -> MagicMock:
+    mock_resp = MagicMock()
+    mock_resp.choices = [MagicMock()]
+    mock_resp.choices[0].message.content = content
+    return mock_resp
+
+
+def _docs(count: int) -> list[BatchDocument]:
+    return [
+        BatchDocument(text=f"text {i}", filename=f"f{i}.md", file_extension=".md")
+        for i in range(1, count + 1)
+    ]
+
+
+class TestBuildBatchClassifyPrompt:
+    """Tests for build_batch_classify_prompt."""
+
+    def test_shares_system_part_with_single_prompt(self) -> None:
+        """単一文書の分類と同じシステムメッセージを使う（キャッシュを共有する）。"""
+        single = build_classify_prompt(
+            filename="a.md", file_extension=".md", text="x", truncated=False
+        )
+
+        prompt = build_batch_classify_prompt(_docs(2))
+
+        assert prompt.system == single.system
+
+    def test_numbers_documents_in_order(self) -> None:
+        prompt = build_batch_classify_prompt(_docs(3))
+
+        assert "3 documents" in prompt.user
+        assert prompt.user.index("## Document doc-1") < prompt.user.index(
+            "## Document doc-3"
+        )
+        assert "- Filename: f2.md" in prompt.user
+        assert "text 3" in prompt.user
+
+
+class TestClassifyBatch:
+    """Tests for classify_batch."""
+
+    @patch("doc_triager.llm.litellm.completion")
+    def test_one_request_for_all_documents(self, mock_completion: MagicMock) -> None:
+        mock_completion.return_value = _mock_completion_response(
+            json.dumps([_verdict("doc-2", "temporal"), _verdict("doc-1")])
+        )
+
+        results = classify_batch(_docs(2), model="openai/gpt-4o")
+
+        assert mock_completion.call_count == 1
+        assert [r.triage for r in results] == ["evergreen", "temporal"]
+        assert results[0].topics == ["t"]
+        assert all(r.error is None for r in results)
+
+    @patch("doc_triager.llm.litellm.completion")
+    def test_missing_and_malformed_entries_are_reissued(
+        self, mock_completion: MagicMock
+    ) -> None:
+        """欠けた・不正な回答の文書だけを1件ずつ分類し直す。"""
+        mock_completion.side_effect = [
+            _mock_completion_response(
+                "```json\n"
+                + json.dumps(
+                    [
+                        _verdict("doc-1"),
+                        {**_verdict("doc-2"), "classification": "maybe"},
+                    ]
+                )
+                + "\n```"
+            ),
+            _mock_completion_response(json.dumps(_verdict("", "temporal"))),
+            _mock_completion_response(json.dumps(_verdict("", "unknown"))),
+        ]
+
+        results = classify_batch(_docs(3), model="openai/gpt-4o")
+
+        assert mock_completion.call_count == 3
+        assert [r.triage for r in results] == ["evergreen", "temporal", "unknown"]
+        # 再実行は単一文書用のプロンプト
+        retried = mock_completion.call_args_list[1].kwargs["messages"][-1]["content"]
+        assert "f2.md" in retried
+        assert "doc-" not in retried
+
+    @patch("doc_triager.llm.litellm.completion")
+    def test_unparseable_response_reissues_every_document(
+        self, mock_completion: MagicMock
+    ) -> None:
+        mock_completion.side_effect = [
+            _mock_completion_response("not json"),
+            _mock_completion_response(json.dumps(_verdict("", "temporal"))),
+            _mock_completion_response(json.dumps(_verdict("", "temporal"))),
+        ]
+
+        results = classify_batch(_docs(2), model="openai/gpt-4o")
+
+        assert mock_completion.call_count == 3
+        assert [r.triage for r in results] == ["temporal", "temporal"]
+
+    @patch("doc_triager.llm.litellm.completion")
+    def test_accepts_wrapped_array_with_surrounding_text(
+        self, mock_completion: MagicMock
+    ) -> None:
+        body = json.dumps({"results": [_verdict("doc-1"), _verdict("doc-2")]})
+        mock_completion.return_value = _mock_completion_response(
+            f"Here are the results: {body}"
+        )
+
+        results = classify_batch(_docs(2), model="openai/gpt-4o")
+
+        assert mock_completion.call_count == 1
+        assert [r.triage for r in results] == ["evergreen", "evergreen"]
+
+    @patch("doc_triager.llm.litellm.completion")
+    def test_api_error_reissues_every_document(
+        self, mock_completion: MagicMock
+    ) -> None:
+        mock_completion.side_effect = [
+            litellm.RateLimitError(
+                message="rate limited", llm_provider="openai", model="gpt-4o"
+            ),
+            _mock_completion_response(json.dumps(_verdict("", "temporal"))),
+            _mock_completion_response(json.dumps(_verdict("", "evergreen"))),
+        ]
+
+        results = classify_batch(_docs(2), model="openai/gpt-4o")
+
+        assert mock_completion.call_count == 3
+        assert [r.triage for r in results] == ["temporal", "evergreen"]
+
+    @patch("doc_triager.llm.litellm.completion")
+    def test_unexpected_error_is_not_reissued(self, mock_completion: MagicMock) -> None:
+        """想定外のエラー（プログラムの誤り）は個別の再実行に回さず送出する。"""
+        mock_completion.side_effect = TypeError("bug")
+
+        with pytest.raises(TypeError, match="bug"):
+            classify_batch(_docs(2), model="openai/gpt-4o")
+
+        assert mock_completion.call_count == 1
+
+    @patch("doc_triager.llm.litellm.completion")
+    def test_single_document_uses_single_prompt(
+        self, mock_completion: MagicMock
+    ) -> None:
+        mock_completion.return_value = _mock_completion_response(
+            json.dumps(_verdict("", "temporal"))
+        )
+
+        results = classify_batch(_docs(1), model="openai/gpt-4o")
+
+        assert results[0].triage == "temporal"
+        user = mock_completion.call_args.kwargs["messages"][-1]["content"]
+        assert "doc-1" not in user
+
+
+class TestBatchClassifier:
+    """Tests for BatchClassifier grouping across threads."""
+
+    @patch("doc_triager.llm.litellm.completion")
+    def test_concurrent_documents_share_one_request(
+        self, mock_completion: MagicMock
+    ) -> None:
+        mock_completion.return_value = _mock_completion_response(
+            json.dumps([_verdict(f"doc-{i}") for i in range(1, 4)])
+        )
+        classifier = BatchClassifier(
+            max_documents=3, max_tokens=8000, wait_sec=10, model="openai/gpt-4o"
+        )
+        results: list = [None] * 3
+
+        def run(i: int, doc: BatchDocument) -> None:
+            results[i] = classifier.classify(doc)
+
+        threads = [
+            threading.Thread(target=run, args=(i, doc))
+            for i, doc in enumerate(_docs(3))
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join(timeout=5)
+
+        assert mock_completion.call_count == 1
+        assert all(r is not None and r.triage == "evergreen" for r in results)
+
+    @patch("doc_triager.llm.litellm.completion")
+    def test_partial_batch_is_sent_after_wait(self, mock_completion: MagicMock) -> None:
+        """待機時間内にバッチが埋まらなければ、それまでの文書で送信する。"""
+        mock_completion.return_value = _mock_completion_response(
+            json.dumps(_verdict("", "temporal"))
+        )
+        classifier = BatchClassifier(
+            max_documents=4, max_tokens=8000, wait_sec=0.01, model="openai/gpt-4o"
+        )
+
+        result = classifier.classify(_docs(1)[0])
+
+        assert result.triage == "temporal"
+        assert mock_completion.call_count == 1
+
+    @patch("doc_triager.llm.litellm.completion")
+    def test_large_document_is_classified_alone(
+        self, mock_completion: MagicMock
+    ) -> None:
+        mock_completion.return_value = _mock_completion_response(
+            json.dumps(_verdict("", "evergreen"))
+        )
+        classifier = BatchClassifier(
+            max_documents=4, max_tokens=100, wait_sec=10, model="openai/gpt-4o"
+        )
+
+        result = classifier.classify(
+            BatchDocument(text="word " * 200, filename="big.md", file_extension=".md")
+        )
+
+        assert result.triage == "evergreen"
+        assert mock_completion.call_count == 1
+
+    def _classify_concurrently(
+        self, classifier: BatchClassifier, docs: list[BatchDocument]
+    ) -> list:
+        results: list = [None] * len(docs)
+
+        def run(i: int, doc: BatchDocument) -> None:
+            results[i] = classifier.classify(doc)
+
+        threads = [
+            threading.Thread(target=run, args=(i, doc), name=f"worker-{i}")
+            for i, doc in enumerate(docs)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join(timeout=5)
+        return results
+
+    @patch("doc_triager.llm.litellm.completion")
+    def test_missing_verdicts_are_classified_by_each_caller(
+        self, mock_completion: MagicMock
+    ) -> None:
+        """バッチで結果が得られない文書は、各呼び出し元のスレッドで個別に分類する。"""
+        callers: list[str] = []
+
+        def respond(**kwargs: Any) -> MagicMock:
+            callers.append(threading.current_thread().name)
+            if len(callers) == 1:
+                return _mock_completion_response("[]")
+            return _mock_completion_response(json.dumps(_verdict("", "temporal")))
+
+        mock_completion.side_effect = respond
+        classifier = BatchClassifier(
+            max_documents=2, max_tokens=8000, wait_sec=10, model="openai/gpt-4o"
+        )
+
+        results = self._classify_concurrently(classifier, _docs(2))
+
+        assert [r.triage for r in results] == ["temporal", "temporal"]
+        assert sorted(callers[1:]) == ["worker-0", "worker-1"]
+
+    @patch("doc_triager.llm.litellm.completion")
+    def test_unexpected_error_fails_only_per_document(
+        self, mock_completion: MagicMock
+    ) -> None:
+        """想定外のエラーでも実行は止めず、失敗はその文書の結果にだけ記録する。"""
+
+        def respond(**kwargs: Any) -> MagicMock:
+            if "f1.md" in kwargs["messages"][-1]["content"]:
+                raise TypeError("bad document")
+            return _mock_completion_response(json.dumps(_verdict("", "evergreen")))
+
+        mock_completion.side_effect = respond
+        classifier = BatchClassifier(
+            max_documents=2, max_tokens=8000, wait_sec=10, model="openai/gpt-4o"
+        )
+
+        with patch("doc_triager.triage._request_batch", side_effect=TypeError("bug")):
+            results = self._classify_concurrently(classifier, _docs(2))
+
+        assert results[0].error == "bad document"
+        assert results[1].error is None
+        assert results[1].triage == "evergreen"